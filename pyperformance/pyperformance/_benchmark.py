@@ -15,7 +15,7 @@ import sys
 import pyperf
 from packaging.specifiers import SpecifierSet
 
-from . import _utils, _benchmark_metadata
+from . import _utils
 
 
 def check_name(name):
@@ -120,6 +120,9 @@ class Benchmark:
             'name': self.spec.name,
             'version': self.spec.version,
         }
+        # Imported here since it is not needed when the manifest index
+        # already provides the metadata.
+        from . import _benchmark_metadata
         self._metadata, _ = _benchmark_metadata.load_metadata(
             self.metafile,
             defaults,
@@ -20,10 +20,14 @@ BENCH_COLUMNS = ('name', 'metafile')
 BENCH_HEADER = '\t'.join(BENCH_COLUMNS)
 
 
-def load_manifest(filename, *, resolve=None):
+def load_manifest(filename, *, resolve=None, index=True):
     if not filename:
         filename = DEFAULT_MANIFEST
     filename = _utils.resolve_file(filename)
+    if index:
+        # See _manifest_index for how the index is validated.
+        from . import _manifest_index
+        return _manifest_index.load_manifest(filename, resolve=resolve)
     sections = _parse_manifest_file(filename)
     return BenchmarksManifest._from_sections(sections, resolve, filename)
 
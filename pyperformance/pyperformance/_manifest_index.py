@@ -0,0 +1,169 @@
+"""A precompiled index of a manifest and its benchmarks' metadata.
+
+Loading a manifest normally parses the MANIFEST file (and its includes),
+then every benchmark's pyproject.toml (and its base) as soon as tags,
+groups or requirements are needed.  The index stores the parsed sections
+together with the loaded metadata of every benchmark, so the same
+manifest is rebuilt from a single read.
+
+The index is only trusted while its inputs are unchanged.  Each input
+file is recorded with its mtime, size and sha256: a file whose mtime or
+size differ is re-hashed, and only a different hash invalidates the
+index.  The presence of the default "data" dir and "run_benchmark.py"
+next to each metafile is recorded as well, since the metadata depends
+on them.
+"""
+
+__all__ = [
+    'load_manifest',
+    'get_index_filename',
+]
+
+
+import hashlib
+import os
+import os.path
+import pickle
+import tempfile
+
+from . import __version__, _pythoninfo
+from . import _benchmark, _manifest
+
+
+INDEX_DIR = os.path.join(os.path.dirname(_pythoninfo.CACHE_FILE), 'manifests')
+# Bump when the layout of the index changes.
+INDEX_VERSION = 1
+
+
+def get_index_filename(filename):
+    key = hashlib.sha256(os.path.abspath(filename).encode('utf-8')).hexdigest()
+    return os.path.join(INDEX_DIR, f'{key[:16]}.pickle')
+
+
+def load_manifest(filename, *, resolve=None):
+    """Return the manifest for the given file, using the index if valid."""
+    indexfile = get_index_filename(filename)
+    index = _read_index(indexfile, filename)
+    if index is not None:
+        manifest = _manifest.BenchmarksManifest._from_sections(
+            index['sections'], resolve, filename)
+        _attach_metadata(manifest, index['metadata'])
+        if index['restamp']:
+            # Only mtimes changed (e.g. a git checkout); refresh them.
+            _write_index(indexfile, filename, index['sections'], manifest)
+        return manifest
+
+    sections = list(_manifest._parse_manifest_file(filename))
+    manifest = _manifest.BenchmarksManifest._from_sections(
+        sections, resolve, filename)
+    _write_index(indexfile, filename, sections, manifest)
+    return manifest
+
+
+#######################################
+# internal implementation
+
+def _metadata_key(bench):
+    return (bench.metafile, bench.spec.name, bench.spec.version)
+
+
+def _attach_metadata(manifest, metadata):
+    for bench in manifest.benchmarks:
+        if not isinstance(bench, _benchmark.Benchmark):
+            continue
+        if bench._metadata is None:
+            bench._metadata = metadata.get(_metadata_key(bench))
+
+
+def _file_stamp(filename):
+    st = os.stat(filename)
+    with open(filename, 'rb') as infile:
+        digest = hashlib.sha256(infile.read()).hexdigest()
+    return (st.st_mtime_ns, st.st_size, digest)
+
+
+def _check_file(filename, stamp):
+    """Return True if unchanged, 'restamp' if only the mtime moved, else False."""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return False
+    if (st.st_mtime_ns, st.st_size) == stamp[:2]:
+        return True
+    if st.st_size != stamp[1]:
+        return False
+    with open(filename, 'rb') as infile:
+        digest = hashlib.sha256(infile.read()).hexdigest()
+    return 'restamp' if digest == stamp[2] else False
+
+
+def _read_index(indexfile, filename):
+    try:
+        with open(indexfile, 'rb') as infile:
+            index = pickle.load(infile)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if not isinstance(index, dict):
+        return None
+    if (index.get('version') != INDEX_VERSION
+            or index.get('pyperformance') != __version__
+            or index.get('filename') != os.path.abspath(filename)):
+        return None
+
+    restamp = False
+    for depfile, stamp in index['files'].items():
+        res = _check_file(depfile, stamp)
+        if not res:
+            return None
+        restamp = restamp or res == 'restamp'
+    for path, exists in index['probes'].items():
+        if os.path.exists(path) != exists:
+            return None
+    index['restamp'] = restamp
+    return index
+
+
+def _write_index(indexfile, filename, sections, manifest):
+    from . import _benchmark_metadata
+
+    files = {os.path.abspath(f) for f, _, _ in sections}
+    probes = {}
+    metadata = {}
+    for bench in manifest.benchmarks:
+        if not isinstance(bench, _benchmark.Benchmark):
+            continue
+        try:
+            if bench._metadata is None:
+                bench._init_metadata()
+        except Exception:
+            # Leave the error for whoever actually needs this benchmark.
+            return
+        metadata[_metadata_key(bench)] = bench._metadata
+        files.add(os.path.abspath(bench.metafile))
+        base = bench._metadata.get('base')
+        if base:
+            files.add(os.path.abspath(base))
+        rootdir = os.path.dirname(os.path.abspath(bench.metafile))
+        for name in (_benchmark_metadata.DATA, _benchmark_metadata.RUN):
+            path = os.path.join(rootdir, name)
+            probes[path] = os.path.exists(path)
+
+    try:
+        index = {
+            'version': INDEX_VERSION,
+            'pyperformance': __version__,
+            'filename': os.path.abspath(filename),
+            'files': {f: _file_stamp(f) for f in sorted(files)},
+            'probes': probes,
+            'sections': sections,
+            'metadata': metadata,
+        }
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        # Write atomically; other pyperformance processes may be reading.
+        fd, tmp = tempfile.mkstemp(dir=INDEX_DIR, prefix='.manifest-')
+        with os.fdopen(fd, 'wb') as outfile:
+            pickle.dump(index, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, indexfile)
+    except OSError:
+        # The index is only an optimization.
+        pass
@@ -1,6 +1,8 @@
 import os
 import os.path
+import shutil
 import sys
+import tempfile
 
 from . import _utils, _pythoninfo
 
@@ -139,18 +141,70 @@ def ensure_installer(python=sys.executable, **kwargs):
     return install_requirements(*reqs, python=python, **kwargs)
 
 
+def _requirement_args(reqs):
+    args = []
+    for req in reqs:
+        if os.path.isfile(req) and req.endswith('.txt'):
+            args.append('-r')  # --requirement
+        args.append(req)
+    return args
+
+
+def build_wheels(reqs, *extra, wheelhouse, **kwargs):
+    """Add wheels for the given packages (and their deps) to the wheelhouse.
+
+    Wheels already in the wheelhouse are not downloaded again.  pip writes
+    into a private directory first and finished wheels are moved in with
+    os.replace(), so concurrent builds never expose a partial file.
+    """
+    os.makedirs(wheelhouse, exist_ok=True)
+    tmpdir = tempfile.mkdtemp(prefix='.build-', dir=wheelhouse)
+    try:
+        res = run_pip(
+            'wheel',
+            '--wheel-dir', tmpdir,
+            '--find-links', wheelhouse,
+            *_requirement_args([reqs, *extra]),
+            **kwargs
+        )
+        for name in os.listdir(tmpdir):
+            if name.endswith('.whl'):
+                os.replace(os.path.join(tmpdir, name),
+                           os.path.join(wheelhouse, name))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return res
+
+
 def install_requirements(reqs, *extra,
                          upgrade=True,
+                         wheelhouse=None,
                          **kwargs
                          ):
-    """Install the given packages from PyPI."""
+    """Install the given packages from PyPI.
+
+    With a wheelhouse, install offline from it first; only if that fails
+    are the missing wheels fetched into it (then installed offline).
+    """
     args = []
     if upgrade:
         args.append('-U')  # --upgrade
-    for reqs in [reqs, *extra]:
-        if os.path.isfile(reqs) and reqs.endswith('.txt'):
-            args.append('-r')  # --requirement
-        args.append(reqs)
+    args.extend(_requirement_args([reqs, *extra]))
+    if not wheelhouse:
+        return run_pip('install', *args, **kwargs)
+
+    offline = ['--no-index', '--find-links', wheelhouse]
+    if os.path.isdir(wheelhouse):
+        res = run_pip('install', *offline, *args, **kwargs)
+        if res[0] == 0:
+            return res
+    ec, _, _ = build_wheels(reqs, *extra, wheelhouse=wheelhouse, **kwargs)
+    if ec == 0:
+        res = run_pip('install', *offline, *args, **kwargs)
+        if res[0] == 0:
+            return res
+    # e.g. a package that cannot be built as a wheel
+    print('(wheelhouse install failed, falling back to the index)')
     return run_pip('install', *args, **kwargs)
 
 
@@ -8,6 +8,8 @@ import os
 import os.path
 import sys
 import sysconfig
+import tempfile
+import threading
 
 
 INFO = {
@@ -38,27 +40,96 @@ INFO = {
 }
 
 
-def get_info(python=sys.executable):
+CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'pyperformance',
+    'pythoninfo.json',
+)
+# Bump when the set of collected fields changes.
+CACHE_VERSION = 1
+
+_cache_lock = threading.Lock()
+_cache = None  # {python: {"stamp": [...], "info": {...}}}
+
+
+def get_info(python=sys.executable, *, cache=True):
     """Return an object with details about the given Python executable.
 
     Most of the details are grouped by their source.
 
-    By default the current Python is used.
+    By default the current Python is used.  Other interpreters are
+    introspected in a subprocess; the result is cached (in memory and in
+    CACHE_FILE) until the executable's realpath, inode, mtime or size
+    changes.
     """
     if python and python != sys.executable:
-        # Run _pythoninfo.py to get the raw info.
-        import subprocess
-        argv = [python, __file__]
-        try:
-            text = subprocess.check_output(argv, encoding='utf-8')
-        except subprocess.CalledProcessError:
-            raise Exception(f'could not get info for {python or sys.executable}')
-        data = _unjsonify_info(text)
+        stamp = _get_stamp(python) if cache else None
+        data = _cache_get(stamp) if stamp else None
+        if data is None:
+            # Run _pythoninfo.py to get the raw info.
+            import subprocess
+            argv = [python, __file__]
+            try:
+                text = subprocess.check_output(argv, encoding='utf-8')
+            except subprocess.CalledProcessError:
+                raise Exception(f'could not get info for {python or sys.executable}')
+            if stamp:
+                _cache_set(stamp, json.loads(text))
+            data = _unjsonify_info(text)
     else:
         data = _get_current_info()
     return _build_info(data)
 
 
+def _get_stamp(python):
+    """Return what identifies the executable's current build, or None."""
+    try:
+        realpath = os.path.realpath(python)
+        st = os.stat(realpath)
+    except OSError:
+        return None
+    return [os.path.abspath(python), realpath, st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_FILE, encoding='utf-8') as infile:
+                data = json.load(infile)
+        except (OSError, ValueError):
+            data = None
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            data = {'version': CACHE_VERSION, 'pythons': {}}
+        _cache = data['pythons']
+    return _cache
+
+
+def _cache_get(stamp):
+    with _cache_lock:
+        entry = _load_cache().get(stamp[0])
+    if not entry or entry.get('stamp') != stamp:
+        return None
+    return _unjsonify_info(entry['info'])
+
+
+def _cache_set(stamp, raw):
+    with _cache_lock:
+        cache = _load_cache()
+        cache[stamp[0]] = {'stamp': stamp, 'info': raw}
+        try:
+            os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+            # Write atomically; other pyperformance processes may be reading.
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(CACHE_FILE),
+                                       prefix='.pythoninfo-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as outfile:
+                json.dump({'version': CACHE_VERSION, 'pythons': cache}, outfile)
+            os.replace(tmp, CACHE_FILE)
+        except OSError:
+            # The cache is only an optimization.
+            pass
+
+
 def _build_info(data):
     # Map the data into a new types.SimpleNamespace object.
     info = type(sys.implementation)()
@@ -122,6 +122,8 @@ def create_venv(root, python=sys.executable, *,
 class VirtualEnvironment:
 
     _env = None
+    # Local wheel cache shared by all venvs; see _pip.install_requirements().
+    wheelhouse = None
 
     @classmethod
     def create(cls, root=None, python=sys.executable, **kwargs):
@@ -225,6 +227,7 @@ class VirtualEnvironment:
                 self.python,
                 env=self._env,
                 upgrade=True,
+                wheelhouse=self.wheelhouse,
             )
             if ec != 0:
                 raise RequirementsInstallationFailedError('wheel')
@@ -235,6 +238,7 @@ class VirtualEnvironment:
             info=self.info,
             env=self._env,
             installer=installer,
+            wheelhouse=self.wheelhouse,
         )
         if ec != 0:
             raise RequirementsInstallationFailedError('pip')
@@ -246,6 +250,7 @@ class VirtualEnvironment:
             python=self.python,
             env=self._env,
             upgrade=upgrade,
+            wheelhouse=self.wheelhouse,
         )
         if ec:
             raise RequirementsInstallationFailedError(reqs)
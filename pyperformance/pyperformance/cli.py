@@ -34,8 +34,16 @@ def check_positive(value):
     return value
 
 
-def filter_opts(cmd, *, allow_no_benchmarks=False):
+def manifest_opts(cmd):
     cmd.add_argument("--manifest", help="benchmark manifest file to use")
+    cmd.add_argument("--no-manifest-index", dest="manifest_index",
+                     action="store_false",
+                     help="Parse the manifest and benchmark metadata from "
+                     "scratch instead of using the precompiled index")
+
+
+def filter_opts(cmd, *, allow_no_benchmarks=False):
+    manifest_opts(cmd)
 
     cmd.add_argument("-b", "--benchmarks", metavar="BM_LIST", default='<default>',
                      help=("Comma-separated list of benchmarks or groups to run.  Can"
@@ -103,6 +111,15 @@ def parse_args():
                      help="Apply the given pyperf hook(s) when running each benchmark")
     cmd.add_argument("--warmups", type=int, default=None,
                      help="number of skipped values per run used to warmup the benchmark")
+    cmd.add_argument("--venv-jobs", type=check_positive,
+                     default=min(4, os.cpu_count() or 1),
+                     help="Number of benchmark venvs to create concurrently "
+                     "(default: %(default)s)")
+    cmd.add_argument("--wheelhouse", metavar="DIR", default=None,
+                     help="Local wheel cache used to install benchmark "
+                     "requirements; repeat runs install offline from it, so "
+                     "unpinned requirements are not upgraded while a "
+                     "matching wheel is cached (default: disabled)")
     filter_opts(cmd)
 
     # show
@@ -138,7 +155,7 @@ def parse_args():
     cmd = subparsers.add_parser(
         'list_groups', help='List benchmark groups of the running Python')
     cmds.append(cmd)
-    cmd.add_argument("--manifest", help="benchmark manifest file to use")
+    manifest_opts(cmd)
     cmd.add_argument("--tags", action="store_true")
     cmd.add_argument("--no-tags", dest="tags", action="store_false")
     cmd.set_defaults(tags=True)
@@ -160,6 +177,13 @@ def parse_args():
     cmd.add_argument('-T', '--no-tune', action="store_true",
                      help="Don't run 'pyperf system tune' "
                           "to tune the system for benchmarks")
+    cmd.add_argument('--phase', choices=('all', 'build', 'bench'),
+                     default='all',
+                     help="Only build Python into the build cache, or only "
+                          "benchmark a (cached) build (default: all)")
+    cmd.add_argument('--timings', metavar='FILENAME',
+                     help="Write the duration of each phase into FILENAME "
+                          "(JSON)")
     cmds.append(cmd)
 
     # compile_all
@@ -242,7 +266,10 @@ def parse_args():
 
 def _manifest_from_options(options):
     from pyperformance import _manifest
-    return _manifest.load_manifest(options.manifest)
+    return _manifest.load_manifest(
+        options.manifest,
+        index=getattr(options, 'manifest_index', True),
+    )
 
 
 def _benchmarks_from_options(options):
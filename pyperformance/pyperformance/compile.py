@@ -1,16 +1,21 @@
+import concurrent.futures
 import configparser
+import contextlib
 import datetime
 import errno
+import hashlib
 import json
 import logging
 import math
 import os
 import os.path
+import platform
 import re
 import shlex
 import statistics
 import subprocess
 import sys
+import tempfile
 import time
 from urllib.error import HTTPError
 from urllib.parse import urlencode
@@ -107,6 +112,17 @@ class Repository(Task):
             self.run('hg', 'up', '--clean', '-r', revision)
             # FIXME: run hg purge?
 
+    def add_worktree(self, path, revision):
+        # A separate checkout, so that a build can run while the main
+        # checkout (or another worktree) is in use.
+        self.run('git', 'worktree', 'add', '--force', '--detach',
+                 path, revision)
+
+    def remove_worktree(self, path):
+        self.run_nocheck('git', 'worktree', 'remove', '--force', path)
+        _utils.safe_rmtree(path)
+        self.run_nocheck('git', 'worktree', 'prune')
+
     def get_revision_info(self, revision):
         if GIT:
             cmd = ['git', 'show', '-s', '--pretty=format:%H|%ci', '%s^!' % revision]
@@ -255,12 +271,16 @@ def resolve_python(prefix, builddir, *, fallback=True):
 
 
 class Python(Task):
-    def __init__(self, app, conf):
-        super().__init__(app, conf.build_dir)
+    def __init__(self, app, conf, *, src_dir=None, build_dir=None, prefix=None):
+        build_dir = build_dir or conf.build_dir
+        super().__init__(app, build_dir)
         self.app = app
         self.branch = app.branch
         self.conf = conf
         self.logger = app.logger
+        self.src_dir = src_dir or conf.repo_dir
+        self.build_dir = build_dir
+        self.prefix = prefix or conf.prefix
         self.program = None
         self.hexversion = None
 
@@ -269,24 +289,19 @@ class Python(Task):
             return
 
         self.logger.error('Apply patch %s in %s (revision %s)'
-                          % (filename, self.conf.repo_dir, self.app.revision))
+                          % (filename, self.src_dir, self.app.revision))
         self.app.run('patch', '-p1',
-                     cwd=self.conf.repo_dir,
+                     cwd=self.src_dir,
                      stdin_filename=filename)
 
-    def compile(self):
-        build_dir = self.conf.build_dir
-
-        _utils.safe_rmtree(build_dir)
-        self.app.safe_makedirs(build_dir)
-
+    def get_config_args(self, prefix):
         config_args = []
         if self.branch.startswith("2.") and not _utils.MS_WINDOWS:
             # On Python 2, use UCS-4 for Unicode on all platforms, except
             # on Windows which uses UTF-16 because of its 16-bit wchar_t
             config_args.append('--enable-unicode=ucs4')
-        if self.conf.prefix:
-            config_args.extend(('--prefix', self.conf.prefix))
+        if prefix:
+            config_args.extend(('--prefix', prefix))
         if self.conf.debug:
             config_args.append('--with-pydebug')
         elif self.conf.lto:
@@ -297,29 +312,43 @@ class Python(Task):
             config_args.extend(self.get_package_only_flags())
         if self.conf.debug:
             config_args.append('CFLAGS=-O0')
-        configure = os.path.join(self.conf.repo_dir, 'configure')
-        self.run(configure, *config_args)
+        return config_args
 
+    def get_make_args(self):
         argv = ['make']
         if self.conf.pgo:
-            # FIXME: use taskset (isolated CPUs) for PGO?
             argv.append('profile-opt')
+        return argv
+
+    def run_build(self, *cmd):
+        # Keep the build off the benchmark CPUs.
+        if self.conf.build_affinity:
+            cmd = ('taskset', '-c', self.conf.build_affinity) + cmd
+        self.run(*cmd)
+
+    def compile(self):
+        build_dir = self.build_dir
+
+        _utils.safe_rmtree(build_dir)
+        self.app.safe_makedirs(build_dir)
+
+        config_args = self.get_config_args(self.prefix)
+        configure = os.path.join(self.src_dir, 'configure')
+        self.run_build(configure, *config_args)
+
+        argv = self.get_make_args()
         if self.conf.jobs:
             argv.append('-j%d' % self.conf.jobs)
-        self.run(*argv)
+        self.run_build(*argv)
 
     def install_python(self):
-        program, _ = resolve_python(
-            self.conf.prefix if self.conf.install else None,
-            self.conf.build_dir,
-        )
         if self.conf.install:
-            program, _ = resolve_python(self.conf.prefix, self.conf.build_dir)
-            _utils.safe_rmtree(self.conf.prefix)
-            self.app.safe_makedirs(self.conf.prefix)
-            self.run('make', 'install')
+            program, _ = resolve_python(self.prefix, self.build_dir)
+            _utils.safe_rmtree(self.prefix)
+            self.app.safe_makedirs(self.prefix)
+            self.run_build('make', 'install')
         else:
-            program, _ = resolve_python(None, self.conf.build_dir)
+            program, _ = resolve_python(None, self.build_dir)
         # else don't install: run python from the compilation directory
         self.program = program
 
@@ -415,9 +444,101 @@ class Python(Task):
         self.install_performance()
 
 
+class BuildCache:
+    """Completed CPython builds, keyed by revision, patch and build flags.
+
+    Each entry is a directory with the Git worktree the build was made
+    from ("src"), the build directory ("build") and the installation
+    prefix ("prefix").  The sources and build directory are removed once
+    Python is installed.  "build.json" is written last: an entry without
+    it is an interrupted build and is discarded.
+    """
+
+    MARKER = 'build.json'
+    # Environment variables which change the build output.
+    ENV_VARS = ('CC', 'CFLAGS', 'CPPFLAGS', 'LDFLAGS', 'LIBS')
+
+    def __init__(self, app, directory, size):
+        self.app = app
+        self.logger = app.logger
+        self.directory = directory
+        self.size = size
+
+    def get_key(self, revision, patch, config_args, make_args, install):
+        if patch:
+            with open(patch, 'rb') as fp:
+                patch = hashlib.sha256(fp.read()).hexdigest()
+        data = {
+            'revision': revision,
+            'patch': patch,
+            'configure': config_args,
+            'make': make_args,
+            'install': install,
+            'machine': platform.machine(),
+            'env': {name: os.environ.get(name) for name in self.ENV_VARS},
+        }
+        data = json.dumps(data, sort_keys=True).encode('utf-8')
+        return '%s-%s' % (revision[:12], hashlib.sha256(data).hexdigest()[:16])
+
+    def get_entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def lookup(self, key):
+        marker = os.path.join(self.get_entry(key), self.MARKER)
+        try:
+            with open(marker, encoding='utf-8') as fp:
+                info = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(info['program']):
+            return None
+        # The marker's mtime orders entries for pruning.
+        os.utime(marker)
+        return info
+
+    def create(self, key):
+        entry = self.get_entry(key)
+        if os.path.exists(entry):
+            self.logger.error("Remove incomplete build %s" % entry)
+            self.remove(entry)
+        self.app.safe_makedirs(entry)
+        return entry
+
+    def commit(self, key, info):
+        entry = self.get_entry(key)
+        fd, tmp = tempfile.mkstemp(dir=entry, prefix='.build-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+            json.dump(info, fp, indent=2, sort_keys=True)
+        os.replace(tmp, os.path.join(entry, self.MARKER))
+
+    def remove(self, entry):
+        src_dir = os.path.join(entry, 'src')
+        if os.path.exists(src_dir):
+            self.app.repository.remove_worktree(src_dir)
+        _utils.safe_rmtree(entry)
+
+    def prune(self, keep):
+        """Remove the least recently used builds beyond the cache size."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name == keep:
+                continue
+            marker = os.path.join(self.directory, name, self.MARKER)
+            try:
+                entries.append((os.stat(marker).st_mtime, name))
+            except OSError:
+                # Incomplete, or a build in progress in another process.
+                continue
+        entries.sort(reverse=True)
+        for _, name in entries[max(self.size - 1, 0):]:
+            self.logger.error("Remove cached build %s" % name)
+            self.remove(self.get_entry(name))
+
+
 class BenchmarkRevision(Application):
 
     _dryrun = False
+    build_cache = None
 
     def __init__(self, conf, revision, branch=None, patch=None,
                  setup_log=True, filename=None, commit_date=None,
@@ -426,6 +547,9 @@ class BenchmarkRevision(Application):
         self.patch = patch
         self.exitcode = 0
         self.uploaded = False
+        # "all", or only the "build" or "bench" half (see BenchmarkAll).
+        self.phase = getattr(options, 'phase', None) or 'all'
+        self.timings = {}
 
         if setup_log:
             if branch:
@@ -492,22 +616,72 @@ class BenchmarkRevision(Application):
             self.filename = os.path.join(self.conf.json_dir, filename)
 
     def compile_install(self):
-        self.repository.checkout(self.revision)
+        if self.build_cache is None:
+            self.repository.checkout(self.revision)
 
-        # First: remove everything
-        _utils.safe_rmtree(self.conf.build_dir)
-        _utils.safe_rmtree(self.conf.prefix)
+            # First: remove everything
+            _utils.safe_rmtree(self.conf.build_dir)
+            _utils.safe_rmtree(self.conf.prefix)
 
+            self.python.patch(self.patch)
+            self.python.compile_install()
+            return
+
+        cache = self.build_cache
+        key = cache.get_key(self.revision, self.patch,
+                            self.python.get_config_args(None),
+                            self.python.get_make_args(),
+                            self.conf.install)
+        entry = cache.get_entry(key)
+        src_dir = os.path.join(entry, 'src')
+        build_dir = os.path.join(entry, 'build')
+        self.python = Python(self, self.conf,
+                             src_dir=src_dir,
+                             build_dir=build_dir,
+                             prefix=os.path.join(entry, 'prefix'))
+
+        info = cache.lookup(key)
+        if info is not None:
+            self.logger.error("Reuse cached build %s" % entry)
+            # The build directory is removed once Python is installed.
+            self.python.cwd = entry
+            self.python.program = info['program']
+            self.python.get_version()
+            if info['pyperformance'] != pyperformance.__version__:
+                self.python.install_performance()
+                info['pyperformance'] = pyperformance.__version__
+                cache.commit(key, info)
+            if self.phase != 'bench':
+                self.timings['build_saved'] = info['build_time']
+            return
+
+        start = time.monotonic()
+        cache.create(key)
+        self.repository.add_worktree(src_dir, self.revision)
         self.python.patch(self.patch)
         self.python.compile_install()
+        if self.conf.install:
+            # Not needed anymore to run the installed Python
+            self.repository.remove_worktree(src_dir)
+            _utils.safe_rmtree(build_dir)
+
+        cache.commit(key, {
+            'revision': self.revision,
+            'branch': self.branch,
+            'patch': self.patch,
+            'program': self.python.program,
+            'build_time': time.monotonic() - start,
+            'pyperformance': pyperformance.__version__,
+        })
+        cache.prune(key)
 
     def create_venv(self):
         # Create venv
         python = self.python.program
         if self._dryrun:
             program, exists = resolve_python(
-                self.conf.prefix if self.conf.install else None,
-                self.conf.build_dir,
+                self.python.prefix if self.conf.install else None,
+                self.python.build_dir,
             )
             if not python or not exists:
                 python = sys.executable
@@ -691,24 +865,50 @@ class BenchmarkRevision(Application):
             self.logger.error("Disable upload if Python is not installed")
             self.conf.upload = False
 
-        if self.conf.system_tune:
+        if self.conf.system_tune and self.phase != 'build':
             self.perf_system_tune()
 
+    @contextlib.contextmanager
+    def time_phase(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.monotonic() - start
+
+    def write_timings(self):
+        filename = getattr(self.options, 'timings', None)
+        if not filename:
+            return
+        with open(filename, 'w', encoding='utf-8') as fp:
+            json.dump(self.timings, fp)
+
     def compile_bench(self):
         self.python = Python(self, self.conf)
+        if self.conf.build_cache:
+            if GIT:
+                self.build_cache = BuildCache(self, self.conf.build_cache_dir,
+                                              self.conf.build_cache_size)
+            else:
+                self.logger.error("Build cache requires Git: disabled")
 
         if not self._dryrun:
-            try:
-                self.compile_install()
-            except SystemExit:
-                sys.exit(EXIT_COMPILE_ERROR)
-
-        if self.conf.venv:
-            python = self.create_venv()
-        else:
-            python = None
+            with self.time_phase('build'):
+                try:
+                    self.compile_install()
+                except SystemExit:
+                    sys.exit(EXIT_COMPILE_ERROR)
+        if self.phase == 'build':
+            return False
+
+        with self.time_phase('venv'):
+            if self.conf.venv:
+                python = self.create_venv()
+            else:
+                python = None
 
-        failed = self.run_benchmark(python)
+        with self.time_phase('benchmark'):
+            failed = self.run_benchmark(python)
         if self.conf.upload:
             self.upload()
         return failed
@@ -716,11 +916,18 @@ class BenchmarkRevision(Application):
     def main(self):
         self.start = time.monotonic()
 
-        self.prepare()
-        failed = self.compile_bench()
+        try:
+            self.prepare()
+            failed = self.compile_bench()
+        finally:
+            self.write_timings()
 
         dt = time.monotonic() - self.start
         dt = datetime.timedelta(seconds=dt)
+        if self.phase == 'build':
+            self.logger.error("Build completed in %s: %s"
+                              % (dt, self.python.program))
+            return
         self.logger.error("Benchmark completed in %s" % dt)
 
         if self.uploaded:
@@ -810,6 +1017,9 @@ def parse_config(filename, command):
             conf.jobs = getint('compile', 'jobs')
         except KeyError:
             conf.jobs = None
+        conf.build_affinity = getstr('compile', 'build_affinity', default='')
+        conf.build_cache = getboolean('compile', 'build_cache', False)
+        conf.build_cache_size = getint('compile', 'build_cache_size', '3')
 
         # [run_benchmark]
         conf.system_tune = getboolean('run_benchmark', 'system_tune', True)
@@ -823,6 +1033,7 @@ def parse_config(filename, command):
         conf.build_dir = os.path.join(conf.directory, 'build')
         conf.prefix = os.path.join(conf.directory, 'prefix')
         conf.venv = os.path.join(conf.directory, 'venv')
+        conf.build_cache_dir = os.path.join(conf.directory, 'build-cache')
 
         check_upload = conf.upload
     else:
@@ -851,6 +1062,14 @@ def parse_config(filename, command):
     if parse_compile_all:
         # [compile_all]
         conf.branches = getstr('compile_all', 'branches', '').split()
+        conf.pipeline = getboolean('compile_all', 'pipeline', False)
+        if conf.pipeline and conf.build_cache and conf.build_cache_size < 2:
+            # The build of revision N+1 prunes the cache while revision N,
+            # which runs from its cached build, is still being benchmarked.
+            print("ERROR: [compile_all] pipeline requires build_cache_size "
+                  "of at least 2 in the [compile] section of %s (got %s)"
+                  % (filename, conf.build_cache_size))
+            sys.exit(1)
         conf.revisions = []
         try:
             revisions = cfgobj.items('compile_all_revisions')
@@ -884,28 +1103,44 @@ class BenchmarkAll(Application):
         self.skipped = []
         self.failed = []
         self.timings = []
+        self.phase_timings = []
+        # Time spent in "pyperformance compile", overlapping or not
+        self.busy_time = 0.0
+        self.wall_time = None
         self.logger = logging.getLogger()
 
-    def benchmark(self, revision, branch):
-        if branch:
-            key = '%s-%s' % (branch, revision)
-        else:
-            key = revision
-
+    def run_compile(self, revision, branch, phase='all'):
         cmd = [sys.executable, '-m', 'pyperformance', 'compile',
                self.config_filename, revision, branch]
         if not self.conf.update:
             cmd.append('--no-update')
-        if not self.conf.system_tune:
+        if not self.conf.system_tune or phase == 'build':
             cmd.append('--no-tune')
+        if phase != 'all':
+            cmd.append('--phase=%s' % phase)
 
-        self.start = time.monotonic()
-        exitcode = self.run_nocheck(*cmd, log_stdout=False)
-        dt = time.monotonic() - self.start
+        fd, timings_file = tempfile.mkstemp(prefix='timings-', suffix='.json',
+                                            dir=self.conf.directory)
+        os.close(fd)
+        cmd.append('--timings=%s' % timings_file)
+        try:
+            start = time.monotonic()
+            exitcode = self.run_nocheck(*cmd, log_stdout=False)
+            dt = time.monotonic() - start
+            try:
+                with open(timings_file, encoding='utf-8') as fp:
+                    timings = json.load(fp)
+            except (OSError, ValueError):
+                timings = {}
+        finally:
+            os.unlink(timings_file)
+        self.busy_time += dt
 
         if exitcode:
             self.logger.error("Benchmark exit code: %s" % exitcode)
+        return exitcode, dt, timings
 
+    def record(self, key, exitcode, dt, timings):
         if exitcode == EXIT_ALREADY_EXIST:
             # Benchmark already uploaded
             self.skipped.append(key)
@@ -925,9 +1160,52 @@ class BenchmarkAll(Application):
         if exitcode == 0 or exitcode == EXIT_BENCH_ERROR:
             self.outputs.append((key, exitcode == EXIT_BENCH_ERROR))
             self.timings.append(dt)
+            self.phase_timings.append(timings)
         else:
             self.failed.append(key)
 
+    def get_key(self, revision, branch):
+        if branch:
+            return '%s-%s' % (branch, revision)
+        else:
+            return revision
+
+    def benchmark(self, revision, branch):
+        exitcode, dt, timings = self.run_compile(revision, branch)
+        self.record(self.get_key(revision, branch), exitcode, dt, timings)
+
+    def benchmark_pipelined(self, jobs):
+        """Compile the next revision while the current one is benchmarked.
+
+        Builds run one at a time in a worker thread ("compile --phase=build",
+        on the build_affinity CPUs) and land in the build cache.  Once its
+        build is done, a revision is benchmarked from the cached build
+        ("compile --phase=bench") while the next build goes on.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as builder:
+            def start_build(index):
+                if index >= len(jobs):
+                    return None
+                revision, branch = jobs[index]
+                return builder.submit(self.run_compile, revision, branch, 'build')
+
+            pending = start_build(0)
+            for index, (revision, branch) in enumerate(jobs):
+                key = self.get_key(revision, branch)
+                exitcode, build_dt, build_timings = pending.result()
+                # The first build fetched the repository: don't fetch again
+                # while another process is using it.
+                self.conf.update = False
+                pending = start_build(index + 1)
+                if exitcode:
+                    self.record(key, exitcode, build_dt, build_timings)
+                    continue
+
+                exitcode, dt, timings = self.run_compile(revision, branch, 'bench')
+                # The build happened in the build phase, not here.
+                timings.update(build_timings)
+                self.record(key, exitcode, build_dt + dt, timings)
+
     def report(self):
         for key in self.skipped:
             self.logger.error("Skipped: %s" % key)
@@ -959,6 +1237,27 @@ class BenchmarkAll(Application):
         self.logger.error(text)
         self.logger.error("- max: %s" % format_time(max(self.timings)))
 
+        self.logger.error("Phases:")
+        for name in ('build', 'venv', 'benchmark'):
+            total = sum(timings.get(name, 0) for timings in self.phase_timings)
+            text = "- %s: %s" % (name, format_time(total))
+            if name == 'build':
+                cached = [timings['build_saved']
+                          for timings in self.phase_timings
+                          if 'build_saved' in timings]
+                if cached:
+                    text += (" -- %s cached builds, %s saved"
+                             % (len(cached), format_time(sum(cached))))
+            self.logger.error(text)
+
+        if self.wall_time is not None:
+            overlap = self.busy_time - self.wall_time
+            if overlap > 0:
+                self.logger.error("- pipeline: %s saved by building "
+                                  "during benchmarks"
+                                  % format_time(overlap))
+            self.logger.error("- total: %s" % format_time(self.wall_time))
+
     def main(self):
         self.safe_makedirs(self.conf.directory)
 
@@ -973,13 +1272,23 @@ class BenchmarkAll(Application):
                               "configured for compile_all")
             sys.exit(1)
 
-        try:
-            for revision, branch in self.conf.revisions:
-                self.benchmark(revision, branch)
+        jobs = list(self.conf.revisions)
+        jobs.extend((branch, branch) for branch in self.conf.branches)
+
+        pipeline = self.conf.pipeline
+        if pipeline and not self.conf.build_cache:
+            self.logger.error("Pipeline requires the build cache: disabled")
+            pipeline = False
 
-            for branch in self.conf.branches:
-                self.benchmark(branch, branch)
+        start = time.monotonic()
+        try:
+            if pipeline:
+                self.benchmark_pipelined(jobs)
+            else:
+                for revision, branch in jobs:
+                    self.benchmark(revision, branch)
         finally:
+            self.wall_time = time.monotonic() - start
             self.report()
             if self.timings:
                 self.report_timings()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for bpe_tokeniser without pyperformance overhead.
+Heap-and-linked-list BPE encoding with a per-pre-token LRU cache, and training
+with incrementally updated pair counts (opt_versions/bpe_fast.py).
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.bpe_fast import DEFAULT_CACHE_SIZE, SimpleBytePairEncoding
+from bpe_tokeniser_clean import DATA, PATTERN, VOCAB_SIZE, read_corpus
+
+
+def train(data: str, vocab_size: int = VOCAB_SIZE, cache_size: int = DEFAULT_CACHE_SIZE):
+    enc = SimpleBytePairEncoding.train(data, vocab_size=vocab_size, pat_str=PATTERN,
+                                       cache_size=cache_size)
+
+    tokens = enc.encode("hello world")
+    assert enc.decode(tokens) == "hello world"
+
+    return enc, enc.encode(data)
+
+
+def bench_bpe_tokeniser(loops: int, data: str, vocab_size: int = VOCAB_SIZE,
+                        cache_size: int = DEFAULT_CACHE_SIZE) -> float:
+    range_it = range(loops)
+
+    t0 = time.perf_counter()
+    for _ in range_it:
+        train(data, vocab_size, cache_size)
+    return time.perf_counter() - t0
+
+
+def check(data: str, vocab_size: int = VOCAB_SIZE):
+    """The ranks and the tokens of data must match the reference exactly."""
+    import bpe_tokeniser_clean as ref
+    enc, tokens = train(data, vocab_size)
+    expected_enc, expected_tokens = ref.train(data, vocab_size)
+    if list(enc.mergeable_ranks.items()) != list(expected_enc.mergeable_ranks.items()):
+        raise Exception("trained ranks differ from the reference")
+    if tokens != expected_tokens:
+        raise Exception("tokens differ from the reference")
+    if enc.decode_bytes(tokens) != data.encode("utf-8"):
+        raise Exception("decode error!")
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=1)
+    p.add_argument("--corpus", default=DATA,
+                   help="UTF-8 text to train on and encode (default: data/frankenstein_intro.txt)")
+    p.add_argument("--size", type=int,
+                   help="repeat the corpus and cut it to SIZE characters")
+    p.add_argument("--vocab-size", type=int, default=VOCAB_SIZE,
+                   help="vocabulary size to train (default: %s)" % VOCAB_SIZE)
+    p.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                   help="pre-tokens kept in the encoder's LRU cache, 0 to disable "
+                        "(default: %s)" % DEFAULT_CACHE_SIZE)
+    p.add_argument("--check", action="store_true",
+                   help="also train and encode with the pure-Python reference and compare")
+    args = p.parse_args()
+    data = read_corpus(args.corpus, args.size)
+    elapsed = bench_bpe_tokeniser(args.loops, data, args.vocab_size, args.cache_size)
+    print("bpe_tokeniser: %.3f s, %.3f MB/s"
+          % (elapsed, args.loops * len(data.encode("utf-8")) / elapsed / 1e6))
+    if args.check:
+        check(data, args.vocab_size)
+    print(f"BPE tokeniser benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+BPE tokeniser with heap-driven encoding and incremental training.
+
+Same results as the reference in run_benchmark.py, token for token and rank
+for rank:
+
+  bpe_encode - the parts of a word are a linked list of byte spans
+               (start -> end, start -> previous start) and the candidate
+               merges sit in a min-heap keyed by (rank, start), which is the
+               reference's choice: the lowest rank, leftmost first. Entries
+               left behind by earlier merges are dropped when popped, so a
+               word of n bytes costs O(n log n) instead of O(n^2).
+               SimpleBytePairEncoding caches the tokens of each pre-token
+               (LRU, cache_size entries).
+  bpe_train  - the distinct pre-tokens are kept once, with their counts.
+               Pair counts and the words each pair occurs in are built once
+               and then updated only around each merge site. The most common
+               pair comes from a lazy max-heap keyed by (count, first
+               occurrence), the reference's tie-break; a pair's count and
+               first occurrence only get worse until it is merged, so stale
+               entries are corrected when they reach the top.
+"""
+from __future__ import annotations
+
+import collections
+import functools
+import heapq
+import re
+
+__all__ = ["SimpleBytePairEncoding", "bpe_encode", "bpe_train"]
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+class SimpleBytePairEncoding:
+    def __init__(self, *, pat_str: str, mergeable_ranks: dict[bytes, int],
+                 cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.pat_str = pat_str
+        self.mergeable_ranks = mergeable_ranks
+
+        self._decoder = {token: token_bytes for token_bytes, token in mergeable_ranks.items()}
+        self._pat = re.compile(pat_str)
+        self._encode_word = functools.lru_cache(maxsize=cache_size)(self._bpe_word)
+
+    def _bpe_word(self, word: str) -> tuple[int, ...]:
+        return tuple(bpe_encode(self.mergeable_ranks, word.encode("utf-8")))
+
+    def encode(self, text: str) -> list[int]:
+        tokens = []
+        extend = tokens.extend
+        encode_word = self._encode_word
+        for word in self._pat.findall(text):
+            extend(encode_word(word))
+        return tokens
+
+    def decode_bytes(self, tokens: list[int]) -> bytes:
+        return b"".join(self._decoder[token] for token in tokens)
+
+    def decode(self, tokens: list[int]) -> str:
+        return self.decode_bytes(tokens).decode("utf-8", errors="replace")
+
+    @staticmethod
+    def train(training_data: str, vocab_size: int, pat_str: str,
+              cache_size: int = DEFAULT_CACHE_SIZE):
+        mergeable_ranks = bpe_train(data=training_data, vocab_size=vocab_size, pat_str=pat_str)
+        return SimpleBytePairEncoding(pat_str=pat_str, mergeable_ranks=mergeable_ranks,
+                                      cache_size=cache_size)
+
+
+def bpe_encode(mergeable_ranks: dict[bytes, int], input: bytes) -> list[int]:
+    n = len(input)
+    if n < 2:
+        return [mergeable_ranks[input]] if n else []
+    get = mergeable_ranks.get
+    # part starting at byte i covers input[i:end[i]]; end[i] is -1 once i is merged away
+    end = list(range(1, n + 1))
+    prev = list(range(-1, n - 1))
+    heap = []
+    for i in range(n - 1):
+        rank = get(input[i:i + 2])
+        if rank is not None:
+            heap.append((rank, i, i + 2))
+    heapq.heapify(heap)
+
+    while heap:
+        # (rank, start of the left part, end of the right part)
+        rank, i, e = heapq.heappop(heap)
+        j = end[i]
+        if j < 0 or j >= n or end[j] != e:
+            continue
+        end[i] = e
+        end[j] = -1
+        if e < n:
+            prev[e] = i
+            rank = get(input[i:end[e]])
+            if rank is not None:
+                heapq.heappush(heap, (rank, i, end[e]))
+        if i:
+            p = prev[i]
+            rank = get(input[p:e])
+            if rank is not None:
+                heapq.heappush(heap, (rank, p, e))
+
+    tokens = []
+    i = 0
+    while i < n:
+        tokens.append(mergeable_ranks[input[i:end[i]]])
+        i = end[i]
+    return tokens
+
+
+def bpe_train(data: str, vocab_size: int, pat_str: str) -> dict[bytes, int]:
+    if vocab_size < 2**8:
+        raise ValueError("vocab_size must be at least 256, so we can encode all bytes")
+    ranks = {}
+    for i in range(2**8):
+        ranks[bytes([i])] = i
+
+    # Words are lists of token ids; ids 0-255 are the single bytes. A merge
+    # whose bytes are already a token (b"a" + b"bc" after b"ab" + b"c") reuses
+    # that token's id, as the reference's bytes do.
+    vocab = [bytes([i]) for i in range(2**8)]
+    lengths = [1] * 2**8
+    ids = {token_bytes: i for i, token_bytes in enumerate(vocab)}
+
+    # distinct pre-tokens in order of first appearance, which orders first occurrences
+    word_counts = collections.Counter(re.findall(pat_str, data))
+    words = [list(word.encode("utf-8")) for word in word_counts]
+    freqs = list(word_counts.values())
+
+    pair_counts = {}
+    where = {}  # pair => {word index: occurrences in that word}
+    for wid, word in enumerate(words):
+        f = freqs[wid]
+        for pair in zip(word[:-1], word[1:]):
+            pair_counts[pair] = pair_counts.get(pair, 0) + f
+            occ = where.setdefault(pair, {})
+            occ[wid] = occ.get(wid, 0) + 1
+
+    def offset_in(word, pair):
+        a, b = pair
+        offset = 0
+        for k in range(len(word) - 1):
+            if word[k] == a and word[k + 1] == b:
+                return offset
+            offset += lengths[word[k]]
+
+    def first_occurrence(pair):
+        # the reference's Counter is filled word by word, pair by pair, and
+        # max() returns the first of the most common pairs in that order
+        wid = min(where[pair])
+        return wid, offset_in(words[wid], pair)
+
+    def update(pair, wid, f, delta):
+        count = pair_counts.get(pair, 0) + delta * f
+        occ = where.setdefault(pair, {})
+        n = occ.get(wid, 0) + delta
+        if count:
+            pair_counts[pair] = count
+        else:
+            del pair_counts[pair]
+        if n:
+            occ[wid] = n
+        else:
+            del occ[wid]
+            if not occ:
+                del where[pair]
+
+    heap = [(-count, *first_occurrence(pair), pair) for pair, count in pair_counts.items()]
+    heapq.heapify(heap)
+
+    while len(ranks) < vocab_size:
+        # Find the most common pair. This will become our next token
+        while True:
+            if not heap:
+                raise ValueError("no pair left to merge")
+            neg_count, wid, offset, pair = heap[0]
+            count = pair_counts.get(pair)
+            if count is None:
+                heapq.heappop(heap)
+                continue
+            occ = where[pair]
+            if wid in occ:
+                key = (-count, wid, offset_in(words[wid], pair))
+            else:
+                key = (-count, *first_occurrence(pair))
+            if key == (neg_count, wid, offset):
+                heapq.heappop(heap)
+                break
+            heapq.heapreplace(heap, (*key, pair))
+
+        a, b = pair
+        token_bytes = vocab[a] + vocab[b]
+        token = len(ranks)
+        # Add the new token!
+        ranks[token_bytes] = token
+        z = ids.get(token_bytes)
+        if z is None:
+            z = ids[token_bytes] = len(vocab)
+            vocab.append(token_bytes)
+            lengths.append(len(token_bytes))
+
+        # Merge left to right in every word holding the pair, adjusting only
+        # the pairs on either side of each merge site.
+        del pair_counts[pair]
+        touched = set()
+        for wid in where.pop(pair):
+            word = words[wid]
+            f = freqs[wid]
+            new_word = []
+            i = 0
+            n = len(word)
+            while i < n:
+                if i < n - 1 and word[i] == a and word[i + 1] == b:
+                    if new_word:
+                        left = new_word[-1]
+                        update((left, a), wid, f, -1)
+                        update((left, z), wid, f, 1)
+                        touched.add((left, z))
+                    if i + 2 < n:
+                        right = word[i + 2]
+                        if (b, right) != pair:
+                            update((b, right), wid, f, -1)
+                        update((z, right), wid, f, 1)
+                        touched.add((z, right))
+                    new_word.append(z)
+                    i += 2
+                else:
+                    new_word.append(word[i])
+                    i += 1
+            words[wid] = new_word
+
+        # pairs with the new token gained occurrences, so they get exact entries
+        for new_pair in touched:
+            if new_pair in pair_counts:
+                heapq.heappush(heap, (-pair_counts[new_pair], *first_occurrence(new_pair), new_pair))
+
+    return ranks
@@ -0,0 +1,54 @@
+"""
+Benchmark a BPE tokeniser: heap-and-linked-list encoding with a per-pre-token
+LRU cache, and incrementally updated pair counts in training
+(opt_versions/bpe_fast.py).
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyperf
+
+from opt_versions.bpe_fast import DEFAULT_CACHE_SIZE, SimpleBytePairEncoding
+
+PATTERN = (
+    r"""'s|'t|'re|'ve|'m|'ll|'d| ?[a-zA-Z]+| ?\d+| ?[^\sa-zA-Z\d]+|\s+(?!\S)|\s+"""
+)
+
+
+def train(data: str, cache_size: int):
+    enc = SimpleBytePairEncoding.train(data, vocab_size=1024, pat_str=PATTERN,
+                                       cache_size=cache_size)
+
+    tokens = enc.encode("hello world")
+    assert enc.decode(tokens) == "hello world"
+
+    enc.encode(data)
+
+
+def bench_bpe_tokeniser(loops: int, cache_size: int) -> float:
+    DATA = Path(__file__).parent / "data" / "frankenstein_intro.txt"
+    with open(DATA, "r", encoding="utf8") as f:
+        data = f.read()
+
+    range_it = range(loops)
+
+    t0 = pyperf.perf_counter()
+    for _ in range_it:
+        train(data, cache_size)
+    return pyperf.perf_counter() - t0
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--cache-size", str(args.cache_size)))
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata["description"] = "Benchmark a BPE tokeniser (heap encoder, incremental training)"
+    runner.argparser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                                  help="pre-tokens kept in the encoder's LRU cache, "
+                                       "0 to disable (default: %s)" % DEFAULT_CACHE_SIZE)
+
+    args = runner.parse_args()
+    runner.bench_time_func("bpe_tokeniser", bench_bpe_tokeniser, args.cache_size)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Offload-emulation benchmark for crypto_pyaes without pyperformance overhead.
+CTR keystream comes from a stand-in accelerator process (opt_versions/aes_offload.py).
+
+Default mode runs the same workload as the other drivers. --sweep instead times
+each batch size against the in-process aes_opt2 path and reports the smallest
+batch size at which offload wins.
+"""
+
+import argparse
+import sys
+import os
+import time
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.aes_opt2 import AESModeOfOperationCTR as InProcessCTR
+from opt_versions.aes_offload import AESModeOfOperationCTR, OffloadBackend, DeviceModel
+
+# 23,000 bytes
+SENTENCE = b"This is a test. What could possibly go wrong? "
+CLEARTEXT = SENTENCE * 500
+
+# 128-bit key (16 bytes)
+KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
+
+
+def make_cleartext(size):
+    """SENTENCE repeated and cut to exactly size bytes (for --size sweeps)."""
+    return (SENTENCE * (size // len(SENTENCE) + 1))[:size]
+
+
+def bench_pyaes(loops, backend, cleartext=CLEARTEXT):
+    for _ in range(loops):
+        aes = AESModeOfOperationCTR(KEY, backend=backend)
+        ciphertext = aes.encrypt(cleartext)
+
+        # need to reset IV for decryption
+        aes = AESModeOfOperationCTR(KEY, backend=backend)
+        plaintext = aes.decrypt(ciphertext)
+
+        # explicitly destroy the pyaes object
+        aes = None
+
+    # Verify correctness
+    if plaintext != cleartext:
+        raise Exception("decrypt error!")
+    return ciphertext
+
+
+def bench_in_process(loops):
+    for _ in range(loops):
+        aes = InProcessCTR(KEY)
+        ciphertext = aes.encrypt(CLEARTEXT)
+        aes = InProcessCTR(KEY)
+        plaintext = aes.decrypt(ciphertext)
+    if plaintext != CLEARTEXT:
+        raise Exception("decrypt error!")
+    return ciphertext
+
+
+def best_time(repeat, func, *args):
+    """(result, best wall time) over repeat calls of func(*args)."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return result, best
+
+
+def sweep(loops, batch_sizes, queue_depth, model, repeat=3):
+    # both sides are warmed up untimed and then timed as the best of repeat runs
+    bench_in_process(1)
+    reference, t_ref = best_time(repeat, bench_in_process, loops)
+    print(f"in-process aes_opt2: {t_ref:.4f}s for {loops} loops (best of {repeat})")
+    print(f"device model: {model}, queue depth {queue_depth}")
+    print(f"{'batch':>8} {'batches':>9} {'time (s)':>10} {'vs opt2':>8}")
+
+    crossover = None
+    for batch in batch_sizes:
+        with OffloadBackend(KEY, batch_blocks=batch, queue_depth=queue_depth, model=model) as backend:
+            bench_pyaes(1, backend)  # warm up the device (numba load, page faults)
+            backend.batches = 0
+            ciphertext, dt = best_time(repeat, bench_pyaes, loops, backend)
+            batches = backend.batches // repeat
+        if ciphertext != reference:
+            raise Exception("offload keystream differs from aes_opt2!")
+        speedup = t_ref / dt
+        print(f"{batch:>8} {batches:>9} {dt:>10.4f} {speedup:>7.2f}x")
+        if crossover is None and dt < t_ref:
+            crossover = batch
+
+    if crossover is None:
+        print("offload never beats aes_opt2 for the swept batch sizes")
+    else:
+        print(f"offload beats aes_opt2 from batch size {crossover} blocks "
+              f"({crossover * 16} bytes per doorbell)")
+    return crossover
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=100)
+    p.add_argument("--size", type=int, default=len(CLEARTEXT),
+                   help="bytes encrypted and decrypted per loop, without --sweep (default: %(default)s)")
+    p.add_argument("--batch", type=int, default=64, help="blocks per batch (default: 64)")
+    p.add_argument("--queue-depth", type=int, default=4, help="ring slots in flight (default: 4)")
+    p.add_argument("--latency-us", type=float, default=20.0, help="device latency per batch (default: 20)")
+    p.add_argument("--throughput-mbps", type=float, default=1000.0,
+                   help="device streaming throughput in MB/s (default: 1000)")
+    p.add_argument("--sweep", default=None, metavar="B1,B2,...",
+                   help="sweep these batch sizes against aes_opt2, e.g. 1,4,16,64,256,1024")
+    p.add_argument("--repeat", type=int, default=3,
+                   help="timed runs per point of --sweep, best one kept (default: 3)")
+    args = p.parse_args()
+
+    model = DeviceModel(args.latency_us, args.throughput_mbps)
+    if args.sweep:
+        batch_sizes = [int(b) for b in args.sweep.split(",") if b.strip()]
+        sweep(args.loops, batch_sizes, args.queue_depth, model, max(1, args.repeat))
+        return
+
+    with OffloadBackend(KEY, batch_blocks=args.batch, queue_depth=args.queue_depth, model=model) as backend:
+        bench_pyaes(args.loops, backend, make_cleartext(args.size))
+    print(f"Crypto pyaes offload benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
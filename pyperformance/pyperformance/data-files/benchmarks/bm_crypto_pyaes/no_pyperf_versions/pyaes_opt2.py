@@ -11,16 +11,22 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from opt_versions.aes_opt2 import AESModeOfOperationCTR
 
 # 23,000 bytes
-CLEARTEXT = b"This is a test. What could possibly go wrong? " * 500
+SENTENCE = b"This is a test. What could possibly go wrong? "
+CLEARTEXT = SENTENCE * 500
 
 # 128-bit key (16 bytes)
 KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
 
 
-def bench_pyaes(loops):
+def make_cleartext(size):
+    """SENTENCE repeated and cut to exactly size bytes (for --size sweeps)."""
+    return (SENTENCE * (size // len(SENTENCE) + 1))[:size]
+
+
+def bench_pyaes(loops, cleartext=CLEARTEXT):
     for _ in range(loops):
         aes = AESModeOfOperationCTR(KEY)
-        ciphertext = aes.encrypt(CLEARTEXT)
+        ciphertext = aes.encrypt(cleartext)
 
         # need to reset IV for decryption
         aes = AESModeOfOperationCTR(KEY)
@@ -30,16 +36,20 @@ def bench_pyaes(loops):
         aes = None
 
     # Verify correctness
-    if plaintext != CLEARTEXT:
+    if plaintext != cleartext:
         raise Exception("decrypt error!")
 
 
 def main():
-    import sys
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
     # Default to 100 loops, but allow override from command line
-    loops = int(sys.argv[1]) if len(sys.argv) > 1 else 100
-    bench_pyaes(loops)
-    print(f"Crypto pyaes benchmark completed with {loops} loops")
+    p.add_argument("loops", nargs="?", type=int, default=100)
+    p.add_argument("--size", type=int, default=len(CLEARTEXT),
+                   help="bytes encrypted and decrypted per loop (default: %(default)s)")
+    args = p.parse_args()
+    bench_pyaes(args.loops, make_cleartext(args.size))
+    print(f"Crypto pyaes benchmark completed with {args.loops} loops")
 
 
 if __name__ == "__main__":
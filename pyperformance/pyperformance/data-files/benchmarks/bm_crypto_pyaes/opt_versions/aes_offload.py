@@ -0,0 +1,240 @@
+# Offload emulation for the AES accelerator (benchmark_reports/hardware_drawings/AES.png).
+#
+# The modes of operation only ever need one thing from the cipher: "encrypt
+# these 16-byte blocks". This module makes that a pluggable backend:
+#
+#   InProcessBackend  - the aes_opt2 numba block cipher, one call per block,
+#                       i.e. exactly what aes_opt2.AESModeOfOperationCTR does.
+#   OffloadBackend    - a stand-in "device" process. The host writes batches of
+#                       counter blocks into a shared-memory request ring, rings
+#                       a doorbell, and reads keystream back from a response
+#                       ring. The device answers no faster than a configurable
+#                       latency/throughput model, so the host side sees the
+#                       cost of the interface (batching, queue depth, copies).
+#
+# AESModeOfOperationCTR below is the CTR mode with a backend plugged in: it
+# builds counter blocks for a whole batch up front instead of asking the
+# cipher for one block at a time.
+
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+from numba import njit
+
+from opt_versions.aes_opt2 import (AES, AESBlockModeOfOperation, Counter,
+                                   _encrypt_block_numba)
+
+__all__ = ["BlockCipherBackend", "InProcessBackend", "OffloadBackend",
+           "DeviceModel", "AESModeOfOperationCTR"]
+
+BLOCK = 16
+
+
+@njit(cache=True)
+def _encrypt_blocks_numba(blocks_u8, out_u8, Ke_u32, T1, T2, T3, T4, S):
+    '''Encrypt n blocks (uint8[n, 16]) into out_u8 (uint8[n, 16]).'''
+    for i in range(blocks_u8.shape[0]):
+        out_u8[i, :] = _encrypt_block_numba(blocks_u8[i], Ke_u32, T1, T2, T3, T4, S)
+
+
+def _cipher_tables(aes):
+    return (aes._Ke_np, aes._T1_np, aes._T2_np, aes._T3_np, aes._T4_np, aes._S_np)
+
+
+class BlockCipherBackend(object):
+    '''Encrypts batches of 16-byte blocks; the only thing CTR needs from AES.'''
+
+    def encrypt_blocks(self, blocks):
+        '''blocks: bytes of length 16 * n. Returns n encrypted blocks as bytes.'''
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class InProcessBackend(BlockCipherBackend):
+    '''The aes_opt2 path: one numba call per block, inside this process.'''
+
+    def __init__(self, key):
+        self._aes = AES(key)
+
+    def encrypt_blocks(self, blocks):
+        encrypt = self._aes.encrypt
+        return b"".join(encrypt(blocks[i:i + BLOCK])
+                        for i in range(0, len(blocks), BLOCK))
+
+
+class DeviceModel(object):
+    '''Per-batch service time of the emulated accelerator.
+
+       o latency_us      fixed cost per batch (doorbell, DMA setup, pipeline fill)
+       o throughput_mbps streaming rate once the pipeline is full (MB/s)'''
+
+    def __init__(self, latency_us=20.0, throughput_mbps=1000.0):
+        self.latency_us = latency_us
+        self.throughput_mbps = throughput_mbps
+
+    def batch_seconds(self, nbytes):
+        t = self.latency_us * 1e-6
+        if self.throughput_mbps > 0:
+            t += nbytes / (self.throughput_mbps * 1e6)
+        return t
+
+    def __repr__(self):
+        return "DeviceModel(latency_us=%r, throughput_mbps=%r)" % (
+            self.latency_us, self.throughput_mbps)
+
+
+def _device_main(key, req_name, resp_name, slot_bytes, model, doorbell, completion):
+    '''Device stand-in: serve batches from the request ring until told to stop.'''
+    req = shared_memory.SharedMemory(name=req_name)
+    resp = shared_memory.SharedMemory(name=resp_name)
+    try:
+        tables = _cipher_tables(AES(key))
+        req_buf = np.ndarray((req.size,), dtype=np.uint8, buffer=req.buf)
+        resp_buf = np.ndarray((resp.size,), dtype=np.uint8, buffer=resp.buf)
+        while True:
+            msg = doorbell.get()
+            if msg is None:
+                break
+            slot, nblocks = msg
+            start = time.perf_counter()
+            base = slot * slot_bytes
+            nbytes = nblocks * BLOCK
+            src = req_buf[base:base + nbytes].reshape(nblocks, BLOCK)
+            dst = resp_buf[base:base + nbytes].reshape(nblocks, BLOCK)
+            _encrypt_blocks_numba(src, dst, *tables)
+            # The device is never faster than its model; if the stand-in is
+            # slower, the measurement is bounded by the stand-in (reported).
+            remaining = model.batch_seconds(nbytes) - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+            completion.put(slot)
+    finally:
+        del req_buf, resp_buf
+        req.close()
+        resp.close()
+
+
+class OffloadBackend(BlockCipherBackend):
+    '''Host side of the emulated accelerator.
+
+       o batch_blocks  blocks per doorbell (one ring slot)
+       o queue_depth   ring slots, i.e. batches allowed in flight
+       o model         DeviceModel giving the device's per-batch service time'''
+
+    def __init__(self, key, batch_blocks=64, queue_depth=4, model=None):
+        if batch_blocks < 1 or queue_depth < 1:
+            raise ValueError('batch_blocks and queue_depth must be positive')
+        self.batch_blocks = batch_blocks
+        self.queue_depth = queue_depth
+        self.model = model or DeviceModel()
+        self.batches = 0
+
+        self._slot_bytes = batch_blocks * BLOCK
+        size = self._slot_bytes * queue_depth
+        self._req = shared_memory.SharedMemory(create=True, size=size)
+        self._resp = shared_memory.SharedMemory(create=True, size=size)
+        self._doorbell = multiprocessing.Queue()
+        self._completion = multiprocessing.Queue()
+        self._device = multiprocessing.Process(
+            target=_device_main,
+            args=(bytes(key), self._req.name, self._resp.name, self._slot_bytes,
+                  self.model, self._doorbell, self._completion),
+            daemon=True,
+        )
+        self._device.start()
+
+    def encrypt_blocks(self, blocks):
+        total = len(blocks)
+        if total % BLOCK:
+            raise ValueError('blocks must be a multiple of 16 bytes')
+        out = bytearray(total)
+        slot_bytes = self._slot_bytes
+        req_buf = self._req.buf
+        resp_buf = self._resp.buf
+
+        # Batches are served FIFO, so completions come back in submit order.
+        inflight = []   # (slot, out_offset, nbytes)
+        offset = 0
+        next_slot = 0
+        while offset < total or inflight:
+            while offset < total and len(inflight) < self.queue_depth:
+                nbytes = min(slot_bytes, total - offset)
+                base = next_slot * slot_bytes
+                req_buf[base:base + nbytes] = blocks[offset:offset + nbytes]
+                self._doorbell.put((next_slot, nbytes // BLOCK))
+                inflight.append((next_slot, offset, nbytes))
+                self.batches += 1
+                offset += nbytes
+                next_slot = (next_slot + 1) % self.queue_depth
+            slot, out_off, nbytes = inflight.pop(0)
+            done = self._completion.get()
+            assert done == slot, (done, slot)
+            base = slot * slot_bytes
+            out[out_off:out_off + nbytes] = resp_buf[base:base + nbytes]
+        return bytes(out)
+
+    def close(self):
+        if self._device is None:
+            return
+        self._doorbell.put(None)
+        self._device.join()
+        self._device = None
+        for shm in (self._req, self._resp):
+            shm.close()
+            shm.unlink()
+
+
+class AESModeOfOperationCTR(AESBlockModeOfOperation):
+    '''AES Counter Mode of Operation on top of a BlockCipherBackend.
+
+       Same keystream as aes_opt2.AESModeOfOperationCTR for the same key and
+       counter, but counter blocks are generated and encrypted a batch at a
+       time, which is what an accelerator interface needs.'''
+
+    name = "Counter (CTR)"
+
+    def __init__(self, key, counter=None, backend=None):
+        if backend is None:
+            backend = InProcessBackend(key)
+        if counter is None:
+            counter = Counter()
+
+        self._backend = backend
+        self._counter = int.from_bytes(bytes(counter.value), 'big')
+        self._batch_blocks = getattr(backend, 'batch_blocks', 64)
+        self._remaining_counter = b''
+
+    def _counter_blocks(self, n):
+        c = self._counter
+        blocks = b"".join(((c + i) & ((1 << 128) - 1)).to_bytes(BLOCK, 'big')
+                          for i in range(n))
+        self._counter = (c + n) & ((1 << 128) - 1)
+        return blocks
+
+    def encrypt(self, plaintext):
+        need = len(plaintext) - len(self._remaining_counter)
+        if need > 0:
+            nblocks = -(-need // BLOCK)
+            # Round up to whole batches so the device always sees full slots.
+            nblocks = -(-nblocks // self._batch_blocks) * self._batch_blocks
+            self._remaining_counter += self._backend.encrypt_blocks(self._counter_blocks(nblocks))
+
+        n = len(plaintext)
+        ks = np.frombuffer(self._remaining_counter, dtype=np.uint8, count=n)
+        encrypted = np.bitwise_xor(np.frombuffer(plaintext, dtype=np.uint8), ks).tobytes()
+        self._remaining_counter = self._remaining_counter[n:]
+        return encrypted
+
+    def decrypt(self, crypttext):
+        # AES-CTR is symetric
+        return self.encrypt(crypttext)
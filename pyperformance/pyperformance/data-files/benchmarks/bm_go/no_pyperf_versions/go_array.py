@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for go without pyperformance overhead.
+UCT search on a flat bytearray board with neighbour tuples, array union-find
+and zobrist strings in one list; --workers runs root-parallel trees in a
+process pool (opt_versions/go_array.py).
+"""
+
+import os
+import sys
+import time
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.go_array import GAMES, PASS, RootParallelUCT, search, to_xy
+
+
+def bench_go(loops, seed=1, games=GAMES, workers=1):
+    # the pool is started once; its start-up is not part of the workload
+    with RootParallelUCT(workers) as uct:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            pos = uct.best_move((), games, seed)
+        dt = time.perf_counter() - t0
+    return pos, uct.moves, dt
+
+
+def check(seed=1, games=GAMES):
+    """One tree must match the reference's: same visits per root child, same move."""
+    import go_clean as ref
+    visits, moves = search([], games, seed)
+
+    ref.random.seed(seed)
+    board = ref.Board()
+    if board.random_move() == ref.PASS:
+        expected = None
+    else:
+        tree = ref.UCTNode()
+        tree.unexplored = board.useful_moves()
+        nboard = ref.Board()
+        for game in range(games):
+            nboard.reset()
+            nboard.replay(board.history)
+            tree.play(nboard)
+        expected = [child.wins + child.losses if child else 0 for child in tree.pos_child]
+    if visits != expected:
+        raise Exception("root visits differ from the reference")
+    if expected is not None and \
+            max(range(len(visits)), key=visits.__getitem__) != tree.best_visited().pos:
+        raise Exception("move differs from the reference")
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=1)
+    p.add_argument("--games", type=int, default=GAMES,
+                   help="UCT playouts per move, split over the workers (default: %d)" % GAMES)
+    p.add_argument("--seed", type=int, default=1,
+                   help="random seed; tree k uses seed + k (default: 1)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="independent root-parallel trees, one process each "
+                        "(default: 1, the reference's single tree)")
+    p.add_argument("--check", action="store_true",
+                   help="also search one tree with the reference and require the same "
+                        "root visit counts and move")
+    args = p.parse_args()
+    pos, moves, dt = bench_go(args.loops, args.seed, args.games, args.workers)
+    print("go: move %s, %d moves, %.3f s, %.0f moves/s"
+          % (to_xy(pos) if pos != PASS else "pass", moves, dt, moves / dt))
+    if args.check:
+        check(args.seed, args.games)
+    print(f"Go benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
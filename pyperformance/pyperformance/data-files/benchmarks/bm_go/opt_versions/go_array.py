@@ -0,0 +1,452 @@
+"""
+Go board on flat arrays, with root-parallel UCT.
+
+The reference gives every point a Square object with a neighbours list and
+a `reference` pointer for its group. Here the board is a set of arrays
+indexed by point:
+
+  colors       bytearray, EMPTY/WHITE/BLACK
+  reference    union-find parent of the point's group (roots point to
+               themselves), ledges the root's pseudo-liberties
+  timestamp/temp_ledges/removestamp
+               the scratch fields of Board.useful()
+  NEIGHBOURS   the neighbour points of each point, as tuples
+  zobrist      three random strings per point, flat (3 * pos + color)
+
+Board and UCTNode follow the reference step by step and draw the same
+random numbers in the same order (the zobrist strings included), so with the
+same seed one search tree picks the same move as the reference.
+
+RootParallelUCT runs independent trees in a process pool, each with its own
+seed (seed + k for tree k) and its share of the playouts, and picks the
+move with the most visits summed over the trees. With one worker the tree
+runs in-process and is the reference's search.
+"""
+
+import math
+import multiprocessing
+import random
+
+__all__ = ["Board", "UCTNode", "RootParallelUCT", "search", "to_pos", "to_xy",
+           "SIZE", "GAMES", "PASS", "EMPTY", "WHITE", "BLACK"]
+
+SIZE = 9
+GAMES = 200
+KOMI = 7.5
+EMPTY, WHITE, BLACK = 0, 1, 2
+SHOW = {EMPTY: '.', WHITE: 'o', BLACK: 'x'}
+PASS = -1
+MAXMOVES = SIZE * SIZE * 3
+POINTS = SIZE * SIZE
+
+
+def to_pos(x, y):
+    return y * SIZE + x
+
+
+def to_xy(pos):
+    y, x = divmod(pos, SIZE)
+    return x, y
+
+
+def _neighbours(pos):
+    x, y = pos % SIZE, pos // SIZE
+    return tuple(to_pos(x + dx, y + dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                 if 0 <= x + dx < SIZE and 0 <= y + dy < SIZE)
+
+
+NEIGHBOURS = [_neighbours(pos) for pos in range(POINTS)]
+
+
+class Board:
+
+    def __init__(self):
+        # the reference's Square objects draw these, point by point
+        self.zobrist = [random.randrange(9223372036854775807) for i in range(3 * POINTS)]
+        self.empty_hash = 0
+        for pos in range(POINTS):
+            self.empty_hash ^= self.zobrist[3 * pos + EMPTY]
+        self.reference = list(range(POINTS))
+        self.ledges = [0] * POINTS
+        self.temp_ledges = [0] * POINTS
+        self.timestamp = [0] * POINTS
+        self.removestamp = [0] * POINTS
+        self.stamp = 0
+        self.moves = 0
+        self.reset()
+
+    def reset(self):
+        self.colors = bytearray(POINTS)
+        self.used = bytearray(POINTS)
+        self.empties = list(range(POINTS))
+        self.empty_pos = list(range(POINTS))
+        self.hash = self.empty_hash
+        self.hash_set = {self.hash}
+        self.color = BLACK
+        self.finished = False
+        self.lastmove = -2
+        self.history = []
+        self.white_dead = 0
+        self.black_dead = 0
+
+    def find(self, pos, update=False):
+        reference = self.reference
+        root = pos
+        while reference[root] != root:
+            root = reference[root]
+        if update:
+            while reference[pos] != root:
+                reference[pos], pos = root, reference[pos]
+        return root
+
+    def place(self, pos, color):
+        """The reference's Square.move: put a stone, merge groups, take captures."""
+        self.stamp += 1
+        self.moves += 1
+        colors = self.colors
+        reference = self.reference
+        ledges = self.ledges
+        self.hash ^= self.zobrist[3 * pos + colors[pos]] ^ self.zobrist[3 * pos + color]
+        colors[pos] = color
+        reference[pos] = pos
+        ledges[pos] = 0
+        self.used[pos] = 1
+        for neighbour in NEIGHBOURS[pos]:
+            neighcolor = colors[neighbour]
+            if neighcolor == EMPTY:
+                ledges[pos] += 1
+            else:
+                # find(neighbour, update=True), inlined
+                neighbour_ref = neighbour
+                while reference[neighbour_ref] != neighbour_ref:
+                    neighbour_ref = reference[neighbour_ref]
+                node = neighbour
+                while reference[node] != neighbour_ref:
+                    reference[node], node = neighbour_ref, reference[node]
+                if neighcolor == color:
+                    if reference[neighbour_ref] != pos:
+                        ledges[pos] += ledges[neighbour_ref]
+                        reference[neighbour_ref] = pos
+                    ledges[pos] -= 1
+                else:
+                    ledges[neighbour_ref] -= 1
+                    if ledges[neighbour_ref] == 0:
+                        self.remove(neighbour, neighbour_ref)
+        self.hash_set.add(self.hash)
+
+    def remove(self, pos, reference, update=True):
+        """Take the group with root `reference` off the board, starting at pos.
+
+        With update=False only the hash changes (for the dupe test in useful()).
+        """
+        colors = self.colors
+        stamp = self.stamp
+        self.hash ^= self.zobrist[3 * pos + colors[pos]] ^ self.zobrist[3 * pos + EMPTY]
+        self.removestamp[pos] = stamp
+        if update:
+            colors[pos] = EMPTY
+            self.empty_pos[pos] = len(self.empties)
+            self.empties.append(pos)
+        for neighbour in NEIGHBOURS[pos]:
+            if colors[neighbour] != EMPTY and self.removestamp[neighbour] != stamp:
+                neighbour_ref = self.find(neighbour, update)
+                if neighbour_ref == reference:
+                    self.remove(neighbour, reference, update)
+                elif update:
+                    self.ledges[neighbour_ref] += 1
+
+    def move(self, pos):
+        if pos != PASS:
+            self.place(pos, self.color)
+            # EmptySet.remove
+            empties = self.empties
+            last = empties[len(empties) - 1]
+            i = self.empty_pos[pos]
+            empties[i] = last
+            self.empty_pos[last] = i
+            empties.pop()
+        elif self.lastmove == PASS:
+            self.finished = True
+        if self.color == BLACK:
+            self.color = WHITE
+        else:
+            self.color = BLACK
+        self.lastmove = pos
+        self.history.append(pos)
+
+    def random_move(self):
+        # EmptySet.random_choice: try random empty points, moving the useless
+        # ones to the end, until one is useful
+        empties = self.empties
+        empty_pos = self.empty_pos
+        colors = self.colors
+        used = self.used
+        rand = random.random
+        choices = len(empties)
+        while choices:
+            i = int(rand() * choices)
+            pos = empties[i]
+            if not used[pos]:
+                # useful_fast, inlined
+                for neighbour in NEIGHBOURS[pos]:
+                    if colors[neighbour] == EMPTY:
+                        return pos
+            if self.useful_slow(pos):
+                return pos
+            choices -= 1
+            last = empties[choices]
+            empties[i] = last
+            empty_pos[last] = i
+            empties[choices] = pos
+            empty_pos[pos] = choices
+        return PASS
+
+    def useful_fast(self, pos):
+        if not self.used[pos]:
+            colors = self.colors
+            for neighbour in NEIGHBOURS[pos]:
+                if colors[neighbour] == EMPTY:
+                    return True
+        return False
+
+    def useful(self, pos):
+        return self.useful_fast(pos) or self.useful_slow(pos)
+
+    def useful_slow(self, pos):
+        """useful() for a point that fails useful_fast(): would the move
+        capture, keep a liberty or connect, without repeating a position?"""
+        self.stamp += 1
+        stamp = self.stamp
+        colors = self.colors
+        neighbours = NEIGHBOURS[pos]
+        color = self.color
+        timestamp = self.timestamp
+        temp_ledges = self.temp_ledges
+        reference = self.reference
+        old_hash = self.hash
+        self.hash ^= self.zobrist[3 * pos + colors[pos]] ^ self.zobrist[3 * pos + color]
+        empties = opps = weak_opps = neighs = weak_neighs = 0
+        for neighbour in neighbours:
+            neighcolor = colors[neighbour]
+            if neighcolor == EMPTY:
+                empties += 1
+                continue
+            neighbour_ref = neighbour
+            while reference[neighbour_ref] != neighbour_ref:
+                neighbour_ref = reference[neighbour_ref]
+            if timestamp[neighbour_ref] != stamp:
+                if neighcolor == color:
+                    neighs += 1
+                else:
+                    opps += 1
+                timestamp[neighbour_ref] = stamp
+                temp_ledges[neighbour_ref] = self.ledges[neighbour_ref]
+            temp_ledges[neighbour_ref] -= 1
+            if temp_ledges[neighbour_ref] == 0:
+                if neighcolor == color:
+                    weak_neighs += 1
+                else:
+                    weak_opps += 1
+                    self.remove(neighbour_ref, neighbour_ref, update=False)
+        dupe = self.hash in self.hash_set
+        self.hash = old_hash
+        strong_neighs = neighs - weak_neighs
+        strong_opps = opps - weak_opps
+        return not dupe and \
+            (empties or weak_opps or (strong_neighs and (strong_opps or weak_neighs)))
+
+    def useful_moves(self):
+        return [pos for pos in self.empties if self.useful(pos)]
+
+    def replay(self, history):
+        for pos in history:
+            self.move(pos)
+
+    def score(self, color):
+        if color == WHITE:
+            count = KOMI + self.black_dead
+        else:
+            count = self.white_dead
+        colors = self.colors
+        count += colors.count(color)
+        # empty points surrounded by color
+        for pos in self.empties:
+            for neighbour in NEIGHBOURS[pos]:
+                if colors[neighbour] != color:
+                    break
+            else:
+                count += 1
+        return count
+
+    def __repr__(self):
+        result = []
+        for y in range(SIZE):
+            start = to_pos(0, y)
+            result.append(''.join(
+                [SHOW[color] + ' ' for color in self.colors[start:start + SIZE]]))
+        return '\n'.join(result)
+
+
+class UCTNode:
+
+    def __init__(self):
+        self.bestchild = None
+        self.pos = -1
+        self.wins = 0
+        self.losses = 0
+        self.pos_child = [None] * POINTS
+        self.parent = None
+
+    def play(self, board):
+        """ uct tree search """
+        color = board.color
+        node = self
+        path = [node]
+        while True:
+            pos = node.select(board)
+            if pos == PASS:
+                break
+            board.move(pos)
+            child = node.pos_child[pos]
+            if not child:
+                child = node.pos_child[pos] = UCTNode()
+                child.unexplored = board.useful_moves()
+                child.pos = pos
+                child.parent = node
+                path.append(child)
+                break
+            path.append(child)
+            node = child
+        self.random_playout(board)
+        self.update_path(board, color, path)
+
+    def select(self, board):
+        """ select move; unexplored children first, then according to uct value """
+        if self.unexplored:
+            i = random.randrange(len(self.unexplored))
+            pos = self.unexplored[i]
+            self.unexplored[i] = self.unexplored[len(self.unexplored) - 1]
+            self.unexplored.pop()
+            return pos
+        elif self.bestchild:
+            return self.bestchild.pos
+        else:
+            return PASS
+
+    def random_playout(self, board):
+        """ random play until both players pass """
+        for x in range(MAXMOVES):
+            if board.finished:
+                break
+            board.move(board.random_move())
+
+    def update_path(self, board, color, path):
+        """ update win/loss count along path """
+        wins = board.score(BLACK) >= board.score(WHITE)
+        for node in path:
+            if color == BLACK:
+                color = WHITE
+            else:
+                color = BLACK
+            if wins == (color == BLACK):
+                node.wins += 1
+            else:
+                node.losses += 1
+            if node.parent:
+                node.parent.bestchild = node.parent.best_child()
+
+    def score(self):
+        winrate = self.wins / float(self.wins + self.losses)
+        parentvisits = self.parent.wins + self.parent.losses
+        if not parentvisits:
+            return winrate
+        nodevisits = self.wins + self.losses
+        return winrate + math.sqrt((math.log(parentvisits)) / (5 * nodevisits))
+
+    def best_child(self):
+        maxscore = -1
+        maxchild = None
+        for child in self.pos_child:
+            if child:
+                score = child.score()
+                if score > maxscore:
+                    maxchild = child
+                    maxscore = score
+        return maxchild
+
+    def visits(self):
+        """Visits of each child, by point."""
+        return [child.wins + child.losses if child else 0 for child in self.pos_child]
+
+
+def search(history, games=GAMES, seed=None):
+    """One UCT tree from the position after `history`, as the reference's
+    versus_cpu()/computer_move() do it: seed, build the board, then search.
+
+    Returns (visits of the root's children by point, moves played), or
+    (None, moves) when there is no useful move.
+    """
+    if seed is not None:
+        random.seed(seed)
+    board = Board()
+    board.replay(history)
+    pos = board.random_move()
+    if pos == PASS:
+        return None, board.moves
+    tree = UCTNode()
+    tree.unexplored = board.useful_moves()
+    nboard = Board()
+    for game in range(games):
+        node = tree
+        nboard.reset()
+        nboard.replay(board.history)
+        node.play(nboard)
+    return tree.visits(), board.moves + nboard.moves
+
+
+def _search(task):
+    return search(*task)
+
+
+class RootParallelUCT:
+    '''Root-parallel UCT: independent trees in a process pool, visits summed.
+
+       o workers  trees, one process each (1: a single tree, in-process)'''
+
+    def __init__(self, workers=1):
+        if workers < 1:
+            raise ValueError('workers must be positive')
+        self.workers = workers
+        self.moves = 0
+        self._pool = multiprocessing.Pool(workers) if workers > 1 else None
+
+    def best_move(self, history=(), games=GAMES, seed=1):
+        """The move with the most visits over all trees (the lowest point on ties)."""
+        history = list(history)
+        shares = [games // self.workers + (k < games % self.workers)
+                  for k in range(self.workers)]
+        tasks = [(history, shares[k], seed + k) for k in range(self.workers)]
+        if self._pool is None:
+            results = [_search(task) for task in tasks]
+        else:
+            results = self._pool.map(_search, tasks)
+        total = [0] * POINTS
+        for visits, moves in results:
+            self.moves += moves
+            if visits is not None:
+                total = [a + b for a, b in zip(total, visits)]
+        best = max(range(POINTS), key=total.__getitem__)
+        return best if total[best] else PASS
+
+    def close(self):
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
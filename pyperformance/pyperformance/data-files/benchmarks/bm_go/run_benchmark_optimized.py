@@ -0,0 +1,35 @@
+"""
+Go board game: UCT search on a flat bytearray board with array union-find,
+optionally root-parallel over a process pool (opt_versions/go_array.py).
+"""
+
+import pyperf
+
+from opt_versions.go_array import GAMES, RootParallelUCT
+
+
+def bench_go(loops, workers):
+    # the pool is started once; its start-up is not part of the workload
+    with RootParallelUCT(workers) as uct:
+        range_it = range(loops)
+        t0 = pyperf.perf_counter()
+
+        for _ in range_it:
+            uct.best_move((), GAMES, seed=1)
+
+        return pyperf.perf_counter() - t0
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--workers", str(args.workers)))
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata['description'] = "Test the performance of the Go benchmark (array board)"
+    runner.argparser.add_argument("--workers", type=int, default=1,
+                                  help="root-parallel UCT trees, one process each "
+                                       "(default: 1, the reference's single tree)")
+
+    args = runner.parse_args()
+    runner.bench_time_func('go', bench_go, args.workers)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for hexiom without pyperformance overhead.
+Solver of Hexiom board game on candidate bitmasks in a flat list, with
+table-driven cell selection and precomputed neighbour tuples
+(opt_versions/hexiom_bitboard.py).
+"""
+
+import io
+import os
+import sys
+import time
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import opt_versions.hexiom_bitboard as hexiom
+from opt_versions.hexiom_levels import DEFAULT_LEVEL, LEVELS
+
+
+def main(loops, level):
+    board, solution = LEVELS[level]
+    order = hexiom.DESCENDING
+    strategy = hexiom.Done.FIRST_STRATEGY
+    stream = io.StringIO()
+
+    board = board.strip()
+    expected = solution.rstrip()
+
+    range_it = range(loops)
+    t0 = time.perf_counter()
+
+    for _ in range_it:
+        stream = io.StringIO()
+        hexiom.solve_file(board, strategy, order, stream)
+        output = stream.getvalue()
+        stream = None
+
+    dt = time.perf_counter() - t0
+
+    output = '\n'.join(line.rstrip() for line in output.splitlines())
+    if output != expected:
+        raise AssertionError("got a wrong answer:\n%s\nexpected: %s"
+                             % (output, expected))
+
+    return dt
+
+
+def check(level):
+    """Solve the level with the list-based reference too: same solution, same node count."""
+    import hexiom_clean as ref
+    board = LEVELS[level][0].strip()
+    expected = io.StringIO()
+    ref.solve_file(board, ref.Done.FIRST_STRATEGY, ref.DESCENDING, expected)
+    output = io.StringIO()
+    hexiom.solve_file(board, hexiom.Done.FIRST_STRATEGY, hexiom.DESCENDING, output)
+    if output.getvalue() != expected.getvalue():
+        raise AssertionError("solution differs from the reference")
+    if hexiom.nodes != ref.nodes:
+        raise AssertionError("searched %d nodes, the reference %d" % (hexiom.nodes, ref.nodes))
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=10)
+    p.add_argument("--level", type=int, choices=sorted(LEVELS), default=DEFAULT_LEVEL,
+                   help="Hexiom board level (default: %s)" % DEFAULT_LEVEL)
+    p.add_argument("--check", action="store_true",
+                   help="also solve with the list-based reference and compare the solution "
+                        "and the node count (level 36 takes minutes)")
+    args = p.parse_args()
+    dt = main(args.loops, args.level)
+    print("hexiom level %s: %d nodes, %.3f s, %.0f nodes/s"
+          % (args.level, hexiom.nodes, dt, args.loops * hexiom.nodes / dt))
+    if args.check:
+        check(args.level)
+    print(f"Hexiom benchmark completed with {args.loops} loops")
@@ -0,0 +1,559 @@
+"""
+Hexiom solver on candidate bitmasks.
+
+The reference keeps the candidates of each cell as a list ([0, 1, ..., 7]),
+copies every list on each search branch and scans them with `in`/remove().
+Here a cell's candidates are one int, bit v set when tile v is still
+possible, and Done.cells is a flat list of those ints:
+
+  - cloning a position copies one list of ints,
+  - a cell is fixed when its mask has a single bit; VALUE[mask] gives that
+    tile (or -1) and POPCOUNT[mask] the number of candidates, so the cell
+    selection strategies never look inside a cell,
+  - the per-value counts of constraint_pass() and solved() (cells fixed to
+    v, cells where v is possible) are one sum over the cells of packed
+    counters, SPREAD/FIXED[mask], instead of a scan per value,
+  - the vmin/vmax filter is one AND with KEEP[vmin][vmax],
+  - the moves of a cell come from MOVES_ASCENDING/MOVES_DESCENDING[mask],
+  - Hex.links holds each cell's neighbour ids as a tuple, precomputed from
+    DIRS.
+
+The search visits the same positions in the same order as the reference, so
+it finds the same solutions with the same number of nodes.
+"""
+
+__all__ = ["Done", "Hex", "Pos", "solve", "solve_file", "read_file", "print_pos",
+           "ASCENDING", "DESCENDING", "EMPTY"]
+
+
+##################################
+class Dir(object):
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+DIRS = [Dir(1, 0),
+        Dir(-1, 0),
+        Dir(0, 1),
+        Dir(0, -1),
+        Dir(1, 1),
+        Dir(-1, -1)]
+
+EMPTY = 7
+EMPTY_BIT = 1 << EMPTY
+ALL_TILES = (1 << 8) - 1
+
+# tables indexed by a candidate mask
+POPCOUNT = [bin(m).count("1") for m in range(1 << 8)]
+VALUE = [-1] * (1 << 8)
+for _v in range(8):
+    VALUE[1 << _v] = _v
+MOVES_ASCENDING = [tuple(v for v in range(8) if m >> v & 1) for m in range(1 << 8)]
+# higher values first and EMPTY last
+MOVES_DESCENDING = [tuple(v for v in reversed(range(EMPTY)) if m >> v & 1)
+                    + ((EMPTY,) if m & EMPTY_BIT else ()) for m in range(1 << 8)]
+# one FIELD-bit counter per tile value packed in an int: summing SPREAD[mask]
+# over the cells counts the cells where each value is possible, FIXED[mask]
+# the cells fixed to each value
+FIELD = 12
+FIELD_MASK = (1 << FIELD) - 1
+SPREAD = [sum(1 << (FIELD * v) for v in range(8) if m >> v & 1) for m in range(1 << 8)]
+FIXED = [SPREAD[m] if VALUE[m] >= 0 else 0 for m in range(1 << 8)]
+# candidates a free cell keeps when between vmin and vmax of its neighbours can be filled
+KEEP = [[EMPTY_BIT | sum(1 << v for v in range(EMPTY) if vmin <= v <= vmax)
+         for vmax in range(7)] for vmin in range(7)]
+
+##################################
+
+
+class Done(object):
+    MIN_CHOICE_STRATEGY = 0
+    MAX_CHOICE_STRATEGY = 1
+    HIGHEST_VALUE_STRATEGY = 2
+    FIRST_STRATEGY = 3
+    MAX_NEIGHBORS_STRATEGY = 4
+    MIN_NEIGHBORS_STRATEGY = 5
+
+    def __init__(self, count, empty=False):
+        self.count = count
+        self.cells = None if empty else [ALL_TILES] * count
+
+    def clone(self):
+        ret = Done(self.count, True)
+        ret.cells = self.cells[:]
+        return ret
+
+    def __getitem__(self, i):
+        return MOVES_ASCENDING[self.cells[i]]
+
+    def set_done(self, i, v):
+        self.cells[i] = 1 << v
+
+    def already_done(self, i):
+        return VALUE[self.cells[i]] >= 0
+
+    def remove(self, i, v):
+        m = self.cells[i]
+        if m >> v & 1:
+            self.cells[i] = m & ~(1 << v)
+            return True
+        else:
+            return False
+
+    def remove_all(self, v):
+        bit = 1 << v
+        self.cells = [m & ~bit for m in self.cells]
+
+    def remove_unfixed(self, v):
+        bit = 1 << v
+        cells = self.cells
+        changed = False
+        for i in range(self.count):
+            m = cells[i]
+            if m & bit and VALUE[m] < 0:
+                cells[i] = m & ~bit
+                changed = True
+        return changed
+
+    def filter_tiles(self, tiles):
+        for v in range(8):
+            if tiles[v] == 0:
+                self.remove_all(v)
+
+    def next_cell_min_choice(self):
+        minlen = 10
+        mini = -1
+        for i, m in enumerate(self.cells):
+            if 1 < POPCOUNT[m] < minlen:
+                minlen = POPCOUNT[m]
+                mini = i
+        return mini
+
+    def next_cell_max_choice(self):
+        maxlen = 1
+        maxi = -1
+        for i, m in enumerate(self.cells):
+            if maxlen < POPCOUNT[m]:
+                maxlen = POPCOUNT[m]
+                maxi = i
+        return maxi
+
+    def next_cell_highest_value(self):
+        maxval = -1
+        maxi = -1
+        for i, m in enumerate(self.cells):
+            if VALUE[m] < 0:
+                maxvali = (m & ~EMPTY_BIT).bit_length() - 1
+                if maxval < maxvali:
+                    maxval = maxvali
+                    maxi = i
+        return maxi
+
+    def next_cell_first(self):
+        for i, m in enumerate(self.cells):
+            if VALUE[m] < 0:
+                return i
+        return -1
+
+    def _filled_neighbors(self, pos, i):
+        cells = self.cells
+        n = 0
+        for nid in pos.hex.links[i]:
+            v = VALUE[cells[nid]]
+            if v >= 0 and v != EMPTY:
+                n += 1
+        return n
+
+    def next_cell_max_neighbors(self, pos):
+        maxn = -1
+        maxi = -1
+        for i, m in enumerate(self.cells):
+            if VALUE[m] < 0:
+                n = self._filled_neighbors(pos, i)
+                if n > maxn:
+                    maxn = n
+                    maxi = i
+        return maxi
+
+    def next_cell_min_neighbors(self, pos):
+        minn = 7
+        mini = -1
+        for i, m in enumerate(self.cells):
+            if VALUE[m] < 0:
+                n = self._filled_neighbors(pos, i)
+                if n < minn:
+                    minn = n
+                    mini = i
+        return mini
+
+    def next_cell(self, pos, strategy=HIGHEST_VALUE_STRATEGY):
+        if strategy == Done.HIGHEST_VALUE_STRATEGY:
+            return self.next_cell_highest_value()
+        elif strategy == Done.MIN_CHOICE_STRATEGY:
+            return self.next_cell_min_choice()
+        elif strategy == Done.MAX_CHOICE_STRATEGY:
+            return self.next_cell_max_choice()
+        elif strategy == Done.FIRST_STRATEGY:
+            return self.next_cell_first()
+        elif strategy == Done.MAX_NEIGHBORS_STRATEGY:
+            return self.next_cell_max_neighbors(pos)
+        elif strategy == Done.MIN_NEIGHBORS_STRATEGY:
+            return self.next_cell_min_neighbors(pos)
+        else:
+            raise Exception("Wrong strategy: %d" % strategy)
+
+##################################
+
+
+class Node(object):
+
+    def __init__(self, pos, id, links):
+        self.pos = pos
+        self.id = id
+        self.links = links
+
+##################################
+
+
+class Hex(object):
+
+    def __init__(self, size):
+        self.size = size
+        self.count = 3 * size * (size - 1) + 1
+        self.nodes_by_id = self.count * [None]
+        self.nodes_by_pos = {}
+        self.links = None
+        id = 0
+        for y in range(size):
+            for x in range(size + y):
+                pos = (x, y)
+                node = Node(pos, id, [])
+                self.nodes_by_pos[pos] = node
+                self.nodes_by_id[node.id] = node
+                id += 1
+        for y in range(1, size):
+            for x in range(y, size * 2 - 1):
+                ry = size + y - 1
+                pos = (x, ry)
+                node = Node(pos, id, [])
+                self.nodes_by_pos[pos] = node
+                self.nodes_by_id[node.id] = node
+                id += 1
+
+    def link_nodes(self):
+        for node in self.nodes_by_id:
+            (x, y) = node.pos
+            for dir in DIRS:
+                nx = x + dir.x
+                ny = y + dir.y
+                if self.contains_pos((nx, ny)):
+                    node.links.append(self.nodes_by_pos[(nx, ny)].id)
+        self.links = [tuple(node.links) for node in self.nodes_by_id]
+
+    def contains_pos(self, pos):
+        return pos in self.nodes_by_pos
+
+    def get_by_pos(self, pos):
+        return self.nodes_by_pos[pos]
+
+    def get_by_id(self, id):
+        return self.nodes_by_id[id]
+
+
+##################################
+class Pos(object):
+
+    def __init__(self, hex, tiles, done=None):
+        self.hex = hex
+        self.tiles = tiles
+        self.done = Done(hex.count) if done is None else done
+
+    def clone(self):
+        return Pos(self.hex, self.tiles, self.done.clone())
+
+##################################
+
+
+def constraint_pass(pos, last_move=None):
+    changed = False
+    tiles = pos.tiles
+    cells = pos.done.cells
+    links = pos.hex.links
+    count = len(cells)
+
+    # Remove impossible values from free cells
+    free_cells = range(count) if last_move is None else links[last_move]
+    for i in free_cells:
+        m = cells[i]
+        if VALUE[m] < 0:
+            vmax = 0
+            vmin = 0
+            for nid in links[i]:
+                v = VALUE[cells[nid]]
+                if v < 0:
+                    vmax += 1
+                elif v != EMPTY:
+                    vmin += 1
+                    vmax += 1
+            kept = m & KEEP[vmin][vmax]
+            if kept != m:
+                cells[i] = kept
+                changed = True
+
+    # Computes how many of each value is still free, and where each value is
+    # possible; fixing a cell to v removes its other values from `possible`
+    fixed = sum(map(FIXED.__getitem__, cells))
+    possible = sum(map(SPREAD.__getitem__, cells))
+
+    for v in range(8):
+        bit = 1 << v
+        shift = FIELD * v
+        fixed_v = fixed >> shift & FIELD_MASK
+        # cells not yet fixed where v is possible
+        if (possible >> shift & FIELD_MASK) == fixed_v:
+            continue
+        # If there is none, remove the possibility from all tiles
+        if (tiles[v] > 0) and (tiles[v] == fixed_v):
+            for i in range(count):
+                m = cells[i]
+                if m & bit and VALUE[m] < 0:
+                    cells[i] = m & ~bit
+                    possible -= SPREAD[bit]
+                    changed = True
+        # If the number of possible cells for a value is exactly the number of available tiles
+        # put a tile in each cell
+        elif tiles[v] == possible >> shift & FIELD_MASK:
+            for i in range(count):
+                m = cells[i]
+                if m & bit and VALUE[m] < 0:
+                    cells[i] = bit
+                    possible += SPREAD[bit] - SPREAD[m]
+                    changed = True
+
+    # Force empty or non-empty around filled cells
+    filled_cells = range(count) if last_move is None else (last_move,)
+    for i in filled_cells:
+        num = VALUE[cells[i]]
+        if num >= 0:
+            filled = 0
+            unknown = []
+            for nid in links[i]:
+                v = VALUE[cells[nid]]
+                if v < 0:
+                    unknown.append(nid)
+                elif v != EMPTY:
+                    filled += 1
+            if unknown:
+                if num == filled:
+                    for u in unknown:
+                        if cells[u] & EMPTY_BIT:
+                            cells[u] = EMPTY_BIT
+                            changed = True
+                elif num == filled + len(unknown):
+                    for u in unknown:
+                        m = cells[u]
+                        if m & EMPTY_BIT:
+                            cells[u] = m & ~EMPTY_BIT
+                            changed = True
+
+    return changed
+
+
+ASCENDING = 1
+DESCENDING = -1
+
+
+def find_moves(pos, strategy, order):
+    done = pos.done
+    cell_id = done.next_cell(pos, strategy)
+    if cell_id < 0:
+        return []
+
+    m = done.cells[cell_id]
+    if order == ASCENDING:
+        return [(cell_id, v) for v in MOVES_ASCENDING[m]]
+    else:
+        return [(cell_id, v) for v in MOVES_DESCENDING[m]]
+
+
+def play_move(pos, move):
+    (cell_id, i) = move
+    pos.done.set_done(cell_id, i)
+
+
+def print_pos(pos, output):
+    hex = pos.hex
+    cells = pos.done.cells
+    size = hex.size
+    for y in range(size):
+        print(" " * (size - y - 1), end="", file=output)
+        for x in range(size + y):
+            print("%s " % _cell_char(cells[hex.get_by_pos((x, y)).id]), end="", file=output)
+        print(end="\n", file=output)
+    for y in range(1, size):
+        print(" " * y, end="", file=output)
+        for x in range(y, size * 2 - 1):
+            ry = size + y - 1
+            print("%s " % _cell_char(cells[hex.get_by_pos((x, ry)).id]), end="", file=output)
+        print(end="\n", file=output)
+
+
+def _cell_char(m):
+    v = VALUE[m]
+    if v < 0:
+        return "?"
+    return str(v) if v != EMPTY else "."
+
+
+OPEN = 0
+SOLVED = 1
+IMPOSSIBLE = -1
+
+
+def solved(pos, output, verbose=False):
+    links = pos.hex.links
+    tiles = pos.tiles
+    cells = pos.done.cells
+    if 0 in cells:
+        return IMPOSSIBLE
+    fixed = sum(map(FIXED.__getitem__, cells))
+    for v in range(8):
+        if (fixed >> (FIELD * v) & FIELD_MASK) > tiles[v]:
+            return IMPOSSIBLE
+
+    exact = True
+    all_done = True
+    for i, m in enumerate(cells):
+        num = VALUE[m]
+        if num < 0:
+            all_done = False
+        elif num != EMPTY:
+            vmax = 0
+            vmin = 0
+            for nid in links[i]:
+                v = VALUE[cells[nid]]
+                if v < 0:
+                    vmax += 1
+                elif v != EMPTY:
+                    vmin += 1
+                    vmax += 1
+
+            if (num < vmin) or (num > vmax):
+                return IMPOSSIBLE
+            if num != vmin:
+                exact = False
+
+    if (not all_done) or (not exact):
+        return OPEN
+
+    print_pos(pos, output)
+    return SOLVED
+
+
+# positions searched by the last solve(): the initial one and one per move tried
+nodes = 0
+
+
+def solve_step(prev, strategy, order, output, first=False):
+    global nodes
+    if first:
+        pos = prev.clone()
+        while constraint_pass(pos):
+            pass
+    else:
+        pos = prev
+
+    moves = find_moves(pos, strategy, order)
+    if len(moves) == 0:
+        return solved(pos, output)
+    else:
+        for move in moves:
+            ret = OPEN
+            new_pos = pos.clone()
+            nodes += 1
+            play_move(new_pos, move)
+            while constraint_pass(new_pos, move[0]):
+                pass
+            cur_status = solved(new_pos, output)
+            if cur_status != OPEN:
+                ret = cur_status
+            else:
+                ret = solve_step(new_pos, strategy, order, output)
+            if ret == SOLVED:
+                return SOLVED
+    return IMPOSSIBLE
+
+
+def check_valid(pos):
+    hex = pos.hex
+    tiles = pos.tiles
+    # fill missing entries in tiles
+    tot = 0
+    for i in range(8):
+        if tiles[i] > 0:
+            tot += tiles[i]
+        else:
+            tiles[i] = 0
+    # check total
+    if tot != hex.count:
+        raise Exception(
+            "Invalid input. Expected %d tiles, got %d." % (hex.count, tot))
+
+
+def solve(pos, strategy, order, output):
+    global nodes
+    nodes = 1
+    check_valid(pos)
+    return solve_step(pos, strategy, order, output, first=True)
+
+
+def read_file(file):
+    lines = [line.strip("\r\n") for line in file.splitlines()]
+    size = int(lines[0])
+    hex = Hex(size)
+    linei = 1
+    tiles = 8 * [0]
+    done = Done(hex.count)
+    for y in range(size):
+        line = lines[linei][size - y - 1:]
+        p = 0
+        for x in range(size + y):
+            tile = line[p:p + 2]
+            p += 2
+            if tile[1] == ".":
+                inctile = EMPTY
+            else:
+                inctile = int(tile)
+            tiles[inctile] += 1
+            # Look for locked tiles
+            if tile[0] == "+":
+                done.set_done(hex.get_by_pos((x, y)).id, inctile)
+
+        linei += 1
+    for y in range(1, size):
+        ry = size - 1 + y
+        line = lines[linei][y:]
+        p = 0
+        for x in range(y, size * 2 - 1):
+            tile = line[p:p + 2]
+            p += 2
+            if tile[1] == ".":
+                inctile = EMPTY
+            else:
+                inctile = int(tile)
+            tiles[inctile] += 1
+            # Look for locked tiles
+            if tile[0] == "+":
+                done.set_done(hex.get_by_pos((x, ry)).id, inctile)
+        linei += 1
+    hex.link_nodes()
+    done.filter_tiles(tiles)
+    return Pos(hex, tiles, done)
+
+
+def solve_file(file, strategy, order, output):
+    pos = read_file(file)
+    return solve(pos, strategy, order, output)
+
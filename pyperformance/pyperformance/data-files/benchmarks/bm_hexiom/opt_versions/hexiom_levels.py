@@ -0,0 +1,103 @@
+"""
+The bundled Hexiom levels of ../run_benchmark.py: LEVELS[n] is (board, solution),
+with the solution as printed by print_pos.
+"""
+
+DEFAULT_LEVEL = 25
+
+LEVELS = {}
+
+LEVELS[2] = ("""
+2
+  . 1
+ . 1 1
+  1 .
+""", """\
+ 1 1
+. . .
+ 1 1
+""")
+
+LEVELS[10] = ("""
+3
+  +.+. .
+ +. 0 . 2
+ . 1+2 1 .
+  2 . 0+.
+   .+.+.
+""", """\
+  . . 1
+ . 1 . 2
+0 . 2 2 .
+ . . . .
+  0 . .
+""")
+
+LEVELS[20] = ("""
+3
+   . 5 4
+  . 2+.+1
+ . 3+2 3 .
+ +2+. 5 .
+   . 3 .
+""", """\
+  3 3 2
+ 4 5 . 1
+3 5 2 . .
+ 2 . . .
+  . . .
+""")
+
+LEVELS[25] = ("""
+3
+   4 . .
+  . . 2 .
+ 4 3 2 . 4
+  2 2 3 .
+   4 2 4
+""", """\
+  3 4 2
+ 2 4 4 .
+. . . 4 2
+ . 2 4 3
+  . 2 .
+""")
+
+LEVELS[30] = ("""
+4
+    5 5 . .
+   3 . 2+2 6
+  3 . 2 . 5 .
+ . 3 3+4 4 . 3
+  4 5 4 . 5 4
+   5+2 . . 3
+    4 . . .
+""", """\
+   3 4 3 .
+  4 6 5 2 .
+ 2 5 5 . . 2
+. . 5 4 . 4 3
+ . 3 5 4 5 4
+  . 2 . 3 3
+   . . . .
+""")
+
+LEVELS[36] = ("""
+4
+    2 1 1 2
+   3 3 3 . .
+  2 3 3 . 4 .
+ . 2 . 2 4 3 2
+  2 2 . . . 2
+   4 3 4 . .
+    3 2 3 3
+""", """\
+   3 4 3 2
+  3 4 4 . 3
+ 2 . . 3 4 3
+2 . 1 . 3 . 2
+ 3 3 . 2 . 2
+  3 . 2 . 2
+   2 2 . 1
+""")
+
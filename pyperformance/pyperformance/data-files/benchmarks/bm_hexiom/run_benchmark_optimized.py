@@ -0,0 +1,60 @@
+"""
+Solver of Hexiom board game, on candidate bitmasks in a flat list with
+table-driven cell selection and precomputed neighbour tuples
+(opt_versions/hexiom_bitboard.py).
+"""
+
+import io
+
+import pyperf
+
+import opt_versions.hexiom_bitboard as hexiom
+from opt_versions.hexiom_levels import DEFAULT_LEVEL, LEVELS
+
+
+def main(loops, level):
+    board, solution = LEVELS[level]
+    order = hexiom.DESCENDING
+    strategy = hexiom.Done.FIRST_STRATEGY
+    stream = io.StringIO()
+
+    board = board.strip()
+    expected = solution.rstrip()
+
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        stream = io.StringIO()
+        hexiom.solve_file(board, strategy, order, stream)
+        output = stream.getvalue()
+        stream = None
+
+    dt = pyperf.perf_counter() - t0
+
+    output = '\n'.join(line.rstrip() for line in output.splitlines())
+    if output != expected:
+        raise AssertionError("got a wrong answer:\n%s\nexpected: %s"
+                             % (output, expected))
+
+    return dt
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--level", str(args.level)))
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    levels = sorted(LEVELS)
+    runner.argparser.add_argument("--level", type=int,
+                                  choices=levels,
+                                  default=DEFAULT_LEVEL,
+                                  help="Hexiom board level (default: %s)"
+                                       % DEFAULT_LEVEL)
+
+    args = runner.parse_args()
+    runner.metadata['description'] = "Solver of Hexiom board game (bitmask candidates)"
+    runner.metadata['hexiom_level'] = args.level
+
+    runner.bench_time_func('hexiom', main, args.level)
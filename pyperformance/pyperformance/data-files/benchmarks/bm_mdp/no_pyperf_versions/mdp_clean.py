@@ -57,6 +57,11 @@ def plus12(x):
     return x + x // 8
 
 
+def scaleHP(hp, scale):
+    """HP for --hp-scale: more HP means more reachable states."""
+    return max(1, int(round(hp * scale)))
+
+
 stats_t = collections.namedtuple('stats_t', ['atk', 'df', 'speed', 'spec'])
 NOMODS = stats_t(0, 0, 0, 0)
 
@@ -203,20 +208,22 @@ class Battle(object):
             temp = list(zip(*temp))[0] if temp else []
         return temp
 
-    def evaluate(self, tolerance=0.15):
+    def evaluate(self, tolerance=0.15, hp_scale=1.0):
         badges = 1, 0, 0, 0
+        starhp, charhp = scaleHP(59, hp_scale), scaleHP(63, hp_scale)
 
-        starfixed = fixeddata_t(59, stats_t(40, 44, 56, 50), 11, NOMODS, 115)
-        starhalf = halfstate_t(starfixed, 59, 0, NOMODS,
+        starfixed = fixeddata_t(starhp, stats_t(40, 44, 56, 50), 11, NOMODS, 115)
+        starhalf = halfstate_t(starfixed, starhp, 0, NOMODS,
                                stats_t(40, 44, 56, 50))
-        charfixed = fixeddata_t(63, stats_t(39, 34, 46, 38), 26, badges, 65)
-        charhalf = halfstate_t(charfixed, 63, 0, NOMODS, applyBadgeBoosts(
+        charfixed = fixeddata_t(charhp, stats_t(39, 34, 46, 38), 26, badges, 65)
+        charhalf = halfstate_t(charfixed, charhp, 0, NOMODS, applyBadgeBoosts(
             badges, stats_t(39, 34, 46, 38)))
         initial_state = charhalf, starhalf, 0
         initial_statep = 0, initial_state
 
         dmin, dmax, frozen = self.min, self.max, self.frozen
         stateps = topoSort([initial_statep], self.getSuccessorsList)
+        self.nstates = len(stateps)
 
         itercount = 0
         while dmax[initial_statep] - dmin[initial_statep] > tolerance:
@@ -242,23 +249,32 @@ class Battle(object):
         return (dmax[initial_statep] + dmin[initial_statep]) / 2
 
 
-def bench_mdp(loops):
+def bench_mdp(loops, hp_scale=1.0):
     expected = 0.89873589887
     max_diff = 1e-6
-
+    result = None
     for _ in range(loops):
-        result = Battle().evaluate(0.192)
-
-    if abs(result - expected) > max_diff:
+        battle = Battle()
+        result = battle.evaluate(0.192, hp_scale)
+    # the expected value is only known for the original HP
+    if hp_scale == 1.0 and abs(result - expected) > max_diff:
         raise Exception("invalid result: got %s, expected %s "
                         "(diff: %s, max diff: %s)"
                         % (result, expected, result - expected, max_diff))
+    return result, battle.nstates
 
 
 def main():
-    loops = 10  # This is a heavy benchmark, use fewer loops
-    bench_mdp(loops)
-    print(f"MDP benchmark completed with {loops} loops")
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=10,
+                   help="heavy benchmark, use few loops (default: 10)")
+    p.add_argument("--hp-scale", type=float, default=1.0,
+                   help="scale both sides' HP to grow the state space (default: 1.0)")
+    args = p.parse_args()
+    _, nstates = bench_mdp(args.loops, args.hp_scale)
+    print(f"states: {nstates}")
+    print(f"MDP benchmark completed with {args.loops} loops")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for nbody without pyperformance overhead.
+The original list-of-bodies implementation; --bodies extends the solar
+system with an asteroid belt (opt_versions/nbody_system.py).
+"""
+
+import os
+import sys
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.nbody_system import BODIES, make_bodies
+
+DEFAULT_ITERATIONS = 20000
+DEFAULT_REFERENCE = 'sun'
+
+
+def combinations(l):
+    """Pure-Python implementation of itertools.combinations(l, 2)."""
+    result = []
+    for x in range(len(l) - 1):
+        ls = l[x + 1:]
+        for y in ls:
+            result.append((l[x], y))
+    return result
+
+
+def advance(dt, n, bodies, pairs):
+    for i in range(n):
+        for (([x1, y1, z1], v1, m1),
+             ([x2, y2, z2], v2, m2)) in pairs:
+            dx = x1 - x2
+            dy = y1 - y2
+            dz = z1 - z2
+            mag = dt * ((dx * dx + dy * dy + dz * dz) ** (-1.5))
+            b1m = m1 * mag
+            b2m = m2 * mag
+            v1[0] -= dx * b2m
+            v1[1] -= dy * b2m
+            v1[2] -= dz * b2m
+            v2[0] += dx * b1m
+            v2[1] += dy * b1m
+            v2[2] += dz * b1m
+        for (r, [vx, vy, vz], m) in bodies:
+            r[0] += dt * vx
+            r[1] += dt * vy
+            r[2] += dt * vz
+
+
+def report_energy(bodies, pairs, e=0.0):
+    for (((x1, y1, z1), v1, m1),
+         ((x2, y2, z2), v2, m2)) in pairs:
+        dx = x1 - x2
+        dy = y1 - y2
+        dz = z1 - z2
+        e -= (m1 * m2) / ((dx * dx + dy * dy + dz * dz) ** 0.5)
+    for (r, [vx, vy, vz], m) in bodies:
+        e += m * (vx * vx + vy * vy + vz * vz) / 2.
+    return e
+
+
+def offset_momentum(ref, bodies, px=0.0, py=0.0, pz=0.0):
+    for (r, [vx, vy, vz], m) in bodies:
+        px -= vx * m
+        py -= vy * m
+        pz -= vz * m
+    (r, v, m) = ref
+    v[0] = px / m
+    v[1] = py / m
+    v[2] = pz / m
+
+
+def reference_index(name):
+    return list(BODIES).index(name)
+
+
+def bench_nbody(loops, bodies, reference, iterations):
+    """Returns the energies before and after the last advance()."""
+    pairs = combinations(bodies)
+    offset_momentum(bodies[reference], bodies)
+
+    for _ in range(loops):
+        e0 = report_energy(bodies, pairs)
+        advance(0.01, iterations, bodies, pairs)
+        e1 = report_energy(bodies, pairs)
+    return e0, e1
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=1)
+    p.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                   help="Number of nbody advance() iterations (default: %s)" % DEFAULT_ITERATIONS)
+    p.add_argument("--reference", choices=list(BODIES), default=DEFAULT_REFERENCE,
+                   help="nbody reference (default: %s)" % DEFAULT_REFERENCE)
+    p.add_argument("--bodies", type=int, default=5,
+                   help="number of bodies; beyond 5, asteroids are added (default: 5)")
+    args = p.parse_args()
+    bodies = make_bodies(args.bodies)
+    e0, e1 = bench_nbody(args.loops, bodies, reference_index(args.reference), args.iterations)
+    print("energy: %.9f -> %.9f" % (e0, e1))
+    print(f"Nbody benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
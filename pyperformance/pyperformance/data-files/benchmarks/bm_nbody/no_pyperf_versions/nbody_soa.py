@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for nbody without pyperformance overhead.
+Structure-of-arrays state with a NumPy upper-triangle pair engine or a numba
+pair kernel (opt_versions/nbody_soa.py).
+"""
+
+import os
+import sys
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.nbody_soa import ENGINES, System, resolve_engine
+from opt_versions.nbody_system import BODIES, make_bodies
+
+DEFAULT_ITERATIONS = 20000
+DEFAULT_REFERENCE = 'sun'
+# relative energy difference allowed against the list-based reference (--check)
+CHECK_RTOL = 1e-9
+
+
+def bench_nbody(loops, system, reference, iterations, engine):
+    """Returns the energies before and after the last advance()."""
+    system.offset_momentum(reference)
+
+    for _ in range(loops):
+        e0 = system.report_energy(engine)
+        system.advance(0.01, iterations, engine)
+        e1 = system.report_energy(engine)
+    return e0, e1
+
+
+def check_energies(energies, bodies, loops, reference, iterations):
+    """Run the list-based reference from the same bodies and compare energies."""
+    import nbody_clean
+    expected = nbody_clean.bench_nbody(loops, bodies, reference, iterations)
+    for got, want in zip(energies, expected):
+        if abs(got - want) > CHECK_RTOL * abs(want):
+            raise Exception("energy %r differs from the reference %r" % (got, want))
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=1)
+    p.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                   help="Number of nbody advance() iterations (default: %s)" % DEFAULT_ITERATIONS)
+    p.add_argument("--reference", choices=list(BODIES), default=DEFAULT_REFERENCE,
+                   help="nbody reference (default: %s)" % DEFAULT_REFERENCE)
+    p.add_argument("--bodies", type=int, default=5,
+                   help="number of bodies; beyond 5, asteroids are added (default: 5)")
+    p.add_argument("--engine", choices=ENGINES, default="auto",
+                   help="pair engine; auto uses numba for small systems and NumPy above")
+    p.add_argument("--check", action="store_true",
+                   help="also run the list-based reference (pure Python, O(n^2) per step) "
+                        "and require matching energies")
+    args = p.parse_args()
+    reference = list(BODIES).index(args.reference)
+    if reference >= args.bodies:
+        p.error("--reference %s needs --bodies %d or more" % (args.reference, reference + 1))
+    bodies = make_bodies(args.bodies)
+    system = System(bodies)
+    energies = bench_nbody(args.loops, system, reference, args.iterations, args.engine)
+    if args.check:
+        check_energies(energies, bodies, args.loops, reference, args.iterations)
+    print("engine: %s" % resolve_engine(args.engine, len(system)))
+    print("energy: %.9f -> %.9f" % energies)
+    print(f"Nbody benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
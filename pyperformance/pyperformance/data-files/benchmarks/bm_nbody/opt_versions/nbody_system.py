@@ -0,0 +1,71 @@
+"""
+Initial conditions for the n-body variants, in pure Python.
+
+make_bodies(5) is the solar system of ../run_benchmark.py (sun first); more
+bodies add a deterministic asteroid belt, so every variant (the list-based
+reference as well as the NumPy/numba engines) can start from the same state.
+"""
+
+import math
+import random
+
+PI = 3.14159265358979323
+SOLAR_MASS = 4 * PI * PI
+DAYS_PER_YEAR = 365.24
+
+BODIES = {
+    'sun': ([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], SOLAR_MASS),
+
+    'jupiter': ([4.84143144246472090e+00,
+                 -1.16032004402742839e+00,
+                 -1.03622044471123109e-01],
+                [1.66007664274403694e-03 * DAYS_PER_YEAR,
+                 7.69901118419740425e-03 * DAYS_PER_YEAR,
+                 -6.90460016972063023e-05 * DAYS_PER_YEAR],
+                9.54791938424326609e-04 * SOLAR_MASS),
+
+    'saturn': ([8.34336671824457987e+00,
+                4.12479856412430479e+00,
+                -4.03523417114321381e-01],
+               [-2.76742510726862411e-03 * DAYS_PER_YEAR,
+                4.99852801234917238e-03 * DAYS_PER_YEAR,
+                2.30417297573763929e-05 * DAYS_PER_YEAR],
+               2.85885980666130812e-04 * SOLAR_MASS),
+
+    'uranus': ([1.28943695621391310e+01,
+                -1.51111514016986312e+01,
+                -2.23307578892655734e-01],
+               [2.96460137564761618e-03 * DAYS_PER_YEAR,
+                2.37847173959480950e-03 * DAYS_PER_YEAR,
+                -2.96589568540237556e-05 * DAYS_PER_YEAR],
+               4.36624404335156298e-05 * SOLAR_MASS),
+
+    'neptune': ([1.53796971148509165e+01,
+                 -2.59193146099879641e+01,
+                 1.79258772950371181e-01],
+                [2.68067772490389322e-03 * DAYS_PER_YEAR,
+                 1.62824170038242295e-03 * DAYS_PER_YEAR,
+                 -9.51592254519715870e-05 * DAYS_PER_YEAR],
+                5.15138902046611451e-05 * SOLAR_MASS)}
+
+# asteroid belt: radius (AU), mass range (solar masses)
+BELT_RADIUS = (2.2, 3.3)
+BELT_MASS = (1e-12, 1e-10)
+
+
+def make_bodies(n=5, seed=0):
+    """n bodies as [([x, y, z], [vx, vy, vz], m), ...]: the 5 solar bodies, then asteroids."""
+    if n < 2:
+        raise ValueError("n-body needs at least 2 bodies, got %d" % n)
+    bodies = [([x for x in r], [x for x in v], m) for r, v, m in list(BODIES.values())[:n]]
+    rng = random.Random(seed)
+    for _ in range(n - len(bodies)):
+        radius = rng.uniform(*BELT_RADIUS)
+        theta = rng.uniform(0.0, 2 * PI)
+        # near-circular orbit around the sun, slightly inclined
+        speed = math.sqrt(SOLAR_MASS / radius)
+        bodies.append(([radius * math.cos(theta), radius * math.sin(theta),
+                        rng.uniform(-0.05, 0.05) * radius],
+                       [-speed * math.sin(theta), speed * math.cos(theta), 0.0],
+                       rng.uniform(*BELT_MASS) * SOLAR_MASS))
+    return bodies
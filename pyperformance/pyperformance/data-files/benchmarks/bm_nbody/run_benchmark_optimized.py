@@ -0,0 +1,58 @@
+"""
+N-body benchmark on structure-of-arrays NumPy state, with an upper-triangle
+tile engine and a numba pair kernel (opt_versions/nbody_soa.py).
+"""
+
+import pyperf
+
+from opt_versions.nbody_soa import ENGINES, System
+from opt_versions.nbody_system import BODIES, make_bodies
+
+DEFAULT_ITERATIONS = 20000
+DEFAULT_REFERENCE = 'sun'
+
+
+def bench_nbody(loops, reference, iterations, n, engine):
+    system = System(make_bodies(n))
+    system.offset_momentum(list(BODIES).index(reference))
+
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        system.report_energy(engine)
+        system.advance(0.01, iterations, engine)
+        system.report_energy(engine)
+
+    return pyperf.perf_counter() - t0
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--iterations", str(args.iterations),
+                "--bodies", str(args.bodies),
+                "--engine", args.engine))
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata['description'] = "n-body benchmark (structure-of-arrays)"
+    runner.argparser.add_argument("--iterations",
+                                  type=int, default=DEFAULT_ITERATIONS,
+                                  help="Number of nbody advance() iterations "
+                                       "(default: %s)" % DEFAULT_ITERATIONS)
+    runner.argparser.add_argument("--reference",
+                                  choices=list(BODIES), default=DEFAULT_REFERENCE,
+                                  help="nbody reference (default: %s)"
+                                       % DEFAULT_REFERENCE)
+    runner.argparser.add_argument("--bodies", type=int, default=5,
+                                  help="number of bodies (default: 5)")
+    runner.argparser.add_argument("--engine", choices=ENGINES, default="auto",
+                                  help="pair engine (default: auto)")
+
+    args = runner.parse_args()
+    reference = list(BODIES).index(args.reference)
+    if reference >= args.bodies:
+        runner.argparser.error("--reference %s needs --bodies %d or more"
+                               % (args.reference, reference + 1))
+    runner.bench_time_func('nbody', bench_nbody,
+                           args.reference, args.iterations, args.bodies, args.engine)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for pyflate without pyperformance overhead.
+Table-driven Huffman decoding (opt_versions/pyflate_opt.py) with the NumPy
+bzip2 backend: vectorized move-to-front and inverse BWT
+(opt_versions/pyflate_opt2.py).
+"""
+
+import hashlib
+import os
+import sys
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.pyflate_opt2 import decompress
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "data", "interpreter.tar.bz2")
+DEFAULT_MD5 = "afa004a630fe072901b1d9628b960974"
+
+
+def bench_pyflate(loops, data):
+    for _ in range(loops):
+        out = decompress(data)
+    return out
+
+
+def make_input(size):
+    """The bundled tarball repeated and cut to size bytes, and its bzip2 (for --size sweeps)."""
+    import bz2
+    with open(DEFAULT_FILE, 'rb') as f:
+        raw = bz2.decompress(f.read())
+    raw = (raw * (size // len(raw) + 1))[:size]
+    return bz2.compress(raw, 9), raw
+
+
+def check_output(out, filename, expected):
+    # the checksum is only known for the bundled file
+    if expected is not None:
+        if out != expected:
+            raise Exception("output mismatch")
+    elif filename == DEFAULT_FILE and hashlib.md5(out).hexdigest() != DEFAULT_MD5:
+        raise Exception("MD5 checksum mismatch")
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=10)
+    p.add_argument("--file", default=DEFAULT_FILE,
+                   help="gzip or bzip2 file to decompress (default: data/interpreter.tar.bz2)")
+    p.add_argument("--size", type=int,
+                   help="decompress a bzip2 of SIZE bytes made from the bundled tarball instead of --file")
+    p.add_argument("--check", action="store_true",
+                   help="also decode with pyflate_opt and require byte-identical output")
+    args = p.parse_args()
+    if args.size is not None:
+        data, expected = make_input(args.size)
+    else:
+        with open(args.file, 'rb') as f:
+            data, expected = f.read(), None
+    out = bench_pyflate(args.loops, data)
+    check_output(out, args.file, expected)
+    if args.check:
+        from opt_versions.pyflate_opt import decompress as reference
+        if reference(data) != out:
+            raise Exception("output differs from pyflate_opt")
+    print(f"Pyflate benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
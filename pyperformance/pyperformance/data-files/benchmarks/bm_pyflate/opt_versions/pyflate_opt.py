@@ -0,0 +1,519 @@
+"""
+Pure-Python DEFLATE (gzip) and bzip2 decoder with table-driven Huffman
+decoding, derived from Paul Sladen's pyflate (see ../run_benchmark.py).
+
+Differences from the original:
+
+- Each Huffman code is a flat table of 2**max_bits entries indexed by the
+  next max_bits input bits, giving ``symbol << 5 | length``. One lookup
+  replaces find_next_symbol's scan over all codes (with a snoopbits call per
+  code length).
+- The bit readers work on a memoryview over the whole input and refill 64
+  bits at a time with int.from_bytes, instead of one f.read(1) per byte.
+  The bit buffer stays under 128 bits instead of growing with the stream.
+- The hot loops (literal/length/distance decoding, bzip2 symbol decoding and
+  selectors) keep the reader state in locals and refill inline.
+
+The BWT inversion, move-to-front and run-length steps of bzip2 are the
+original algorithms.
+"""
+
+import struct
+
+int2byte = struct.Struct(">B").pack
+
+# Huffman table entries pack the symbol above a 5-bit code length
+LENGTH_BITS = 5
+LENGTH_MASK = (1 << LENGTH_BITS) - 1
+
+
+class BitReader(object):
+    """LSB-first bits (DEFLATE) from a memoryview, refilled 64 bits at a time."""
+
+    __slots__ = ("data", "pos", "buf", "cnt")
+
+    def __init__(self, data, pos=0):
+        self.data = memoryview(data)
+        self.pos = pos      # next byte to load into buf
+        self.buf = 0
+        self.cnt = 0        # valid bits in buf
+
+    def refill(self):
+        # past the end of the input reads zeros; checksums catch truncation
+        self.buf |= int.from_bytes(self.data[self.pos:self.pos + 8], "little") << self.cnt
+        self.pos += 8
+        self.cnt += 64
+
+    def readbits(self, n):
+        if self.cnt < n:
+            self.refill()
+        r = self.buf & ((1 << n) - 1)
+        self.buf >>= n
+        self.cnt -= n
+        return r
+
+    def align(self):
+        # pos is whole bytes, so the bits to the next byte boundary are cnt & 7
+        self.readbits(self.cnt & 7)
+
+    def readbytes(self, n):
+        """n whole bytes; the reader must be aligned."""
+        out = bytearray()
+        while n and self.cnt:
+            out.append(self.readbits(8))
+            n -= 1
+        out += self.data[self.pos:self.pos + n]
+        self.pos += n
+        return out
+
+    def decode(self, table):
+        if self.cnt < table.bits:
+            self.refill()
+        e = table.table[self.buf & table.mask]
+        n = e & LENGTH_MASK
+        if not n:
+            raise Exception("unfound symbol @%r" % (self.tell(),))
+        self.buf >>= n
+        self.cnt -= n
+        return e >> LENGTH_BITS
+
+    def tell(self):
+        return divmod(self.pos * 8 - self.cnt, 8)
+
+
+class RBitReader(BitReader):
+    """MSB-first bits (bzip2): the next bit is bit cnt - 1 of buf."""
+
+    __slots__ = ()
+
+    def refill(self):
+        chunk = self.data[self.pos:self.pos + 8]
+        v = int.from_bytes(chunk, "big")
+        if len(chunk) < 8:
+            v <<= 8 * (8 - len(chunk))
+        # consumed bits above cnt are dropped here, not on every read
+        self.buf = ((self.buf & ((1 << self.cnt) - 1)) << 64) | v
+        self.pos += 8
+        self.cnt += 64
+
+    def readbits(self, n):
+        if self.cnt < n:
+            self.refill()
+        self.cnt -= n
+        return (self.buf >> self.cnt) & ((1 << n) - 1)
+
+    def decode(self, table):
+        if self.cnt < table.bits:
+            self.refill()
+        e = table.table[(self.buf >> (self.cnt - table.bits)) & table.mask]
+        n = e & LENGTH_MASK
+        if not n:
+            raise Exception("unfound symbol @%r" % (self.tell(),))
+        self.cnt -= n
+        return e >> LENGTH_BITS
+
+
+def reverse_bits(v, n):
+    z = 0
+    for _ in range(n):
+        z = (z << 1) | (v & 1)
+        v >>= 1
+    return z
+
+
+class HuffmanTable(object):
+    """Canonical Huffman code as a flat lookup table over the next `bits` bits."""
+
+    __slots__ = ("table", "bits", "mask")
+
+    def __init__(self, lengths, lsb_first=True):
+        codes = sorted((l, sym) for sym, l in enumerate(lengths) if l)
+        self.bits = codes[-1][0] if codes else 0
+        self.mask = (1 << self.bits) - 1
+        size = 1 << self.bits
+        table = [0] * size
+        code, prev = 0, 0
+        for l, sym in codes:
+            code <<= l - prev
+            prev = l
+            if code >> l:
+                raise Exception("over-subscribed Huffman code")
+            entry = sym << LENGTH_BITS | l
+            if lsb_first:
+                # DEFLATE sends codes MSB-first into an LSB-first stream:
+                # every index whose low l bits are the reversed code
+                table[reverse_bits(code, l)::1 << l] = [entry] * (size >> l)
+            else:
+                span = 1 << (self.bits - l)
+                start = code * span
+                table[start:start + span] = [entry] * span
+            code += 1
+        self.table = table
+
+
+def code_length_orders(i):
+    return (16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3,
+            13, 2, 14, 1, 15)[i]
+
+
+DISTANCE_BASE = (1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193,
+                 257, 385, 513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193,
+                 12289, 16385, 24577)
+DISTANCE_EXTRA = tuple(0 if n <= 1 else (n >> 1) - 1 for n in range(30))
+
+LENGTH_BASE = (3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31, 35,
+               43, 51, 59, 67, 83, 99, 115, 131, 163, 195, 227, 258)
+LENGTH_EXTRA = tuple(0 if n <= 260 or n == 285 else ((n - 257) >> 2) - 1
+                     for n in range(257, 286))
+
+STATIC_LITERALS = HuffmanTable([8] * 144 + [9] * 112 + [7] * 24 + [8] * 8)
+STATIC_DISTANCES = HuffmanTable([5] * 32)
+
+
+def inflate_block(b, out, lit, dist):
+    """Decode one Huffman-coded DEFLATE block into the bytearray out."""
+    data = b.data
+    pos, buf, cnt = b.pos, b.buf, b.cnt
+    ltable, lmask = lit.table, lit.mask
+    dtable, dmask = dist.table, dist.mask
+    while True:
+        # at most 15 + 5 + 15 + 13 bits per symbol: one refill covers it
+        if cnt < 48:
+            buf |= int.from_bytes(data[pos:pos + 8], "little") << cnt
+            pos += 8
+            cnt += 64
+        e = ltable[buf & lmask]
+        n = e & LENGTH_MASK
+        if not n:
+            raise Exception("unfound literal/length symbol @%r" % (divmod(pos * 8 - cnt, 8),))
+        buf >>= n
+        cnt -= n
+        r = e >> LENGTH_BITS
+        if r < 256:
+            out.append(r)
+            continue
+        if r == 256:
+            break
+        if r > 285:
+            raise Exception("illegal unused literal/length symbol "
+                            "in use @%r" % (divmod(pos * 8 - cnt, 8),))
+        n = LENGTH_EXTRA[r - 257]
+        length = LENGTH_BASE[r - 257] + (buf & ((1 << n) - 1))
+        buf >>= n
+        cnt -= n
+
+        e = dtable[buf & dmask]
+        n = e & LENGTH_MASK
+        if not n:
+            raise Exception("unfound distance symbol @%r" % (divmod(pos * 8 - cnt, 8),))
+        buf >>= n
+        cnt -= n
+        r = e >> LENGTH_BITS
+        if r > 29:
+            raise Exception("illegal unused distance symbol "
+                            "in use @%r" % (divmod(pos * 8 - cnt, 8),))
+        n = DISTANCE_EXTRA[r]
+        distance = DISTANCE_BASE[r] + (buf & ((1 << n) - 1))
+        buf >>= n
+        cnt -= n
+
+        start = len(out) - distance
+        if distance >= length:
+            out += out[start:start + length]
+        else:
+            # overlapping copy: the last `distance` bytes repeat
+            out += (out[start:] * (length // distance + 1))[:length]
+    b.pos, b.buf, b.cnt = pos, buf, cnt
+
+
+def dynamic_tables(b):
+    literals = b.readbits(5) + 257
+    distances = b.readbits(5) + 1
+    code_lengths_length = b.readbits(4) + 4
+
+    l = [0] * 19
+    for i in range(code_lengths_length):
+        l[code_length_orders(i)] = b.readbits(3)
+    dynamic_codes = HuffmanTable(l)
+
+    # Decode the code_lengths for both tables at once, then split the list
+    code_lengths = []
+    while len(code_lengths) < literals + distances:
+        r = b.decode(dynamic_codes)
+        if r <= 15:  # literal bitlength for this code
+            code_lengths.append(r)
+        elif r == 16:  # repeat last code
+            code_lengths += code_lengths[-1:] * (3 + b.readbits(2))
+        elif r == 17:  # repeat zero
+            code_lengths += [0] * (3 + b.readbits(3))
+        elif r == 18:  # repeat zero lots
+            code_lengths += [0] * (11 + b.readbits(7))
+        else:
+            raise Exception(
+                "next code length is outside of the range 0 <= r <= 18")
+    return (HuffmanTable(code_lengths[:literals]),
+            HuffmanTable(code_lengths[literals:literals + distances]))
+
+
+# Sixteen bits of magic have been removed by the time we start decoding
+def gzip_main(data):
+    b = BitReader(data)
+    method = b.readbits(8)
+    if method != 8:
+        raise Exception("Unknown (not type eight DEFLATE) compression method")
+
+    # Use flags, drop modification time, extra flags and OS creator type.
+    flags = b.readbits(8)
+    b.readbits(32)   # mtime
+    b.readbits(8)    # extra_flags
+    b.readbits(8)    # os_type
+
+    if flags & 0x04:  # structured GZ_FEXTRA miscellaneous data
+        xlen = b.readbits(16)
+        b.readbytes(xlen)
+    while flags & 0x08:  # original GZ_FNAME filename
+        if not b.readbits(8):
+            break
+    while flags & 0x10:  # human readable GZ_FCOMMENT
+        if not b.readbits(8):
+            break
+    if flags & 0x02:  # header-only GZ_FHCRC checksum
+        b.readbits(16)
+
+    out = bytearray()
+    while True:
+        lastbit = b.readbits(1)
+        blocktype = b.readbits(2)
+
+        if blocktype == 0:
+            b.align()
+            length = b.readbits(16)
+            if length != b.readbits(16) ^ 0xFFFF:
+                raise Exception("stored block lengths do not match each other")
+            out += b.readbytes(length)
+        elif blocktype == 1:  # Static Huffman
+            inflate_block(b, out, STATIC_LITERALS, STATIC_DISTANCES)
+        elif blocktype == 2:  # Dynamic Huffman
+            inflate_block(b, out, *dynamic_tables(b))
+        else:
+            raise Exception("illegal unused blocktype in use @%r" % (b.tell(),))
+
+        if lastbit:
+            break
+
+    b.align()
+    b.readbits(32)   # crc
+    b.readbits(32)   # final_length
+    return bytes(out)
+
+
+def move_to_front(l, c):
+    l[:] = l[c:c + 1] + l[0:c] + l[c + 1:]
+
+
+def bwt_transform(L):
+    # Semi-inefficient way to get the character counts
+    F = bytes(sorted(L))
+    base = []
+    for i in range(256):
+        base.append(F.find(int2byte(i)))
+
+    pointers = [-1] * len(L)
+    for i, symbol in enumerate(L):
+        pointers[base[symbol]] = i
+        base[symbol] += 1
+    return pointers
+
+
+def bwt_reverse(L, end):
+    out = []
+    if len(L):
+        T = bwt_transform(L)
+        # see run_benchmark.py: walk len(L) steps rather than back to `end`
+        for i in range(len(L)):
+            end = T[end]
+            out.append(L[end])
+
+    return bytes(out)
+
+
+def compute_used(b):
+    huffman_used_map = b.readbits(16)
+    map_mask = 1 << 15
+    used = []
+    while map_mask > 0:
+        if huffman_used_map & map_mask:
+            huffman_used_bitmap = b.readbits(16)
+            bit_mask = 1 << 15
+            while bit_mask > 0:
+                used += [bool(huffman_used_bitmap & bit_mask)]
+                bit_mask >>= 1
+        else:
+            used += [False] * 16
+        map_mask >>= 1
+    return used
+
+
+def compute_selectors_list(b, huffman_groups):
+    selectors_used = b.readbits(15)
+    mtf = list(range(huffman_groups))
+    selectors_list = []
+    pos, buf, cnt = b.pos, b.buf, b.cnt
+    for i in range(selectors_used):
+        # zero-terminated bit runs (0..62) of MTF'ed huffman table
+        c = 0
+        while True:
+            if not cnt:
+                b.pos, b.buf, b.cnt = pos, buf, cnt
+                b.refill()
+                pos, buf, cnt = b.pos, b.buf, b.cnt
+            cnt -= 1
+            if not (buf >> cnt) & 1:
+                break
+            c += 1
+            if c >= huffman_groups:
+                raise Exception("Bzip2 chosen selector greater than number of groups (max 6)")
+        move_to_front(mtf, c)
+        selectors_list.append(mtf[0])
+    b.pos, b.buf, b.cnt = pos, buf, cnt
+    return selectors_list
+
+
+def compute_tables(b, huffman_groups, symbols_in_use):
+    tables = []
+    for j in range(huffman_groups):
+        length = b.readbits(5)
+        lengths = []
+        for i in range(symbols_in_use):
+            if not 0 <= length <= 20:
+                raise Exception("Bzip2 Huffman length code outside range 0..20")
+            while b.readbits(1):
+                length -= (b.readbits(1) * 2) - 1
+            lengths.append(length)
+        tables.append(HuffmanTable(lengths, lsb_first=False))
+    return tables
+
+
+def decode_huffman_block(b, out):
+    randomised = b.readbits(1)
+    if randomised:
+        raise Exception("Bzip2 randomised support not implemented")
+    pointer = b.readbits(24)
+    used = compute_used(b)
+
+    huffman_groups = b.readbits(3)
+    if not 2 <= huffman_groups <= 6:
+        raise Exception("Bzip2: Number of Huffman groups not in range 2..6")
+
+    selectors_list = compute_selectors_list(b, huffman_groups)
+    symbols_in_use = sum(used) + 2  # remember RUN[AB] RLE symbols
+    tables = compute_tables(b, huffman_groups, symbols_in_use)
+
+    favourites = bytearray(i for i, x in enumerate(used) if x)
+    eob = symbols_in_use - 1
+
+    data = b.data
+    pos, buf, cnt = b.pos, b.buf, b.cnt
+    selector_pointer = 0
+    decoded = 0
+    # Main Huffman loop
+    repeat = repeat_power = 0
+    buffer = bytearray()
+    table = bits = mask = None
+    while True:
+        decoded -= 1
+        if decoded <= 0:
+            decoded = 50  # Huffman table re-evaluate/switch length
+            if selector_pointer < len(selectors_list):
+                t = tables[selectors_list[selector_pointer]]
+                table, bits, mask = t.table, t.bits, t.mask
+                selector_pointer += 1
+
+        if cnt < bits:
+            chunk = data[pos:pos + 8]
+            v = int.from_bytes(chunk, "big")
+            if len(chunk) < 8:
+                v <<= 8 * (8 - len(chunk))
+            buf = ((buf & ((1 << cnt) - 1)) << 64) | v
+            pos += 8
+            cnt += 64
+        e = table[(buf >> (cnt - bits)) & mask]
+        n = e & LENGTH_MASK
+        if not n:
+            raise Exception("unfound symbol @%r" % (divmod(pos * 8 - cnt, 8),))
+        cnt -= n
+        r = e >> LENGTH_BITS
+
+        if r <= 1:
+            if repeat == 0:
+                repeat_power = 1
+            repeat += repeat_power << r
+            repeat_power <<= 1
+            continue
+        elif repeat > 0:
+            # Remember kids: If there is only one repeated
+            # real symbol, it is encoded with *zero* Huffman
+            # bits and not output... so buffer[-1] doesn't work.
+            buffer += favourites[0:1] * repeat
+            repeat = 0
+        if r == eob:
+            break
+        o = favourites[r - 1]
+        del favourites[r - 1]
+        favourites.insert(0, o)
+        buffer.append(o)
+    b.pos, b.buf, b.cnt = pos, buf, cnt
+
+    nt = nearly_there = bwt_reverse(bytes(buffer), pointer)
+    i = 0
+    # Pointless/irritating run-length encoding step
+    while i < len(nearly_there):
+        if i < len(nearly_there) - 4 and nt[i] == nt[i + 1] == nt[i + 2] == nt[i + 3]:
+            out.append(nearly_there[i:i + 1] * (ord(nearly_there[i + 4:i + 5]) + 4))
+            i += 5
+        else:
+            out.append(nearly_there[i:i + 1])
+            i += 1
+
+
+# Sixteen bits of magic have been removed by the time we start decoding
+def bzip2_main(data, decode_block=decode_huffman_block):
+    b = RBitReader(data)
+
+    method = b.readbits(8)
+    if method != ord('h'):
+        raise Exception(
+            "Unknown (not type 'h'uffman Bzip2) compression method")
+
+    blocksize = b.readbits(8)
+    if ord('1') <= blocksize <= ord('9'):
+        blocksize = blocksize - ord('0')
+    else:
+        raise Exception("Unknown (not size '0'-'9') Bzip2 blocksize")
+
+    out = []
+    while True:
+        blocktype = b.readbits(48)
+        b.readbits(32)   # crc
+        if blocktype == 0x314159265359:  # (pi)
+            decode_block(b, out)
+        elif blocktype == 0x177245385090:  # sqrt(pi)
+            b.align()
+            break
+        else:
+            raise Exception("Illegal Bzip2 blocktype")
+    return b''.join(out)
+
+
+def decompress(data, decode_block=decode_huffman_block):
+    """Decompress a whole gzip or bzip2 file held in memory.
+
+    decode_block(b, out) decodes one bzip2 block from the RBitReader b and
+    appends its bytes to the list out (see pyflate_opt2 for another backend).
+    """
+    magic = bytes(data[:2])
+    if magic == b"\x1f\x8b":  # GZip
+        return gzip_main(memoryview(data)[2:])
+    elif magic == b"BZ":  # BZip2
+        return bzip2_main(memoryview(data)[2:], decode_block)
+    raise Exception("Unknown file magic %s, not a gzip/bzip2 file" % magic.hex())
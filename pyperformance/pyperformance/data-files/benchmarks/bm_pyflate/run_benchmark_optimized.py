@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+Pyflate benchmark with table-driven Huffman decoding and 64-bit bit-reader
+refills (opt_versions/pyflate_opt.py).
+"""
+
+import hashlib
+import os
+
+import pyperf
+
+from opt_versions.pyflate_opt import decompress
+
+
+def bench_pyflake(loops, filename):
+    input_fp = open(filename, 'rb')
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        input_fp.seek(0)
+        out = decompress(input_fp.read())
+
+    dt = pyperf.perf_counter() - t0
+    input_fp.close()
+
+    if hashlib.md5(out).hexdigest() != "afa004a630fe072901b1d9628b960974":
+        raise Exception("MD5 checksum mismatch")
+
+    return dt
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = "Pyflate benchmark (table-driven Huffman)"
+
+    filename = os.path.join(os.path.dirname(__file__),
+                            "data", "interpreter.tar.bz2")
+    runner.bench_time_func('pyflate', bench_pyflake, filename)
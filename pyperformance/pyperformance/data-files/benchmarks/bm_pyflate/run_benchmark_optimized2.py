@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+Pyflate benchmark with table-driven Huffman decoding and the NumPy bzip2
+backend: vectorized move-to-front and inverse BWT (opt_versions/pyflate_opt2.py).
+"""
+
+import hashlib
+import os
+
+import pyperf
+
+from opt_versions.pyflate_opt2 import decompress
+
+
+def bench_pyflake(loops, filename):
+    input_fp = open(filename, 'rb')
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        input_fp.seek(0)
+        out = decompress(input_fp.read())
+
+    dt = pyperf.perf_counter() - t0
+    input_fp.close()
+
+    if hashlib.md5(out).hexdigest() != "afa004a630fe072901b1d9628b960974":
+        raise Exception("MD5 checksum mismatch")
+
+    return dt
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = "Pyflate benchmark (table-driven Huffman, NumPy bzip2 backend)"
+
+    filename = os.path.join(os.path.dirname(__file__),
+                            "data", "interpreter.tar.bz2")
+    runner.bench_time_func('pyflate', bench_pyflake, filename)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for raytrace without pyperformance overhead.
+Ray packets as NumPy arrays, rendered tile by tile into a preallocated
+canvas, optionally over a process pool (opt_versions/raytrace_packet.py).
+"""
+
+import os
+import sys
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.raytrace_packet import DEFAULT_TILE, Canvas, TileRenderer, build_scene
+
+DEFAULT_WIDTH = 100
+DEFAULT_HEIGHT = 100
+# largest per-channel difference allowed against the reference picture (--check)
+CHECK_TOLERANCE = 1
+
+
+def bench_raytrace(loops, canvas, tile, workers):
+    # the pool is started once; its start-up is not part of the workload
+    with TileRenderer(build_scene(), canvas, tile, workers) as renderer:
+        for _ in range(loops):
+            renderer.render()
+    return canvas
+
+
+def check_picture(canvas):
+    """Render the reference picture and compare it byte by byte."""
+    import numpy as np
+    import raytrace_clean
+    expected = raytrace_clean.bench_raytrace(1, canvas.width, canvas.height)
+    expected = np.frombuffer(expected.bytes.tobytes(), dtype=np.uint8)
+    diff = np.abs(canvas.pixels.reshape(-1).astype(np.int16) - expected)
+    if diff.max() > CHECK_TOLERANCE:
+        raise Exception("picture differs from the reference by up to %d" % diff.max())
+    print("bytes differing from the reference: %d" % np.count_nonzero(diff))
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=1)
+    p.add_argument("--width", type=int, default=DEFAULT_WIDTH,
+                   help="Image width (default: %s)" % DEFAULT_WIDTH)
+    p.add_argument("--height", type=int, default=DEFAULT_HEIGHT,
+                   help="Image height (default: %s)" % DEFAULT_HEIGHT)
+    p.add_argument("--tile", type=int, default=DEFAULT_TILE,
+                   help="tile edge in pixels, one ray packet per tile (default: %s)" % DEFAULT_TILE)
+    p.add_argument("--workers", type=int, default=1,
+                   help="render tiles over this many processes (default: 1)")
+    p.add_argument("--filename", metavar="FILENAME.PPM",
+                   help="Output filename of the PPM picture")
+    p.add_argument("--check", action="store_true",
+                   help="also render with the reference and compare the pictures")
+    args = p.parse_args()
+    canvas = Canvas(args.width, args.height, shared=args.workers > 1)
+    try:
+        bench_raytrace(args.loops, canvas, args.tile, args.workers)
+        if args.filename:
+            canvas.write_ppm(args.filename)
+        if args.check:
+            check_picture(canvas)
+    finally:
+        canvas.close()
+    print(f"Raytrace benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Raytrace benchmark with ray packets as NumPy arrays, rendered tile by tile
+into a preallocated canvas (opt_versions/raytrace_packet.py).
+"""
+
+import pyperf
+
+from opt_versions.raytrace_packet import DEFAULT_TILE, Canvas, TileRenderer, build_scene
+
+
+DEFAULT_WIDTH = 100
+DEFAULT_HEIGHT = 100
+
+
+def bench_raytrace(loops, width, height, tile, workers, filename):
+    canvas = Canvas(width, height, shared=workers > 1)
+    with TileRenderer(build_scene(), canvas, tile, workers) as renderer:
+        range_it = range(loops)
+        t0 = pyperf.perf_counter()
+
+        for i in range_it:
+            renderer.render()
+
+        dt = pyperf.perf_counter() - t0
+
+    if filename:
+        canvas.write_ppm(filename)
+    canvas.close()
+    return dt
+
+
+def add_cmdline_args(cmd, args):
+    cmd.append("--width=%s" % args.width)
+    cmd.append("--height=%s" % args.height)
+    cmd.append("--tile=%s" % args.tile)
+    cmd.append("--workers=%s" % args.workers)
+    if args.filename:
+        cmd.extend(("--filename", args.filename))
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    cmd = runner.argparser
+    cmd.add_argument("--width",
+                     type=int, default=DEFAULT_WIDTH,
+                     help="Image width (default: %s)" % DEFAULT_WIDTH)
+    cmd.add_argument("--height",
+                     type=int, default=DEFAULT_HEIGHT,
+                     help="Image height (default: %s)" % DEFAULT_HEIGHT)
+    cmd.add_argument("--tile",
+                     type=int, default=DEFAULT_TILE,
+                     help="Tile edge in pixels (default: %s)" % DEFAULT_TILE)
+    cmd.add_argument("--workers",
+                     type=int, default=1,
+                     help="Rendering processes (default: 1)")
+    cmd.add_argument("--filename", metavar="FILENAME.PPM",
+                     help="Output filename of the PPM picture")
+
+    args = runner.parse_args()
+    runner.metadata['description'] = "Simple raytracer (ray packets)"
+    runner.metadata['raytrace_width'] = args.width
+    runner.metadata['raytrace_height'] = args.height
+
+    runner.bench_time_func('raytrace', bench_raytrace,
+                           args.width, args.height, args.tile, args.workers,
+                           args.filename)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for regex_dna without pyperformance overhead.
+The cleaned sequence is scanned in shards over a process pool sharing it
+read-only, and substituted chunk by chunk into an output of exact size
+(opt_versions/regex_dna_sharded.py); --matcher anchored selects the opt-in
+anchor-and-lookup engine instead of re. The input comes from the NumPy fasta
+generator (opt_versions/fasta.py), so --fasta-length can reach 10**7
+(100 MB) and beyond.
+"""
+
+import os
+import sys
+import time
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.fasta import make_fasta
+from opt_versions.regex_dna_sharded import CHUNK_BYTES, ENGINES
+
+DEFAULT_INIT_LEN = 100000
+DEFAULT_RNG_SEED = 42
+
+
+def bench_regex_dna(loops, seq, workers=None, chunk=CHUNK_BYTES, matcher='re'):
+    # the pool and the shared buffers are set up once; not part of the workload
+    with ENGINES[matcher](len(seq), workers, chunk) as engine:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            res = engine.run(seq)
+        dt = time.perf_counter() - t0
+        output = engine.output()
+    return res, output, dt
+
+
+def check(seq, res, output, n, rng_seed):
+    """The reference's input, counts, lengths and substituted sequence must match."""
+    import re
+    import regex_dna_clean as ref
+    if seq != ref.init_benchmarks(n, rng_seed):
+        raise Exception("make_fasta() differs from init_benchmarks()")
+    expected = ref.run_benchmarks(seq)
+    if res != expected:
+        raise Exception("run() returned %r, the reference %r" % (res, expected))
+    clean = re.sub(b'>.*\n|\n', b'', seq)
+    for f, r in ref.SUBST:
+        clean = re.sub(f, r, clean)
+    if output != clean:
+        raise Exception("substituted sequence differs from the reference")
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=10)
+    p.add_argument("--fasta-length", type=int, default=DEFAULT_INIT_LEN,
+                   help="Length of the fasta sequence "
+                        "(default: %s)" % DEFAULT_INIT_LEN)
+    p.add_argument("--rng-seed", type=int, default=DEFAULT_RNG_SEED,
+                   help="Seed of the random number generator "
+                        "(default: %s)" % DEFAULT_RNG_SEED)
+    p.add_argument("--workers", type=int, default=None,
+                   help="worker processes; 1 runs the shards in-process "
+                        "(default: one per CPU)")
+    p.add_argument("--chunk-mib", type=float, default=CHUNK_BYTES / (1 << 20),
+                   help="shard size in MiB (default: %g)" % (CHUNK_BYTES / (1 << 20)))
+    p.add_argument("--matcher", choices=sorted(ENGINES), default="re",
+                   help="re: re.finditer and re.sub per shard; anchored: bytes.find "
+                        "anchors and bytes.replace (default: re)")
+    p.add_argument("--check", action="store_true",
+                   help="also build the input and run the reference, and require the same "
+                        "input, counts, lengths and substituted sequence")
+    args = p.parse_args()
+    seq = make_fasta(args.fasta_length, args.rng_seed)
+    res, output, dt = bench_regex_dna(args.loops, seq, args.workers,
+                                      max(1, int(args.chunk_mib * (1 << 20))), args.matcher)
+    if args.check:
+        check(seq, res, output, args.fasta_length, args.rng_seed)
+    print("regex_dna: %s, %.3f s, %.1f MB/s" % (res[0], dt, args.loops * len(seq) / dt / 1e6))
+    print(f"Regex DNA benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
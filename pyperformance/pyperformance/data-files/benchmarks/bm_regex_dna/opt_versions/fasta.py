@@ -0,0 +1,142 @@
+"""
+The regex_dna input (../run_benchmark.py:init_benchmarks), built with NumPy
+so that sequences of 100 MB and more take seconds instead of minutes.
+
+The output is byte-identical to init_benchmarks(n, rng_seed):
+
+  repeat_fasta  ALU repeated, which is periodic with period len(ALU).
+  random_fasta  the reference's generator, seed = (seed * 3877 + 29573) %
+                139968, has full period 139968 (the Hull-Dobell conditions
+                hold) and its float arithmetic is exact on these integers.
+                One period of states is computed once; the characters are
+                then that period, rotated to the current state and tiled,
+                with the same bisect on the cumulative probabilities
+                (np.searchsorted(side='right')).
+
+Lines are 60 characters, written as rows of a (lines, 61) view of the
+preallocated output with '\\n' in the last column.
+"""
+
+import numpy as np
+
+__all__ = ["make_fasta", "fasta_length"]
+
+ALU = ('GGCCGGGCGCGGTGGCTCACGCCTGTAATCCCAGCACTTTGG'
+       'GAGGCCGAGGCGGGCGGATCACCTGAGGTCAGGAGTTCGAGA'
+       'CCAGCCTGGCCAACATGGTGAAACCCCGTCTCTACTAAAAAT'
+       'ACAAAAATTAGCCGGGCGTGGTGGCGCGCGCCTGTAATCCCA'
+       'GCTACTCGGGAGGCTGAGGCAGGAGAATCGCTTGAACCCGGG'
+       'AGGCGGAGGTTGCAGTGAGCCGAGATCGCGCCACTGCACTCC'
+       'AGCCTGGGCGACAGAGCGAGACTCCGTCTCAAAAA')
+
+IUB = list(zip('acgtBDHKMNRSVWY', [0.27, 0.12, 0.12, 0.27] + [0.02] * 11))
+
+HOMOSAPIENS = [
+    ('a', 0.3029549426680),
+    ('c', 0.1979883004921),
+    ('g', 0.1975473066391),
+    ('t', 0.3015094502008),
+]
+
+WIDTH = 60
+IM = 139968
+HEADERS = (b'>ONE Homo sapiens alu\n',
+           b'>TWO IUB ambiguity codes\n',
+           b'>THREE Homo sapiens frequency\n')
+# lines written per step, to bound the temporaries
+BLOCK_LINES = 1 << 16
+
+
+def _next_seed(seed):
+    return (seed * 3877.0 + 29573.0) % 139968.0
+
+
+_cycle = None
+
+
+def lcg_cycle():
+    """(states in generation order, index of each state in that order)."""
+    global _cycle
+    if _cycle is None:
+        states = np.empty(IM, dtype=np.float64)
+        seed = 0.0
+        for k in range(IM):
+            seed = _next_seed(seed)
+            states[k] = seed
+        index = np.empty(IM, dtype=np.intp)
+        index[states.astype(np.intp)] = np.arange(IM)
+        _cycle = states, index
+    return _cycle
+
+
+def make_cumulative(table):
+    P = []
+    C = []
+    prob = 0.
+    for char, p in table:
+        prob += p
+        P += [prob]
+        C += [ord(char)]
+    return (P, C)
+
+
+def fasta_length(n):
+    """len(init_benchmarks(n, ...))."""
+    return sum(len(h) for h in HEADERS) + sum(m + -(-m // WIDTH) for m in (2 * n, 3 * n, 5 * n))
+
+
+def _write_lines(out, offset, period, start, m):
+    """Write m characters of the cyclic `period`, from index start, as 60-char lines."""
+    full, rest = divmod(m, WIDTH)
+    p = len(period)
+    for first in range(0, full, BLOCK_LINES):
+        lines = min(BLOCK_LINES, full - first)
+        rows = out[offset:offset + lines * (WIDTH + 1)].reshape(lines, WIDTH + 1)
+        idx = (start + first * WIDTH + np.arange(lines * WIDTH)) % p
+        rows[:, :WIDTH] = period[idx].reshape(lines, WIDTH)
+        rows[:, WIDTH] = 10
+        offset += lines * (WIDTH + 1)
+    if rest:
+        idx = (start + full * WIDTH + np.arange(rest)) % p
+        out[offset:offset + rest] = period[idx]
+        out[offset + rest] = 10
+        offset += rest + 1
+    return offset
+
+
+def _random_fasta(out, offset, table, m, seed):
+    """random_fasta(table, m, seed) into out; returns (offset, seed)."""
+    if m <= 0:
+        return offset, seed
+    states, index = lcg_cycle()
+    probs, chars = make_cumulative(table)
+    period = np.array(chars, dtype=np.uint8)[np.searchsorted(np.array(probs), states / IM,
+                                                             side='right')]
+    first = _next_seed(float(seed))
+    start = int(index[int(first)])
+    offset = _write_lines(out, offset, period, start, m)
+    return offset, float(states[(start + m - 1) % IM])
+
+
+def make_fasta(n, rng_seed, out=None):
+    """init_benchmarks(n, rng_seed) as bytes, or written into `out` (a writable
+    buffer of at least fasta_length(n) bytes) when given; returns the length."""
+    size = fasta_length(n)
+    buf = np.empty(size, dtype=np.uint8) if out is None else \
+        np.frombuffer(out, dtype=np.uint8, count=size)
+    offset = 0
+    for k, header in enumerate(HEADERS):
+        buf[offset:offset + len(header)] = np.frombuffer(header, dtype=np.uint8)
+        offset += len(header)
+        if k == 0:
+            alu = np.frombuffer(ALU.encode(), dtype=np.uint8)
+            offset = _write_lines(buf, offset, alu, 0, 2 * n)
+        elif k == 1:
+            offset, seed = _random_fasta(buf, offset, IUB, 3 * n, rng_seed)
+        else:
+            offset, seed = _random_fasta(buf, offset, HOMOSAPIENS, 5 * n, seed)
+    assert offset == size
+    if out is None:
+        return buf.tobytes()
+    del buf
+    return size
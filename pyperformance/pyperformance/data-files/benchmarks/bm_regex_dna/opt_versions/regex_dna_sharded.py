@@ -0,0 +1,403 @@
+"""
+regex_dna over shards of the cleaned sequence.
+
+The reference (../run_benchmark.py:run_benchmarks) strips the FASTA headers
+and newlines with re.sub, runs re.findall for each of the nine VARIANTS over
+the whole sequence, then rewrites it eleven times with re.sub, once per IUB
+code. Here:
+
+  strip      headers are located with bytes.find and the newlines of the
+             rest are dropped block by block with bytes.translate, straight
+             into a shared-memory buffer.
+  scan       the cleaned sequence is cut into chunks of CHUNK_BYTES. For each
+             variant, a worker runs re.finditer over its chunk plus the
+             MAX_MATCH - 1 bytes after it, so that a match starting in the
+             chunk is seen whole, and keeps the matches starting in the
+             chunk. It also counts the IUB codes of the chunk with one
+             bincount.
+  merge      a chunk's matches are the re.findall chain started at the chunk.
+             When the previous chunk's last match runs into it, the parent
+             redoes the chain from the end of that match until it reaches
+             a match of the worker's chain, from which on both agree; the
+             counts are exactly the reference's.
+  substitute no replacement contains an IUB code, so the eleven re.sub passes
+             commute with cutting the sequence into chunks. The code counts
+             give every chunk's offset in the output, which is allocated at
+             its exact size, and each worker writes its rewritten chunk
+             there.
+
+ShardedRegexDNA owns the shared buffers and the process pool, both created
+once; with workers=1 the chunks are processed in-process, without a pool.
+
+AnchoredRegexDNA is the same pipeline without the regex engine, opt-in: each
+variant matches a finite set of MATCH_LEN-byte words (its character classes
+expanded), so candidate starts come from bytes.find on a few ANCHOR_LEN-byte
+anchors that every word contains at a known offset, a dict lookup of the
+word at each candidate says which variants match there, and the literal
+substitutions are bytes.replace.
+"""
+
+import collections
+import itertools
+import multiprocessing
+import os
+import re
+from multiprocessing import shared_memory
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+import numpy as np
+
+__all__ = ["ShardedRegexDNA", "AnchoredRegexDNA", "ENGINES", "strip_fasta", "VARIANTS",
+           "SUBST", "MAX_MATCH"]
+
+VARIANTS = (
+    b'agggtaaa|tttaccct',
+    b'[cgt]gggtaaa|tttaccc[acg]',
+    b'a[act]ggtaaa|tttacc[agt]t',
+    b'ag[act]gtaaa|tttac[agt]ct',
+    b'agg[act]taaa|ttta[agt]cct',
+    b'aggg[acg]aaa|ttt[cgt]ccct',
+    b'agggt[cgt]aa|tt[acg]accct',
+    b'agggta[cgt]a|t[acg]taccct',
+    b'agggtaa[cgt]|[acg]ttaccct',
+)
+
+SUBST = (
+    (b'B', b'(c|g|t)'), (b'D', b'(a|g|t)'), (b'H', b'(a|c|t)'),
+    (b'K', b'(g|t)'), (b'M', b'(a|c)'), (b'N', b'(a|c|g|t)'),
+    (b'R', b'(a|g)'), (b'S', b'(c|g)'), (b'V', b'(a|c|g)'),
+    (b'W', b'(a|t)'), (b'Y', b'(c|t)'),
+)
+
+CHUNK_BYTES = 1 << 20
+# bytes of the input handled per translate() call while stripping
+STRIP_BLOCK = 1 << 20
+ANCHOR_LEN = 4
+
+PATTERNS = [re.compile(v) for v in VARIANTS]
+SUBST_PATTERNS = [(re.compile(f), r) for f, r in SUBST]
+CODES = [f[0] for f, r in SUBST]
+GROWTH = [len(r) - 1 for f, r in SUBST]
+# longest match of any variant, from the regex parser
+MAX_MATCH = max(sre_parse.parse(v).getwidth()[1] for v in VARIANTS)
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def strip_fasta(seq, out):
+    """re.sub(b'>.*\\n|\\n', b'', seq) written into the writable buffer out;
+    returns the length written."""
+    n = len(seq)
+    size = 0
+    pos = 0
+    while pos < n:
+        header = seq.find(b'>', pos)
+        stop = n if header < 0 else header
+        for s in range(pos, stop, STRIP_BLOCK):
+            block = seq[s:min(s + STRIP_BLOCK, stop)].translate(None, b'\n')
+            out[size:size + len(block)] = block
+            size += len(block)
+        if header < 0:
+            break
+        eol = seq.find(b'\n', header)
+        if eol < 0:
+            # '>.*\n' needs the newline: an unterminated header is kept
+            rest = seq[header:]
+            out[size:size + len(rest)] = rest
+            size += len(rest)
+            break
+        pos = eol + 1
+    return size
+
+
+def code_counts(window, limit):
+    counts = np.bincount(np.frombuffer(window, dtype=np.uint8, count=limit), minlength=256)
+    return [int(counts[c]) for c in CODES]
+
+
+def find_chain(pattern, window, limit):
+    """(starts, ends) of the re.findall matches of window that start before limit."""
+    starts = []
+    ends = []
+    for m in pattern.finditer(window):
+        if m.start() >= limit:
+            break
+        starts.append(m.start())
+        ends.append(m.end())
+    return starts, ends
+
+
+def scan_chunk(buf, start, stop, clen):
+    """(re.findall chain of each variant from start, IUB code counts) for buf[start:stop]."""
+    window = bytes(buf[start:min(stop + MAX_MATCH - 1, clen)])
+    limit = stop - start
+    matches = []
+    for pattern in PATTERNS:
+        starts, ends = find_chain(pattern, window, limit)
+        matches.append(([start + p for p in starts], [start + p for p in ends]))
+    return matches, code_counts(window, limit)
+
+
+def substitute_chunk(src, dst, start, stop, offset):
+    """The eleven SUBST passes over src[start:stop], written to dst at offset."""
+    chunk = bytes(src[start:stop])
+    for f, r in SUBST_PATTERNS:
+        chunk = f.sub(r, chunk)
+    dst[offset:offset + len(chunk)] = chunk
+    return len(chunk)
+
+
+# Tables of the anchored matcher, built on first use.
+_words = None
+_anchors = None
+_match_len = None
+
+
+def _expand(variant):
+    """The byte strings a variant matches, when it is an alternation of literal
+    bytes and character classes."""
+    words = []
+    for alternative in variant.split(b'|'):
+        tokens = re.findall(rb'\[([^]^\\-]+)\]|([^[\]()|*+?{}.\\^$-])', alternative)
+        if b''.join(b'[%s]' % klass if klass else literal
+                    for klass, literal in tokens) != alternative:
+            raise ValueError('%r is not made of literals and character classes' % variant)
+        choices = [klass or literal for klass, literal in tokens]
+        words.extend(bytes(w) for w in itertools.product(*choices))
+    return words
+
+
+def anchor_tables():
+    """({word: indices of the variants matching it}, [(anchor, offset)], word length).
+
+    The anchors are picked greedily by the number of words they cover, until
+    every word has one of them at that offset."""
+    global _words, _anchors, _match_len
+    if _words is None:
+        words = collections.defaultdict(list)
+        for k, v in enumerate(VARIANTS):
+            for word in _expand(v):
+                words[word].append(k)
+        lengths = {len(word) for word in words}
+        if len(lengths) != 1:
+            raise ValueError('the anchored matcher needs matches of a single length')
+        uncovered = set(words)
+        anchors = []
+        while uncovered:
+            cover = collections.Counter((w[o:o + ANCHOR_LEN], o) for w in uncovered
+                                        for o in range(len(w) - ANCHOR_LEN + 1))
+            anchor = max(sorted(cover), key=cover.__getitem__)
+            anchors.append(anchor)
+            uncovered = {w for w in uncovered
+                         if w[anchor[1]:anchor[1] + ANCHOR_LEN] != anchor[0]}
+        _words, _anchors, _match_len = dict(words), anchors, lengths.pop()
+    return _words, _anchors, _match_len
+
+
+def scan_chunk_anchored(buf, start, stop, clen):
+    """scan_chunk() with bytes.find anchors and word lookups instead of re."""
+    words, anchors, match_len = anchor_tables()
+    window = bytes(buf[start:min(stop + match_len - 1, clen)])
+    limit = stop - start
+    candidates = set()
+    for anchor, offset in anchors:
+        i = window.find(anchor, offset)
+        while i >= 0 and i - offset < limit:
+            candidates.add(i - offset)
+            i = window.find(anchor, i + 1)
+    chains = [([], []) for _ in VARIANTS]
+    free = [0] * len(VARIANTS)
+    get = words.get
+    for p in sorted(candidates):
+        for k in get(window[p:p + match_len], ()):
+            if p >= free[k]:
+                free[k] = p + match_len
+                chains[k][0].append(start + p)
+                chains[k][1].append(start + p + match_len)
+    return chains, code_counts(window, limit)
+
+
+def substitute_chunk_literal(src, dst, start, stop, offset):
+    """substitute_chunk() with bytes.replace: the SUBST patterns are single bytes."""
+    chunk = bytes(src[start:stop])
+    for f, r in SUBST:
+        chunk = chunk.replace(f, r)
+    dst[offset:offset + len(chunk)] = chunk
+    return len(chunk)
+
+
+MATCHERS = {
+    're': (scan_chunk, substitute_chunk),
+    'anchored': (scan_chunk_anchored, substitute_chunk_literal),
+}
+
+# Worker state: the cleaned sequence and the current output buffer.
+_input = None
+_output = None
+
+
+def _attach(name):
+    global _input
+    _input = shared_memory.SharedMemory(name=name)
+
+
+def _scan(task):
+    matcher, start, stop, clen = task
+    return MATCHERS[matcher][0](_input.buf, start, stop, clen)
+
+
+def _substitute(task):
+    global _output
+    matcher, name, start, stop, offset = task
+    if _output is None or _output.name != name:
+        if _output is not None:
+            _output.close()
+        _output = shared_memory.SharedMemory(name=name)
+    return MATCHERS[matcher][1](_input.buf, _output.buf, start, stop, offset)
+
+
+def count_matches(chunks, bounds, rescan):
+    """re.findall counts from the per-chunk chains, in chunk order.
+
+    rescan(k, pos, stop) gives the chain of variant k from pos, for the
+    chunks whose own chain overlaps the previous chunk's last match."""
+    results = []
+    for k in range(len(VARIANTS)):
+        count = 0
+        free = 0
+        for (s, e), (matches, codes) in zip(bounds, chunks):
+            starts, ends = matches[k]
+            i = 0
+            if starts and starts[0] < free:
+                index = {p: j for j, p in enumerate(starts)}
+                i = len(starts)
+                for p, q in zip(*rescan(k, free, e)):
+                    if p in index:
+                        i = index[p]
+                        break
+                    count += 1
+                    free = q
+            count += len(starts) - i
+            if i < len(starts):
+                free = ends[-1]
+        results.append(count)
+    return results
+
+
+class ShardedRegexDNA(object):
+    '''run_benchmarks() over CHUNK_BYTES shards of the cleaned sequence.
+
+       o capacity  largest input, in bytes, that run() will be given
+       o workers   pool size (default: the CPUs this process may run on);
+                   1 processes the chunks in-process
+       o chunk     shard size in bytes'''
+
+    matcher = 're'
+
+    def __init__(self, capacity, workers=None, chunk=CHUNK_BYTES):
+        if chunk < 1:
+            raise ValueError('chunk must be positive')
+        self.capacity = capacity
+        self.chunk = chunk
+        self.workers = workers or available_cpus()
+        self._scan, self._substitute = MATCHERS[self.matcher]
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, capacity))
+        self._out = None
+        self.output_size = 0
+        self._pool = None
+        if self.workers > 1:
+            self._pool = multiprocessing.Pool(self.workers, _attach, (self._shm.name,))
+
+    def _output_buffer(self, size):
+        if self._out is None or self._out.size < size:
+            if self._out is not None:
+                self._out.close()
+                self._out.unlink()
+            self._out = shared_memory.SharedMemory(create=True, size=max(1, size))
+        return self._out
+
+    def _rescan(self, clen):
+        def rescan(k, pos, stop):
+            window = bytes(self._shm.buf[pos:min(stop + MAX_MATCH - 1, clen)])
+            starts, ends = find_chain(PATTERNS[k], window, stop - pos)
+            return [pos + p for p in starts], [pos + p for p in ends]
+        return rescan
+
+    def run(self, seq):
+        """(results, ilen, clen, len of the substituted sequence), as run_benchmarks()."""
+        ilen = len(seq)
+        if ilen > self.capacity:
+            raise ValueError('sequence of %d bytes exceeds the capacity of %d'
+                             % (ilen, self.capacity))
+        clen = strip_fasta(seq, self._shm.buf)
+        bounds = [(s, min(s + self.chunk, clen)) for s in range(0, clen, self.chunk)]
+
+        if self._pool is None:
+            chunks = [self._scan(self._shm.buf, s, e, clen) for s, e in bounds]
+        else:
+            chunks = self._pool.map(_scan, [(self.matcher, s, e, clen) for s, e in bounds])
+        results = count_matches(chunks, bounds, self._rescan(clen))
+
+        offsets = []
+        size = 0
+        for (s, e), (matches, codes) in zip(bounds, chunks):
+            offsets.append(size)
+            size += e - s + sum(c * g for c, g in zip(codes, GROWTH))
+        out = self._output_buffer(size)
+        if self._pool is None:
+            for (s, e), offset in zip(bounds, offsets):
+                self._substitute(self._shm.buf, out.buf, s, e, offset)
+        else:
+            self._pool.map(_substitute, [(self.matcher, out.name, s, e, offset)
+                                         for (s, e), offset in zip(bounds, offsets)])
+        self.output_size = size
+        return results, ilen, clen, size
+
+    def output(self):
+        """The substituted sequence of the last run()."""
+        return bytes(self._out.buf[:self.output_size]) if self._out is not None else b''
+
+    def close(self):
+        if self._shm is None:
+            return
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for shm in (self._shm, self._out):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._shm = self._out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AnchoredRegexDNA(ShardedRegexDNA):
+    '''ShardedRegexDNA with anchor-and-lookup matching and bytes.replace
+       substitution instead of the regex engine (opt-in; see the module
+       docstring). Boundary chains are still redone with re.'''
+
+    matcher = 'anchored'
+
+    def __init__(self, capacity, workers=None, chunk=CHUNK_BYTES):
+        anchor_tables()
+        ShardedRegexDNA.__init__(self, capacity, workers, chunk)
+
+
+ENGINES = {
+    're': ShardedRegexDNA,
+    'anchored': AnchoredRegexDNA,
+}
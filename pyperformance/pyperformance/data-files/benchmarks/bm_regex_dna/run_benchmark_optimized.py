@@ -0,0 +1,74 @@
+"""
+regex_dna over shards of the cleaned sequence in a process pool, with
+re.finditer per shard and chunked re.sub into an output of exact size
+(opt_versions/regex_dna_sharded.py). The input is built by the NumPy
+fasta generator (opt_versions/fasta.py), byte-identical to init_benchmarks().
+"""
+
+import pyperf
+
+from opt_versions.fasta import make_fasta
+from opt_versions.regex_dna_sharded import ShardedRegexDNA
+
+DEFAULT_INIT_LEN = 100000
+DEFAULT_RNG_SEED = 42
+
+
+def bench_regex_dna(loops, seq, expected_res, workers):
+    # the pool and the shared buffers are set up once; not part of the workload
+    with ShardedRegexDNA(len(seq), workers) as engine:
+        range_it = range(loops)
+        t0 = pyperf.perf_counter()
+
+        for i in range_it:
+            res = engine.run(seq)
+
+        dt = pyperf.perf_counter() - t0
+    if (expected_res is not None) and (res != expected_res):
+        raise Exception("run() error")
+
+    return dt
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--fasta-length", str(args.fasta_length),
+                "--rng-seed", str(args.rng_seed)))
+    if args.workers is not None:
+        cmd.extend(("--workers", str(args.workers)))
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata['description'] = ("Test the performance of regexps "
+                                      "using benchmarks from "
+                                      "The Computer Language Benchmarks Game "
+                                      "(sharded multiprocess version).")
+
+    cmd = runner.argparser
+    cmd.add_argument("--fasta-length", type=int, default=DEFAULT_INIT_LEN,
+                     help="Length of the fasta sequence "
+                          "(default: %s)" % DEFAULT_INIT_LEN)
+    cmd.add_argument("--rng-seed", type=int, default=DEFAULT_RNG_SEED,
+                     help="Seed of the random number generator "
+                          "(default: %s)" % DEFAULT_RNG_SEED)
+    cmd.add_argument("--workers", type=int, default=None,
+                     help="worker processes; 1 runs the shards in-process "
+                          "(default: one per CPU)")
+
+    args = runner.parse_args()
+    if args.fasta_length == 100000:
+        expected_len = 1016745
+        expected_res = ([6, 26, 86, 58, 113, 31, 31, 32, 43],
+                        1016745, 1000000, 1336326)
+    else:
+        expected_len = None
+        expected_res = None
+
+    runner.metadata['regex_dna_fasta_len'] = args.fasta_length
+    runner.metadata['regex_dna_rng_seed'] = args.rng_seed
+
+    seq = make_fasta(args.fasta_length, args.rng_seed)
+    if (expected_len is not None) and (len(seq) != expected_len):
+        raise Exception("make_fasta() error")
+
+    runner.bench_time_func('regex_dna', bench_regex_dna, seq, expected_res, args.workers)
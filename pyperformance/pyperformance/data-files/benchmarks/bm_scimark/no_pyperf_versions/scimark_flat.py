@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for scimark without pyperformance overhead.
+Contiguous float64 kernels (opt_versions/scimark_flat.py): red-black SOR,
+np.add.reduceat CSR matmult, blocked LU and a vectorized radix-2 FFT, with
+the same Mflops accounting as scimark_clean.
+"""
+
+import os
+import sys
+import time
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+
+from opt_versions.scimark_flat import (FFT_inverse, FFT_transform, LU_factor, Random,
+                                       SOR_execute, SparseCompRow_matmult, random_matrix,
+                                       sparse_matrix)
+from scimark_clean import resize, run
+
+# relative difference allowed against the reference kernels (--check)
+CHECK_RTOL = 1e-12
+
+
+def bench_SOR(loops, n, cycles):
+    range_it = range(loops)
+    t0 = time.perf_counter()
+
+    for _ in range_it:
+        G = np.zeros((n, n))
+        SOR_execute(1.25, G, cycles)
+
+    return time.perf_counter() - t0
+
+
+def bench_SparseMatMult(cycles, N, nz):
+    x = np.zeros(N)
+    y = np.zeros(N)
+    val, row, col = sparse_matrix(N, nz)
+
+    t0 = time.perf_counter()
+    SparseCompRow_matmult(N, y, val, row, col, x, cycles)
+    return time.perf_counter() - t0
+
+
+def bench_LU(cycles, N):
+    A = random_matrix(Random(7), N)
+    lu = np.empty_like(A)
+    pivot = np.zeros(N, dtype=np.intp)
+    range_it = range(cycles)
+    t0 = time.perf_counter()
+
+    for _ in range_it:
+        lu[...] = A
+        LU_factor(lu, pivot)
+
+    return time.perf_counter() - t0
+
+
+def bench_FFT(loops, N, cycles):
+    twoN = 2 * N
+    init_vec = np.array(Random(7).RandomVector(twoN))
+    range_it = range(loops)
+    t0 = time.perf_counter()
+
+    for _ in range_it:
+        x = init_vec.copy()
+        for i in range(cycles):
+            FFT_transform(twoN, x)
+            FFT_inverse(twoN, x)
+
+    return time.perf_counter() - t0
+
+
+BENCHMARKS = {
+    # function name => arguments, as in scimark_clean (no monte_carlo kernel here)
+    'sor': (bench_SOR, 100, 10),
+    'sparse_mat_mult': (bench_SparseMatMult, 1000, 50 * 1000),
+    'lu': (bench_LU, 100,),
+    'fft': (bench_FFT, 1024, 50),
+}
+
+
+def assert_close(name, got, expected):
+    expected = np.asarray(expected, dtype=np.float64)
+    err = np.max(np.abs(got - expected)) if expected.size else 0.0
+    if err > CHECK_RTOL * max(1.0, np.max(np.abs(expected))):
+        raise Exception("%s differs from the reference by %r" % (name, err))
+
+
+def check(bench, args):
+    """Compare one run of the kernel with the pure-Python reference on random data."""
+    import scimark_clean as ref
+    if bench == 'sor':
+        # red-black differs from the reference's lexicographic sweep, so the
+        # reference here is the same red-black order in scalar Python
+        n = args[1]
+        G = random_matrix(Random(5), n)
+        expected = G.tolist()
+        for colour in (0, 1):
+            for y in range(1, n - 1):
+                for x in range(1, n - 1):
+                    if (x + y) % 2 == colour:
+                        expected[y][x] = (1.25 * 0.25 * (expected[y - 1][x] + expected[y + 1][x]
+                                                         + expected[y][x - 1] + expected[y][x + 1])
+                                          + (1.0 - 1.25) * expected[y][x])
+        SOR_execute(1.25, G, 1)
+        assert_close('sor', G, expected)
+    elif bench == 'sparse_mat_mult':
+        N, nz = args[1], args[2]
+        val, row, col = sparse_matrix(N, nz)
+        rnd = Random(5)
+        val[:] = rnd.RandomVector(len(val))
+        x = np.array(rnd.RandomVector(N))
+        y = np.zeros(N)
+        SparseCompRow_matmult(N, y, val, row, col, x, 1)
+        expected = ref.array('d', [0]) * N
+        ref.SparseCompRow_matmult(N, expected, ref.array('d', val), row.tolist(),
+                                  col.tolist(), ref.array('d', x), 1)
+        assert_close('sparse_mat_mult', y, expected)
+    elif bench == 'lu':
+        N = args[1]
+        lu = random_matrix(Random(7), N)
+        pivot = np.zeros(N, dtype=np.intp)
+        LU_factor(lu, pivot)
+        expected = ref.Random(7).RandomMatrix(ref.ArrayList(N, N))
+        expected_pivot = ref.array('i', [0]) * N
+        ref.LU_factor(expected, expected_pivot)
+        if pivot.tolist() != expected_pivot.tolist():
+            raise Exception("lu pivots differ from the reference")
+        assert_close('lu', lu, [list(r) for r in expected.data])
+    elif bench == 'fft':
+        twoN = 2 * args[1]
+        x = np.array(Random(7).RandomVector(twoN))
+        expected = ref.Random(7).RandomVector(twoN)
+        FFT_transform(twoN, x)
+        ref.FFT_transform(twoN, expected)
+        assert_close('fft', x, expected)
+        FFT_inverse(twoN, x)
+        ref.FFT_inverse(twoN, expected)
+        assert_close('fft inverse', x, expected)
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=1)
+    p.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS),
+                   help="kernel to run, repeatable (default: all)")
+    p.add_argument("--size", type=int,
+                   help="problem size for every kernel: grid side (sor), rows (sparse_mat_mult), "
+                        "matrix side (lu), complex points (fft, a power of 2)")
+    p.add_argument("--check", action="store_true",
+                   help="also compare each kernel with the pure-Python reference on random data")
+    args = p.parse_args()
+    benchmarks = args.benchmark or sorted(BENCHMARKS)
+    run(benchmarks, args.loops, args.size, BENCHMARKS)
+    if args.check:
+        for bench in benchmarks:
+            check(bench, resize(bench, BENCHMARKS[bench], args.size))
+    print(f"Scimark benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Flat float64 kernels for scimark.
+
+Every kernel works on contiguous NumPy arrays instead of Array2D/ArrayList
+objects, array('d') loops or lists of lists:
+
+  SOR           - red-black ordering: all points of one colour depend only
+                  on the other colour, so each half sweep is one strided
+                  slice expression over the grid. (The reference sweeps in
+                  lexicographic order, which is inherently sequential; the
+                  two orderings converge to the same solution but do not
+                  give the same iterates.)
+  sparse matmult - CSR: gather x[col] * val once, then np.add.reduceat over
+                  the row starts.
+  LU            - right-looking blocked LU with partial pivoting, LU_BLOCK
+                  columns at a time. The panel is factored column by column
+                  (pivot search, row swap on row views, scaling, rank-1
+                  update within the panel), then U12 is solved and the
+                  trailing matrix gets one matrix product. The pivot rule
+                  is the reference's (the first maximum).
+  FFT           - radix-2 decimation in time as in the reference: the
+                  FFT_bitreverse ordering is computed once per size by
+                  running FFT_bitreverse itself on an index array, the
+                  twiddles come from the same sine recurrence, and each of
+                  the log2(n) stages is one vectorized butterfly over all
+                  blocks. The result matches the reference bit for bit.
+"""
+
+import math
+from array import array
+
+import numpy as np
+
+__all__ = ["SOR_execute", "SparseCompRow_matmult", "LU_factor",
+           "FFT_transform", "FFT_inverse", "int_log2", "Random",
+           "random_matrix", "sparse_matrix"]
+
+LU_BLOCK = 32
+
+
+# The reference's random number generator, so the kernels see the same inputs.
+class Random(object):
+    MDIG = 32
+    ONE = 1
+    m1 = (ONE << (MDIG - 2)) + ((ONE << (MDIG - 2)) - ONE)
+    m2 = ONE << MDIG // 2
+    dm1 = 1.0 / float(m1)
+
+    def __init__(self, seed):
+        self.initialize(seed)
+        self.left = 0.0
+        self.right = 1.0
+        self.width = 1.0
+        self.haveRange = False
+
+    def initialize(self, seed):
+
+        self.seed = seed
+        seed = abs(seed)
+        jseed = min(seed, self.m1)
+        if (jseed % 2 == 0):
+            jseed -= 1
+        k0 = 9069 % self.m2
+        k1 = 9069 / self.m2
+        j0 = jseed % self.m2
+        j1 = jseed / self.m2
+        self.m = array('d', [0]) * 17
+        for iloop in range(17):
+            jseed = j0 * k0
+            j1 = (jseed / self.m2 + j0 * k1 + j1 * k0) % (self.m2 / 2)
+            j0 = jseed % self.m2
+            self.m[iloop] = j0 + self.m2 * j1
+        self.i = 4
+        self.j = 16
+
+    def nextDouble(self):
+        I, J, m = self.i, self.j, self.m
+        k = m[I] - m[J]
+        if (k < 0):
+            k += self.m1
+        self.m[J] = k
+
+        if (I == 0):
+            I = 16
+        else:
+            I -= 1
+        self.i = I
+
+        if (J == 0):
+            J = 16
+        else:
+            J -= 1
+        self.j = J
+
+        if (self.haveRange):
+            return self.left + self.dm1 * float(k) * self.width
+        else:
+            return self.dm1 * float(k)
+
+    def RandomVector(self, n):
+        return array('d', [self.nextDouble() for i in range(n)])
+
+
+def random_matrix(rnd, N):
+    """An N x N matrix filled row by row, like Random.RandomMatrix."""
+    return np.array(rnd.RandomVector(N * N)).reshape(N, N)
+
+
+def sparse_matrix(N, nz):
+    """The reference's CSR structure (val, row, col): nz // N entries per row, spread by r // nr."""
+    nr = nz // N
+    anz = nr * N
+    step = np.maximum(np.arange(N) // nr, 1)
+    col = np.zeros(nz, dtype=np.intp)
+    col[:anz] = (np.arange(nr)[None, :] * step[:, None]).ravel()
+    row = np.arange(N + 1, dtype=np.intp) * nr
+    return np.zeros(anz), row, col
+
+
+def SOR_execute(omega, G, cycles):
+    """`cycles` red-black SOR sweeps over the interior of the 2-D array G, in place."""
+    h, w = G.shape
+    a = omega * 0.25
+    b = 1.0 - omega
+    for p in range(cycles):
+        for colour in (0, 1):
+            # interior rows starting at y = 1 and y = 2, with x + y = colour (mod 2)
+            for y0 in (1, 2):
+                x0 = 1 + (y0 + 1 + colour) % 2
+                c = G[y0:h - 1:2, x0:w - 1:2]
+                if not c.size:
+                    continue
+                rows = c.shape[0]
+                cols = c.shape[1]
+                up = G[y0 - 1:y0 - 1 + 2 * rows:2, x0:x0 + 2 * cols:2]
+                down = G[y0 + 1:y0 + 1 + 2 * rows:2, x0:x0 + 2 * cols:2]
+                left = G[y0:y0 + 2 * rows:2, x0 - 1:x0 - 1 + 2 * cols:2]
+                right = G[y0:y0 + 2 * rows:2, x0 + 1:x0 + 1 + 2 * cols:2]
+                c[...] = a * (up + down + left + right) + b * c
+
+
+def SparseCompRow_matmult(M, y, val, row, col, x, num_iterations):
+    """y = A x for the M-row CSR matrix (val, row, col), num_iterations times."""
+    nnz = row[M]
+    starts = row[:M]
+    nonempty = starts < row[1:M + 1]
+    starts = starts[nonempty]
+    col = col[:nnz]
+    val = val[:nnz]
+    prod = np.empty(nnz)
+    y[~nonempty] = 0.0
+    for _ in range(num_iterations):
+        np.take(x, col, out=prod)
+        prod *= val
+        if len(starts):
+            y[nonempty] = np.add.reduceat(prod, starts)
+
+
+def LU_factor(A, pivot, block=LU_BLOCK):
+    """Factor the 2-D array A in place into L\\U with partial pivoting; pivot gets the row swaps."""
+    M, N = A.shape
+    minMN = min(M, N)
+    tmp = np.empty(N)
+    for j0 in range(0, minMN, block):
+        j1 = min(j0 + block, minMN)
+        for j in range(j0, j1):
+            jp = j + int(np.argmax(np.abs(A[j:, j])))
+            pivot[j] = jp
+
+            if A[jp, j] == 0:
+                raise Exception("factorization failed because of zero pivot")
+
+            if jp != j:
+                tmp[:] = A[j]
+                A[j] = A[jp]
+                A[jp] = tmp
+
+            if j < M - 1:
+                recp = 1.0 / A[j, j]
+                A[j + 1:, j] *= recp
+
+            if j < minMN - 1:
+                # the rest of the row is updated once the panel is done
+                A[j + 1:, j + 1:j1] -= np.outer(A[j + 1:, j], A[j, j + 1:j1])
+
+        if j1 < N:
+            # U12 = L11^-1 A12, then the trailing update A22 -= L21 U12
+            for j in range(j0, j1 - 1):
+                A[j + 1:j1, j1:] -= np.outer(A[j + 1:j1, j], A[j, j1:])
+            A[j1:, j1:] -= A[j1:, j0:j1] @ A[j0:j1, j1:]
+
+
+def int_log2(n):
+    k = 1
+    log = 0
+    while k < n:
+        k *= 2
+        log += 1
+    if n != 1 << log:
+        raise Exception("FFT: Data length is not a power of 2: %s" % n)
+    return log
+
+
+def FFT_bitreverse(N, data):
+    n = N // 2
+    nm1 = n - 1
+    j = 0
+    for i in range(nm1):
+        ii = i << 1
+        jj = j << 1
+        k = n >> 1
+        if i < j:
+            tmp_real = data[ii]
+            tmp_imag = data[ii + 1]
+            data[ii] = data[jj]
+            data[ii + 1] = data[jj + 1]
+            data[jj] = tmp_real
+            data[jj + 1] = tmp_imag
+        while k <= j:
+            j -= k
+            k >>= 1
+        j += k
+
+
+_permutations = {}
+_twiddles = {}
+
+
+def bitreverse_permutation(N):
+    """Indices p such that data[p] is data after FFT_bitreverse(N, data)."""
+    p = _permutations.get(N)
+    if p is None:
+        p = list(range(N))
+        FFT_bitreverse(N, p)
+        p = _permutations[N] = np.array(p)
+    return p
+
+
+def twiddles(dual, direction):
+    """w_a for a in range(dual), from the reference's sine recurrence."""
+    key = (dual, direction)
+    w = _twiddles.get(key)
+    if w is None:
+        w_real = 1.0
+        w_imag = 0.0
+        theta = 2.0 * direction * math.pi / (2.0 * float(dual))
+        s = math.sin(theta)
+        t = math.sin(theta / 2.0)
+        s2 = 2.0 * t * t
+        re = [w_real]
+        im = [w_imag]
+        for a in range(1, dual):
+            tmp_real = w_real - s * w_imag - s2 * w_real
+            tmp_imag = w_imag + s * w_real - s2 * w_imag
+            w_real = tmp_real
+            w_imag = tmp_imag
+            re.append(w_real)
+            im.append(w_imag)
+        w = _twiddles[key] = (np.array(re), np.array(im))
+    return w
+
+
+def FFT_transform_internal(N, data, direction):
+    n = N // 2
+    if n == 1:
+        return
+
+    logn = int_log2(n)
+    data[:] = data[bitreverse_permutation(N)]
+
+    dual = 1
+    for bit in range(logn):
+        w_real, w_imag = twiddles(dual, direction)
+        # (block, i or j = i + dual, a, real or imaginary)
+        v = data.reshape(n // (2 * dual), 2, dual, 2)
+        z1_real = v[:, 1, :, 0]
+        z1_imag = v[:, 1, :, 1]
+        wd_real = w_real * z1_real - w_imag * z1_imag
+        wd_imag = w_real * z1_imag + w_imag * z1_real
+        v[:, 1, :, 0] = v[:, 0, :, 0] - wd_real
+        v[:, 1, :, 1] = v[:, 0, :, 1] - wd_imag
+        v[:, 0, :, 0] += wd_real
+        v[:, 0, :, 1] += wd_imag
+        dual *= 2
+
+
+def FFT_transform(N, data):
+    FFT_transform_internal(N, data, -1)
+
+
+def FFT_inverse(N, data):
+    n = N / 2
+    FFT_transform_internal(N, data, +1)
+    data *= 1 / float(n)
@@ -0,0 +1,93 @@
+"""
+Scimark kernels on contiguous float64 arrays: red-black SOR, np.add.reduceat
+CSR matmult, blocked LU and a vectorized radix-2 FFT
+(opt_versions/scimark_flat.py).
+"""
+
+import numpy as np
+import pyperf
+
+from opt_versions.scimark_flat import (FFT_inverse, FFT_transform, LU_factor, Random,
+                                       SOR_execute, SparseCompRow_matmult, random_matrix,
+                                       sparse_matrix)
+
+
+def bench_SOR(loops, n, cycles):
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        G = np.zeros((n, n))
+        SOR_execute(1.25, G, cycles)
+
+    return pyperf.perf_counter() - t0
+
+
+def bench_SparseMatMult(cycles, N, nz):
+    x = np.zeros(N)
+    y = np.zeros(N)
+    val, row, col = sparse_matrix(N, nz)
+
+    t0 = pyperf.perf_counter()
+    SparseCompRow_matmult(N, y, val, row, col, x, cycles)
+    return pyperf.perf_counter() - t0
+
+
+def bench_LU(cycles, N):
+    A = random_matrix(Random(7), N)
+    lu = np.empty_like(A)
+    pivot = np.zeros(N, dtype=np.intp)
+    range_it = range(cycles)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        lu[...] = A
+        LU_factor(lu, pivot)
+
+    return pyperf.perf_counter() - t0
+
+
+def bench_FFT(loops, N, cycles):
+    twoN = 2 * N
+    init_vec = np.array(Random(7).RandomVector(twoN))
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        x = init_vec.copy()
+        for i in range(cycles):
+            FFT_transform(twoN, x)
+            FFT_inverse(twoN, x)
+
+    return pyperf.perf_counter() - t0
+
+
+def add_cmdline_args(cmd, args):
+    if args.benchmark:
+        cmd.append(args.benchmark)
+
+
+BENCHMARKS = {
+    # function name => arguments
+    'sor': (bench_SOR, 100, 10),
+    'sparse_mat_mult': (bench_SparseMatMult, 1000, 50 * 1000),
+    'lu': (bench_LU, 100,),
+    'fft': (bench_FFT, 1024, 50),
+}
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.argparser.add_argument("benchmark", nargs='?',
+                                  choices=sorted(BENCHMARKS))
+
+    args = runner.parse_args()
+    if args.benchmark:
+        benchmarks = (args.benchmark,)
+    else:
+        benchmarks = sorted(BENCHMARKS)
+
+    for bench in benchmarks:
+        name = 'scimark_%s' % bench
+        args = BENCHMARKS[bench]
+        runner.bench_time_func(name, *args)
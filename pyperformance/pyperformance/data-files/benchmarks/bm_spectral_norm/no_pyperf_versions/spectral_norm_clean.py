@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for spectral_norm without pyperformance overhead.
+The original pure-Python implementation, with the matrix size as a parameter.
+"""
+
+import math
+
+DEFAULT_N = 130
+
+
+def eval_A(i, j):
+    return 1.0 / ((i + j) * (i + j + 1) // 2 + i + 1)
+
+
+def eval_times_u(func, u):
+    return [func((i, u)) for i in range(len(list(u)))]
+
+
+def eval_AtA_times_u(u):
+    return eval_times_u(part_At_times_u, eval_times_u(part_A_times_u, u))
+
+
+def part_A_times_u(i_u):
+    i, u = i_u
+    partial_sum = 0
+    for j, u_j in enumerate(u):
+        partial_sum += eval_A(i, j) * u_j
+    return partial_sum
+
+
+def part_At_times_u(i_u):
+    i, u = i_u
+    partial_sum = 0
+    for j, u_j in enumerate(u):
+        partial_sum += eval_A(j, i) * u_j
+    return partial_sum
+
+
+def bench_spectral_norm(loops, n=DEFAULT_N):
+    for _ in range(loops):
+        u = [1] * n
+
+        for dummy in range(10):
+            v = eval_AtA_times_u(u)
+            u = eval_AtA_times_u(v)
+
+        vBv = vv = 0
+
+        for ue, ve in zip(u, v):
+            vBv += ue * ve
+            vv += ve * ve
+
+    return math.sqrt(vBv / vv)
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=10)
+    p.add_argument("--n", type=int, default=DEFAULT_N,
+                   help="matrix size (default: %d)" % DEFAULT_N)
+    args = p.parse_args()
+    print("spectral norm: %.9f" % bench_spectral_norm(args.loops, args.n))
+    print(f"Spectral norm benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Clean benchmark for spectral_norm without pyperformance overhead.
+Matrix-free row blocks over a process pool with shared-memory u/v buffers
+(opt_versions/spectral_norm_opt.py, ParallelEngine).
+"""
+
+import os
+import sys
+# Add parent directory to path to enable importing from opt_versions
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from opt_versions.spectral_norm_opt import ParallelEngine, spectral_norm
+
+DEFAULT_N = 130
+# relative difference allowed against the pure-Python reference (--check)
+CHECK_RTOL = 1e-12
+
+
+def bench_spectral_norm(loops, n, workers):
+    # the pool is started once; its start-up is not part of the workload
+    with ParallelEngine(n, workers) as engine:
+        for _ in range(loops):
+            result = spectral_norm(engine)
+    return result
+
+
+def check_result(result, n):
+    import spectral_norm_clean
+    expected = spectral_norm_clean.bench_spectral_norm(1, n)
+    if abs(result - expected) > CHECK_RTOL * expected:
+        raise Exception("spectral norm %r differs from the reference %r" % (result, expected))
+
+
+def main():
+    import argparse
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("loops", nargs="?", type=int, default=10)
+    p.add_argument("--n", type=int, default=DEFAULT_N,
+                   help="matrix size (default: %d)" % DEFAULT_N)
+    p.add_argument("--workers", type=int, default=None,
+                   help="worker processes (default: one per CPU)")
+    p.add_argument("--check", action="store_true",
+                   help="also run the pure-Python reference (O(n^2) per product) "
+                        "and require a matching result")
+    args = p.parse_args()
+    result = bench_spectral_norm(args.loops, args.n, args.workers)
+    if args.check:
+        check_result(result, args.n)
+    print("spectral norm: %.9f" % result)
+    print(f"Spectral norm benchmark completed with {args.loops} loops")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Spectral norm engines.
+
+The reference evaluates eval_A(i, j) for every element of A on each of the
+20 A^T A u products, through per-row tuples and list(u) copies. Both engines
+here compute the same A^T (A u) on float64 arrays, generating elements of A
+as whole rows (a_rows):
+
+  MatrixEngine   - A is built once with NumPy broadcasting and every product
+                   is a BLAS matrix-vector call. A is held as row blocks of
+                   about BLOCK_BYTES; blocks are kept up to CACHE_BYTES, and
+                   rows beyond that budget are regenerated on each use, so
+                   N is not limited by memory. Each block contributes
+                   B^T (B u) in a single pass over it.
+  ParallelEngine - matrix-free: nothing of A is stored. A process pool
+                   splits the rows of A into one range per worker. Each
+                   worker generates its rows B in tiles of about TILE_ELEMS
+                   and accumulates B^T (B u), which needs only its own rows,
+                   into its own partial v. u and the partials live in one
+                   shared-memory buffer, so a product only sends row ranges
+                   to the workers, and the parent sums the partials.
+"""
+
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+__all__ = ["MatrixEngine", "ParallelEngine", "spectral_norm", "a_rows"]
+
+BLOCK_BYTES = 1 << 25
+CACHE_BYTES = 1 << 30
+TILE_ELEMS = 1 << 18
+
+
+def _triangular(stop, n):
+    """Windows of n consecutive triangular numbers: row k holds T(k) .. T(k + n - 1)."""
+    m = np.arange(stop + n, dtype=np.float64)
+    return sliding_window_view(m * (m + 1) / 2, n)
+
+
+def a_rows(start, stop, n):
+    """A[start:stop, :n] as a float64 array.
+
+    The reference's A[i, j] is 1 / (T(i + j) + i + 1) with T(k) = k(k + 1) / 2,
+    so a row is a window of triangular numbers plus a constant: one add and
+    one divide per element, no integer arithmetic. The values are exact
+    integers below 2**53, so the result matches the reference bit for bit.
+    """
+    return 1.0 / (_triangular(stop, n)[start:stop]
+                  + np.arange(start + 1, stop + 1, dtype=np.float64)[:, None])
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def row_ranges(n, rows):
+    return [(s, min(s + rows, n)) for s in range(0, n, rows)]
+
+
+class Engine(object):
+    '''Computes A^T A u for the n x n spectral norm matrix.'''
+
+    def __init__(self, n):
+        if n < 1:
+            raise ValueError('n must be positive')
+        self.n = n
+
+    def AtA_times_u(self, u):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MatrixEngine(Engine):
+    '''A cached as float64 row blocks, BLAS matrix-vector products.'''
+
+    def __init__(self, n, block_bytes=BLOCK_BYTES, cache_bytes=CACHE_BYTES):
+        Engine.__init__(self, n)
+        rows = max(1, block_bytes // (8 * n))
+        self.blocks = []
+        cached = 0
+        for start, stop in row_ranges(n, rows):
+            size = 8 * n * (stop - start)
+            block = None
+            if cached + size <= cache_bytes:
+                block = a_rows(start, stop, n)
+                cached += size
+            self.blocks.append((start, stop, block))
+        self.cached_bytes = cached
+
+    def AtA_times_u(self, u):
+        n = self.n
+        v = np.zeros(n)
+        for start, stop, block in self.blocks:
+            if block is None:
+                block = a_rows(start, stop, n)
+            v += block.T @ (block @ u)
+        return v
+
+
+# Worker state for ParallelEngine: the shared array of u and the partial v's.
+_shared = None
+_buffers = None
+
+
+def _attach(name, shape):
+    global _shared, _buffers
+    _shared = shared_memory.SharedMemory(name=name)
+    _buffers = np.ndarray(shape, dtype=np.float64, buffer=_shared.buf)
+
+
+def _partial_AtA_times_u(task):
+    '''B^T (B u) for the rows B = A[start:stop] into partial `slot`, tile by tile.'''
+    slot, start, stop = task
+    n = _buffers.shape[1]
+    u, v = _buffers[0], _buffers[1 + slot]
+    v[:] = 0.0
+    for s, e in row_ranges(stop - start, max(1, TILE_ELEMS // n)):
+        tile = a_rows(start + s, start + e, n)
+        v += tile.T @ (tile @ u)
+
+
+class ParallelEngine(Engine):
+    '''Matrix-free products over a process pool and shared u/v buffers.
+
+       o workers  pool size (default: the CPUs this process may run on)'''
+
+    def __init__(self, n, workers=None):
+        Engine.__init__(self, n)
+        self.workers = workers or available_cpus()
+        rows = -(-n // self.workers)
+        self._tasks = [(k, s, e) for k, (s, e) in enumerate(row_ranges(n, rows))]
+        shape = (1 + len(self._tasks), n)
+        self._shm = shared_memory.SharedMemory(create=True, size=8 * shape[0] * n)
+        self._buffers = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf)
+        self._pool = multiprocessing.Pool(self.workers, _attach, (self._shm.name, shape))
+
+    def AtA_times_u(self, u):
+        self._buffers[0] = u
+        self._pool.map(_partial_AtA_times_u, self._tasks)
+        return self._buffers[1:].sum(axis=0)
+
+    def close(self):
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        del self._buffers
+        self._shm.close()
+        self._shm.unlink()
+
+
+def spectral_norm(engine, iterations=10):
+    """The reference's power iteration on engine.n: sqrt(u.v / v.v)."""
+    u = np.ones(engine.n)
+    for _ in range(iterations):
+        v = engine.AtA_times_u(u)
+        u = engine.AtA_times_u(v)
+    return math.sqrt(u @ v / (v @ v))
@@ -0,0 +1,37 @@
+"""
+Spectral norm benchmark with A cached as float64 row blocks and BLAS
+matrix-vector products (opt_versions/spectral_norm_opt.py, MatrixEngine).
+"""
+
+import pyperf
+
+from opt_versions.spectral_norm_opt import MatrixEngine, spectral_norm
+
+
+DEFAULT_N = 130
+
+
+def bench_spectral_norm(loops, n):
+    range_it = range(loops)
+    t0 = pyperf.perf_counter()
+
+    for _ in range_it:
+        with MatrixEngine(n) as engine:
+            spectral_norm(engine)
+
+    return pyperf.perf_counter() - t0
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--n", str(args.n)))
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata['description'] = (
+        'MathWorld: "Hundred-Dollar, Hundred-Digit Challenge Problems", '
+        'Challenge #3 (cached matrix, BLAS).')
+    runner.argparser.add_argument("--n", type=int, default=DEFAULT_N,
+                                  help="matrix size (default: %d)" % DEFAULT_N)
+    args = runner.parse_args()
+    runner.bench_time_func('spectral_norm', bench_spectral_norm, args.n)
@@ -0,0 +1,41 @@
+"""
+Spectral norm benchmark with matrix-free row blocks over a process pool and
+shared-memory u/v buffers (opt_versions/spectral_norm_opt.py, ParallelEngine).
+"""
+
+import pyperf
+
+from opt_versions.spectral_norm_opt import ParallelEngine, spectral_norm
+
+
+DEFAULT_N = 130
+
+
+def bench_spectral_norm(loops, n, workers):
+    with ParallelEngine(n, workers) as engine:
+        range_it = range(loops)
+        t0 = pyperf.perf_counter()
+
+        for _ in range_it:
+            spectral_norm(engine)
+
+        return pyperf.perf_counter() - t0
+
+
+def add_cmdline_args(cmd, args):
+    cmd.extend(("--n", str(args.n)))
+    if args.workers:
+        cmd.extend(("--workers", str(args.workers)))
+
+
+if __name__ == "__main__":
+    runner = pyperf.Runner(add_cmdline_args=add_cmdline_args)
+    runner.metadata['description'] = (
+        'MathWorld: "Hundred-Dollar, Hundred-Digit Challenge Problems", '
+        'Challenge #3 (matrix-free, process pool).')
+    runner.argparser.add_argument("--n", type=int, default=DEFAULT_N,
+                                  help="matrix size (default: %d)" % DEFAULT_N)
+    runner.argparser.add_argument("--workers", type=int, default=None,
+                                  help="worker processes (default: one per CPU)")
+    args = runner.parse_args()
+    runner.bench_time_func('spectral_norm', bench_spectral_norm, args.n, args.workers)
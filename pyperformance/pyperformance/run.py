@@ -1,4 +1,5 @@
 from collections import namedtuple
+import concurrent.futures
 import hashlib
 import json
 import os
@@ -8,7 +9,7 @@ import traceback
 
 import pyperformance
 from . import _utils, _python, _pythoninfo
-from .venv import VenvForBenchmarks, REQUIREMENTS_FILE
+from .venv import VenvForBenchmarks, Requirements, REQUIREMENTS_FILE
 from . import _venv
 
 
@@ -79,52 +80,7 @@ def run_benchmarks(should_run, python, options):
     info = _pythoninfo.get_info(python)
     runid = get_run_id(info)
 
-    unique = getattr(options, 'unique_venvs', False)
-    if not unique:
-        common = VenvForBenchmarks.ensure(
-            _venv.get_venv_root(runid.name, python=info),
-            info,
-            upgrade='oncreate',
-            inherit_environ=options.inherit_environ,
-        )
-
-    benchmarks = {}
-    venvs = set()
-    for i, bench in enumerate(to_run):
-        bench_runid = runid._replace(bench=bench)
-        assert bench_runid.name, (bench, bench_runid)
-        name = bench_runid.name
-        venv_root = _venv.get_venv_root(name, python=info)
-        print()
-        print('='*50)
-        print(f'({i+1:>2}/{len(to_run)}) creating venv for benchmark ({bench.name})')
-        print()
-        if not unique:
-            print('(trying common venv first)')
-            # Try the common venv first.
-            try:
-                common.ensure_reqs(bench)
-            except _venv.RequirementsInstallationFailedError:
-                print('(falling back to unique venv)')
-            else:
-                benchmarks[bench] = (common, bench_runid)
-                continue
-        try:
-            venv = VenvForBenchmarks.ensure(
-                venv_root,
-                info,
-                upgrade='oncreate',
-                inherit_environ=options.inherit_environ,
-            )
-            # XXX Do not override when there is a requirements collision.
-            venv.ensure_reqs(bench)
-        except _venv.RequirementsInstallationFailedError:
-            print('(benchmark will be skipped)')
-            print()
-            venv = None
-        venvs.add(venv_root)
-        benchmarks[bench] = (venv, bench_runid)
-    print()
+    benchmarks = ensure_venvs(to_run, runid, info, options)
 
     suite = None
     run_count = str(len(to_run))
@@ -196,15 +152,130 @@ def run_benchmarks(should_run, python, options):
     return (suite, errors)
 
 
+def get_requirements_key(bench):
+    """Return a hashable key shared by benchmarks with identical requirements."""
+    return tuple(sorted(Requirements.from_benchmarks([bench])))
+
+
+def ensure_venvs(to_run, runid, info, options):
+    """Return {bench: (venv or None, bench runid)} for the given benchmarks.
+
+    Benchmarks with identical requirements are provisioned once.  Installs
+    into the common venv are serialized (it is one environment); dedicated
+    venvs are independent, so they are built in a bounded thread pool.
+    """
+    unique = getattr(options, 'unique_venvs', False)
+    jobs = max(1, getattr(options, 'venv_jobs', None) or 1)
+    wheelhouse = getattr(options, 'wheelhouse', None)
+    if wheelhouse:
+        wheelhouse = os.path.abspath(wheelhouse)
+        print(f'(using wheelhouse {wheelhouse})')
+
+    groups = {}
+    for bench in to_run:
+        groups.setdefault(get_requirements_key(bench), []).append(bench)
+    print(f'{len(to_run)} benchmarks, {len(groups)} distinct requirement sets')
+
+    venv_for_group = {}
+    if unique:
+        pending = list(groups)
+    else:
+        common = VenvForBenchmarks.ensure(
+            _venv.get_venv_root(runid.name, python=info),
+            info,
+            upgrade='oncreate',
+            inherit_environ=options.inherit_environ,
+            wheelhouse=wheelhouse,
+        )
+        pending = []
+        for i, (key, group) in enumerate(groups.items()):
+            names = ', '.join(b.name for b in group)
+            print()
+            print('='*50)
+            print(f'({i+1:>2}/{len(groups)}) installing requirements into the common venv ({names})')
+            print()
+            try:
+                common.ensure_reqs(group[0])
+            except _venv.RequirementsInstallationFailedError:
+                print('(falling back to unique venv)')
+                pending.append(key)
+            else:
+                venv_for_group[key] = common
+
+    def create_unique(key):
+        group = groups[key]
+        if len(group) == 1:
+            # the same per-benchmark name as before requirement sets were shared
+            name = runid._replace(bench=group[0]).name
+        else:
+            reqs_id = hashlib.sha256('\n'.join(key).encode('utf-8')).hexdigest()[:12]
+            name = f'{runid.name}-reqs-{reqs_id}'
+        venv_root = _venv.get_venv_root(name, python=info)
+        names = ', '.join(b.name for b in groups[key])
+        print(f'creating venv {venv_root} for benchmark(s) {names}')
+        try:
+            venv = VenvForBenchmarks.ensure(
+                venv_root,
+                info,
+                upgrade='oncreate',
+                inherit_environ=options.inherit_environ,
+                wheelhouse=wheelhouse,
+            )
+            # XXX Do not override when there is a requirements collision.
+            venv.ensure_reqs(groups[key][0])
+        except _venv.RequirementsInstallationFailedError:
+            print(f'(benchmark(s) {names} will be skipped)')
+            return None
+        return venv
+
+    if pending:
+        print()
+        print('='*50)
+        print(f'creating {len(pending)} dedicated venv(s), {jobs} at a time')
+        print()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+            for key, venv in zip(pending, pool.map(create_unique, pending)):
+                venv_for_group[key] = venv
+    print()
+
+    benchmarks = {}
+    for key, group in groups.items():
+        for bench in group:
+            bench_runid = runid._replace(bench=bench)
+            assert bench_runid.name, (bench, bench_runid)
+            benchmarks[bench] = (venv_for_group[key], bench_runid)
+    return benchmarks
+
+
 # Utility functions
 
+def _file_stamp(filename):
+    try:
+        st = os.stat(filename)
+    except (OSError, TypeError):
+        return None
+    return (filename, st.st_mtime_ns, st.st_size)
+
+
+# {(requirements stamp, lockfile stamp): compat ID}
+_COMPAT_IDS = {}
+
+
 def get_compatibility_id(bench=None):
+    lockfile = bench.requirements_lockfile if bench else None
+    key = (_file_stamp(REQUIREMENTS_FILE), _file_stamp(lockfile))
+    try:
+        return _COMPAT_IDS[key]
+    except KeyError:
+        compat_id = _COMPAT_IDS[key] = _get_compatibility_id(lockfile)
+        return compat_id
+
+
+def _get_compatibility_id(lockfile=None):
     # XXX Do not include the pyperformance reqs if a benchmark was provided?
     reqs = sorted(_utils.iter_clean_lines(REQUIREMENTS_FILE))
-    if bench:
-        lockfile = bench.requirements_lockfile
-        if lockfile and os.path.exists(lockfile):
-            reqs += sorted(_utils.iter_clean_lines(lockfile))
+    if lockfile and os.path.exists(lockfile):
+        reqs += sorted(_utils.iter_clean_lines(lockfile))
 
     data = [
         # XXX Favor pyperf.__version__ instead?
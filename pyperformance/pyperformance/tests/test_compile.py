@@ -0,0 +1,151 @@
+import logging
+import os
+import os.path
+import tempfile
+import textwrap
+import threading
+import unittest
+from unittest import mock
+
+from pyperformance import compile as _compile
+
+
+class BuildCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.app = _compile.Application(_compile.Configuration(), None)
+        self.app.repository = mock.Mock()
+        self.cache = _compile.BuildCache(self.app, tmpdir.name, 2)
+
+    def add_build(self, revision, *, complete=True):
+        key = self.cache.get_key(revision, None, ['--with-lto'], ['make'], True)
+        entry = self.cache.create(key)
+        program = os.path.join(entry, 'prefix', 'bin', 'python3')
+        os.makedirs(os.path.dirname(program))
+        open(program, 'w').close()
+        if complete:
+            self.cache.commit(key, {'program': program, 'build_time': 60.0})
+        return key
+
+    def test_key(self):
+        get_key = self.cache.get_key
+        key = get_key('a' * 40, None, ['--with-lto'], ['make'], True)
+
+        self.assertEqual(get_key('a' * 40, None, ['--with-lto'], ['make'], True), key)
+        self.assertNotEqual(get_key('b' * 40, None, ['--with-lto'], ['make'], True), key)
+        self.assertNotEqual(get_key('a' * 40, None, [], ['make'], True), key)
+        self.assertNotEqual(get_key('a' * 40, None, ['--with-lto'], ['make', 'profile-opt'], True), key)
+        with mock.patch.dict(os.environ, {'CFLAGS': '-O0'}):
+            self.assertNotEqual(get_key('a' * 40, None, ['--with-lto'], ['make'], True), key)
+
+    def test_lookup(self):
+        complete = self.add_build('a' * 40)
+        incomplete = self.add_build('b' * 40, complete=False)
+
+        self.assertEqual(self.cache.lookup(complete)['build_time'], 60.0)
+        self.assertIsNone(self.cache.lookup(incomplete))
+        self.assertIsNone(self.cache.lookup('missing'))
+
+    def test_prune(self):
+        keys = [self.add_build(c * 40) for c in 'abc']
+        marker = os.path.join(self.cache.get_entry(keys[0]), self.cache.MARKER)
+        os.utime(marker, (0, 0))
+
+        self.cache.prune(keys[2])
+
+        self.assertIsNone(self.cache.lookup(keys[0]))
+        self.assertIsNotNone(self.cache.lookup(keys[1]))
+        self.assertIsNotNone(self.cache.lookup(keys[2]))
+
+
+class PipelineTests(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.config = os.path.join(tmpdir.name, 'compile.ini')
+        self.write_config(tmpdir.name, 'build_cache = True')
+
+    def write_config(self, tmpdir, *compile_options):
+        with open(self.config, 'w') as outfile:
+            outfile.write(textwrap.dedent(f'''
+                [config]
+                json_dir = {tmpdir}/json
+
+                [scm]
+                repo_dir = {tmpdir}/cpython
+
+                [compile]
+                bench_dir = {tmpdir}/bench
+
+                [run_benchmark]
+                upload = False
+
+                [compile_all]
+                pipeline = True
+
+                [compile_all_revisions]
+                rev1 =
+                rev2 =
+                rev3 =
+                ''').replace('[compile]\n', '[compile]\n' + ''.join(
+                    option + '\n' for option in compile_options)))
+
+    def test_build_cache_is_opt_in(self):
+        conf = _compile.parse_config(self.config, 'compile')
+        self.assertTrue(conf.build_cache)
+
+        self.write_config(os.path.dirname(self.config))
+        conf = _compile.parse_config(self.config, 'compile')
+        self.assertFalse(conf.build_cache)
+
+    def test_pipeline_requires_two_cached_builds(self):
+        tmpdir = os.path.dirname(self.config)
+        self.write_config(tmpdir, 'build_cache = True', 'build_cache_size = 1')
+        with self.assertRaises(SystemExit):
+            _compile.parse_config(self.config, 'compile_all')
+
+        self.write_config(tmpdir, 'build_cache = True', 'build_cache_size = 2')
+        conf = _compile.parse_config(self.config, 'compile_all')
+        self.assertEqual(conf.build_cache_size, 2)
+
+    def test_build_next_during_benchmark(self):
+        logger = logging.getLogger()
+        handlers = list(logger.handlers)
+        bench = _compile.BenchmarkAll(self.config, None)
+        for handler in set(logger.handlers) - set(handlers):
+            self.addCleanup(logger.removeHandler, handler)
+            self.addCleanup(handler.close)
+        events = []
+        lock = threading.Lock()
+        bench_started = threading.Event()
+
+        def run_compile(revision, branch, phase='all'):
+            with lock:
+                events.append((phase, revision))
+            if phase == 'build':
+                if revision == 'rev2':
+                    # rev1 is benchmarked while rev2 is being built.
+                    self.assertTrue(bench_started.wait(5))
+                if revision == 'rev3':
+                    return _compile.EXIT_COMPILE_ERROR, 1.0, {'build': 1.0}
+                return 0, 10.0, {'build': 10.0}
+            bench_started.set()
+            return 0, 5.0, {'build': 0.1, 'venv': 1.0, 'benchmark': 4.0}
+
+        with mock.patch.object(bench, 'run_compile', run_compile):
+            with self.assertRaises(SystemExit):
+                bench.main()
+
+        self.assertEqual(events[0], ('build', 'rev1'))
+        self.assertLess(events.index(('build', 'rev1')), events.index(('bench', 'rev1')))
+        self.assertLess(events.index(('build', 'rev2')), events.index(('bench', 'rev2')))
+        self.assertNotIn(('bench', 'rev3'), events)
+        self.assertEqual([key for key, _ in bench.outputs], ['rev1', 'rev2'])
+        self.assertEqual(bench.failed, ['rev3'])
+        self.assertEqual(bench.timings, [15.0, 15.0])
+        # The build phase's timings win over the cache lookup of the bench phase.
+        self.assertEqual(bench.phase_timings[0],
+                         {'build': 10.0, 'venv': 1.0, 'benchmark': 4.0})
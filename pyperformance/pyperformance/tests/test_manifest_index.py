@@ -0,0 +1,114 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pyperformance import _benchmark_metadata, _manifest, _manifest_index
+
+
+MANIFEST = """\
+[benchmarks]
+
+name\tmetafile
+spam\t<local>
+eggs\t<local>
+
+[group fast]
+spam
+"""
+
+PYPROJECT = """\
+[project]
+name = "pyperformance_bm_{name}"
+requires-python = ">=3.8"
+dependencies = ["pyperf"]
+version = "1.0"
+
+[tool.pyperformance]
+name = "{name}"
+tags = "{tags}"
+"""
+
+
+class ManifestIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        patcher = mock.patch.object(_manifest_index, 'INDEX_DIR',
+                                    os.path.join(self.tmpdir, 'index'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.filename = os.path.join(self.tmpdir, 'MANIFEST')
+        with open(self.filename, 'w') as outfile:
+            outfile.write(MANIFEST)
+        for name, tags in [('spam', 'apps'), ('eggs', 'math')]:
+            self._write_bench(name, tags)
+
+    def _write_bench(self, name, tags):
+        rootdir = os.path.join(self.tmpdir, f'bm_{name}')
+        os.makedirs(rootdir, exist_ok=True)
+        with open(os.path.join(rootdir, 'pyproject.toml'), 'w') as outfile:
+            outfile.write(PYPROJECT.format(name=name, tags=tags))
+        with open(os.path.join(rootdir, 'run_benchmark.py'), 'w') as outfile:
+            outfile.write('')
+
+    def _summary(self, manifest):
+        return {
+            'benchmarks': sorted(b.name for b in manifest.benchmarks),
+            'fast': sorted(b.name for b in manifest.resolve_group('fast')),
+            'tags': {t: sorted(b.name for b in manifest.resolve_group(t))
+                     for t in manifest.tags},
+            'runscripts': sorted(os.path.basename(b.runscript)
+                                 for b in manifest.benchmarks),
+        }
+
+    def _load_without_parsing(self):
+        def fail(*args, **kwargs):
+            raise AssertionError('metadata should come from the index')
+        with mock.patch.object(_benchmark_metadata, 'load_metadata', fail), \
+             mock.patch.object(_manifest, '_parse_manifest_file', fail):
+            return _manifest.load_manifest(self.filename)
+
+    def test_matches_uncached(self):
+        expected = self._summary(_manifest.load_manifest(self.filename, index=False))
+
+        first = _manifest.load_manifest(self.filename)
+        second = self._load_without_parsing()
+
+        self.assertTrue(os.path.exists(
+            _manifest_index.get_index_filename(self.filename)))
+        self.assertEqual(self._summary(first), expected)
+        self.assertEqual(self._summary(second), expected)
+
+    def test_touched_but_unchanged(self):
+        _manifest.load_manifest(self.filename)
+        metafile = os.path.join(self.tmpdir, 'bm_spam', 'pyproject.toml')
+        st = os.stat(metafile)
+        os.utime(metafile, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        manifest = self._load_without_parsing()
+
+        self.assertEqual(self._summary(manifest)['tags'],
+                         {'apps': ['spam'], 'math': ['eggs']})
+
+    def test_metadata_changed(self):
+        _manifest.load_manifest(self.filename)
+        self._write_bench('spam', 'apps,serialize')
+
+        manifest = _manifest.load_manifest(self.filename)
+
+        self.assertEqual(self._summary(manifest)['tags'],
+                         {'apps': ['spam'], 'math': ['eggs'], 'serialize': ['spam']})
+
+    def test_runscript_removed(self):
+        _manifest.load_manifest(self.filename)
+        os.unlink(os.path.join(self.tmpdir, 'bm_eggs', 'run_benchmark.py'))
+
+        manifest = _manifest.load_manifest(self.filename)
+
+        eggs, = [b for b in manifest.benchmarks if b.name == 'eggs']
+        self.assertIsNone(eggs.runscript)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pyperformance import _pip
+
+
+class InstallRequirementsTests(unittest.TestCase):
+
+    def _run(self, results, **kwargs):
+        calls = []
+
+        def run_pip(cmd, *args, **kw):
+            calls.append((cmd, args))
+            if cmd == 'wheel':
+                wheeldir = args[args.index('--wheel-dir') + 1]
+                open(os.path.join(wheeldir, 'spam-1.0-py3-none-any.whl'), 'w').close()
+            return results.pop(0)
+
+        with mock.patch.object(_pip, 'run_pip', run_pip):
+            res = _pip.install_requirements('spam==1.0', upgrade=False, **kwargs)
+        return res, calls
+
+    def test_no_wheelhouse(self):
+        res, calls = self._run([(0, None, None)])
+
+        self.assertEqual(res[0], 0)
+        self.assertEqual(calls, [('install', ('spam==1.0',))])
+
+    def test_offline_hit(self):
+        with tempfile.TemporaryDirectory() as wheelhouse:
+            res, calls = self._run([(0, None, None)], wheelhouse=wheelhouse)
+
+        self.assertEqual(res[0], 0)
+        self.assertEqual(calls, [
+            ('install', ('--no-index', '--find-links', wheelhouse, 'spam==1.0')),
+        ])
+
+    def test_offline_miss_fills_wheelhouse(self):
+        with tempfile.TemporaryDirectory() as wheelhouse:
+            res, calls = self._run(
+                [(1, None, None), (0, None, None), (0, None, None)],
+                wheelhouse=wheelhouse,
+            )
+            wheels = os.listdir(wheelhouse)
+
+        self.assertEqual(res[0], 0)
+        self.assertEqual([cmd for cmd, _ in calls], ['install', 'wheel', 'install'])
+        self.assertIn('--no-index', calls[2][1])
+        # only the finished wheel is left behind, not the build directory
+        self.assertEqual(wheels, ['spam-1.0-py3-none-any.whl'])
+
+    def test_fallback_to_index(self):
+        with tempfile.TemporaryDirectory() as wheelhouse:
+            res, calls = self._run(
+                [(1, None, None), (1, None, None), (0, None, None)],
+                wheelhouse=wheelhouse,
+            )
+
+        self.assertEqual(res[0], 0)
+        self.assertEqual(calls[-1], ('install', ('spam==1.0',)))
@@ -1,8 +1,13 @@
 import importlib.util
+import json
 import os
+import shutil
+import subprocess
 import sys
 import sysconfig
+import tempfile
 import unittest
+from unittest import mock
 
 from pyperformance import tests, _pythoninfo
 
@@ -85,3 +90,56 @@ class GetInfoTests(tests.Functional, unittest.TestCase):
             expected.base_executable = None
             expected.sys._base_executable = info.sys._base_executable
         self.assertEqual(vars(info), vars(expected))
+
+
+class InfoCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        # get_info() only introspects (and caches) other executables.
+        self.python = os.path.join(tmpdir, 'python')
+        os.symlink(sys.executable, self.python)
+        cache_file = os.path.join(tmpdir, 'cache', 'pythoninfo.json')
+        patcher = mock.patch.object(_pythoninfo, 'CACHE_FILE', cache_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache_file = cache_file
+        self._reset()
+        self.addCleanup(self._reset)
+
+    def _reset(self):
+        # Forget the in-memory copy, as a new process would.
+        _pythoninfo._cache = None
+
+    def _get_info(self):
+        with mock.patch('subprocess.check_output',
+                        wraps=subprocess.check_output) as check_output:
+            info = _pythoninfo.get_info(self.python)
+        return info, check_output.call_count
+
+    def test_reused(self):
+        first, spawned1 = self._get_info()
+        second, spawned2 = self._get_info()
+        self._reset()
+        third, spawned3 = self._get_info()
+
+        self.assertEqual((spawned1, spawned2, spawned3), (1, 0, 0))
+        self.assertEqual(vars(second), vars(first))
+        self.assertEqual(vars(third), vars(first))
+        self.assertEqual(first.sys.executable, self.python)
+
+    def test_stale(self):
+        self._get_info()
+        with open(self.cache_file, encoding='utf-8') as infile:
+            data = json.load(infile)
+        # Pretend the interpreter was rebuilt since.
+        for entry in data['pythons'].values():
+            entry['stamp'][3] -= 1
+        with open(self.cache_file, 'w', encoding='utf-8') as outfile:
+            json.dump(data, outfile)
+        self._reset()
+
+        _, spawned = self._get_info()
+
+        self.assertEqual(spawned, 1)
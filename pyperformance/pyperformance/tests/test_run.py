@@ -0,0 +1,80 @@
+import collections
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from pyperformance import run
+
+
+Bench = collections.namedtuple('Bench', 'name requirements_lockfile')
+
+
+class FakeVenv:
+
+    def __init__(self, root):
+        self.root = root
+        self.installed = []
+
+    def ensure_reqs(self, bench):
+        self.installed.append(bench.name)
+
+
+class EnsureVenvsTests(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.venvs = {}
+
+        def ensure(root, *args, **kwargs):
+            return self.venvs.setdefault(root, FakeVenv(root))
+
+        for patcher in (
+            mock.patch.object(run.VenvForBenchmarks, 'ensure', ensure),
+            mock.patch.object(run._venv, 'get_venv_root',
+                              lambda name, python=None: name),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def bench(self, name, reqs):
+        lockfile = os.path.join(self.tmpdir, f'{name}-requirements.txt')
+        with open(lockfile, 'w') as f:
+            f.write(reqs)
+        return Bench(name, lockfile)
+
+    def ensure_venvs(self, benchmarks, **options):
+        options = types.SimpleNamespace(inherit_environ=None, **options)
+        runid = run.RunID('cpython3.11-abc', '123', None, None)
+        return run.ensure_venvs(benchmarks, runid, None, options)
+
+    def test_identical_requirements_share_common_venv(self):
+        benchmarks = [self.bench('spam', 'numpy==2.0\n'),
+                      self.bench('ham', 'numpy==2.0\n'),
+                      self.bench('eggs', 'pyaes==1.6.1\n')]
+
+        result = self.ensure_venvs(benchmarks)
+
+        common, = self.venvs.values()
+        self.assertEqual({venv for venv, _ in result.values()}, {common})
+        # one install per distinct requirement set
+        self.assertEqual(common.installed, ['spam', 'eggs'])
+
+    def test_identical_requirements_share_unique_venv(self):
+        benchmarks = [self.bench('spam', 'numpy==2.0\n'),
+                      self.bench('ham', 'numpy==2.0\n'),
+                      self.bench('eggs', 'pyaes==1.6.1\n')]
+
+        result = self.ensure_venvs(benchmarks, unique_venvs=True, venv_jobs=2)
+
+        self.assertEqual(len(self.venvs), 2)
+        spam, ham, eggs = (result[b][0] for b in benchmarks)
+        self.assertIs(spam, ham)
+        self.assertIsNot(spam, eggs)
+        self.assertEqual(spam.installed, ['spam'])
+        self.assertIn('-reqs-', spam.root)
+        # a benchmark with its own requirement set keeps its per-benchmark venv
+        self.assertEqual(eggs.root, 'cpython3.11-abc-compat-123-bm-eggs')
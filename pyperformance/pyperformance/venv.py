@@ -155,10 +155,12 @@ class VenvForBenchmarks(_venv.VirtualEnvironment):
     def create(cls, root=None, python=None, *,
                inherit_environ=None,
                upgrade=False,
+               wheelhouse=None,
                ):
         env = _get_envvars(inherit_environ)
         self = super().create(root, python, env=env, withpip=False)
         self.inherit_environ = inherit_environ
+        self.wheelhouse = wheelhouse
 
         try:
             self.ensure_pip(upgrade=upgrade)
@@ -175,6 +177,7 @@ class VenvForBenchmarks(_venv.VirtualEnvironment):
     def ensure(cls, root, python=None, *,
                inherit_environ=None,
                upgrade=False,
+               wheelhouse=None,
                **kwargs
                ):
         exists = _venv.venv_exists(root)
@@ -188,6 +191,7 @@ class VenvForBenchmarks(_venv.VirtualEnvironment):
         if exists:
             self = super().ensure(root)
             self.inherit_environ = inherit_environ
+            self.wheelhouse = wheelhouse
             if upgrade:
                 self.upgrade_pip()
             else:
@@ -199,6 +203,7 @@ class VenvForBenchmarks(_venv.VirtualEnvironment):
                 python,
                 inherit_environ=inherit_environ,
                 upgrade=upgrade,
+                wheelhouse=wheelhouse,
                 **kwargs
             )
 
@@ -3,6 +3,9 @@ set -euo pipefail
 
 VENV_DIR=".venv_dbg"
 PYDBG="/usr/bin/python3-dbg"
+# Extra interpreters for a variant x interpreter matrix (space-separated NAME=PATH), e.g.
+# EXTRA_PYTHONS="release=/opt/py312/bin/python3 ft=/opt/py313t/bin/python3" ./script_crypto_pyaes.sh
+EXTRA_PYTHONS="${EXTRA_PYTHONS:-}"
 
 # Check and create debug venv if not exists
 if [ ! -d "$VENV_DIR" ]; then
@@ -26,6 +29,11 @@ pip install -U pip
 pip install numba numpy plotly pyinstrument pyperf pyperformance py-spy pyaes pandas openpyxl
 
 # Run benchmarks
+PYTHON_ARGS=(--python "$VENV_DIR/bin/python3")
+for spec in $EXTRA_PYTHONS; do
+    PYTHON_ARGS+=(--python "$spec")
+done
+
 LOG_DIR="results/aes"
 LOG_FILE="$LOG_DIR/python_script_log.log"
 echo "[INFO] Logging run_benchmarks.py output to $LOG_FILE"
@@ -33,7 +41,7 @@ echo "[INFO] Running AES benchmarks..."
 "$VENV_DIR/bin/python3" -u scripts/run_benchmarks.py \
   --perf-runs 5 \
   --flush-bytes 1GiB \
-  --python "$VENV_DIR/bin/python3" \
+  "${PYTHON_ARGS[@]}" \
   --pyspy "$VENV_DIR/bin/py-spy" \
   --variant pyaes_clean:pyperformance/pyperformance/data-files/benchmarks/bm_crypto_pyaes/no_pyperf_versions/pyaes_clean.py:pyperformance/pyperformance/data-files/benchmarks/bm_crypto_pyaes/run_benchmark.py \
   --variant pyaes_opt:pyperformance/pyperformance/data-files/benchmarks/bm_crypto_pyaes/no_pyperf_versions/pyaes_opt.py:pyperformance/pyperformance/data-files/benchmarks/bm_crypto_pyaes/run_benchmark_optimized.py \
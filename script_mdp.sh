@@ -3,6 +3,9 @@ set -euo pipefail
 
 VENV_DIR=".venv_dbg"
 PYDBG="/usr/bin/python3-dbg"
+# Extra interpreters for a variant x interpreter matrix (space-separated NAME=PATH), e.g.
+# EXTRA_PYTHONS="release=/opt/py312/bin/python3 ft=/opt/py313t/bin/python3" ./script_mdp.sh
+EXTRA_PYTHONS="${EXTRA_PYTHONS:-}"
 
 # Check and create debug venv if not exists
 if [ ! -d "$VENV_DIR" ]; then
@@ -27,6 +30,11 @@ pip install -U pip
 pip install numba numpy plotly pyinstrument pyperf pyperformance py-spy pyaes pandas openpyxl
 
 # Run benchmarks
+PYTHON_ARGS=(--python "$VENV_DIR/bin/python3")
+for spec in $EXTRA_PYTHONS; do
+    PYTHON_ARGS+=(--python "$spec")
+done
+
 LOG_DIR="results/mdp"
 LOG_FILE="$LOG_DIR/python_script_log.log"
 echo "[INFO] Logging run_benchmarks.py output to $LOG_FILE"
@@ -34,7 +42,9 @@ echo "[INFO] Running MDP benchmarks..."
 "$VENV_DIR/bin/python3" -u scripts/run_benchmarks.py \
   --perf-runs 5 \
   --flush-bytes 1GiB \
-  --python "$VENV_DIR/bin/python3" \
+  --memory \
+  --memory-phases build_graph,evaluate \
+  "${PYTHON_ARGS[@]}" \
   --pyspy "$VENV_DIR/bin/py-spy" \
   --variant mdp_opt3:pyperformance/pyperformance/data-files/benchmarks/bm_mdp/no_pyperf_versions/mdp_opt3.py:pyperformance/pyperformance/data-files/benchmarks/bm_mdp/run_benchmark3.py \
   --variant mdp_opt4:pyperformance/pyperformance/data-files/benchmarks/bm_mdp/no_pyperf_versions/mdp_opt4.py:pyperformance/pyperformance/data-files/benchmarks/bm_mdp/run_benchmark4.py \
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Compare pyperformance CLI startup time with and without the manifest index.
+
+Each command is launched --runs times per mode, alternating between the two
+modes so that drift (thermal, page cache) hits both equally. One warm-up
+launch per command builds the index before timing starts.
+
+Example:
+  python scripts/bench_cli_startup.py --python .venvs/dev/bin/python --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Time pyperformance CLI startup with and without the manifest index."
+    )
+    p.add_argument(
+        "--python",
+        default=os.environ.get("VENV_PYTHON", sys.executable),
+        help="Python with pyperformance installed (default: env VENV_PYTHON or current interpreter)",
+    )
+    p.add_argument(
+        "--command",
+        action="append",
+        default=None,
+        metavar="'CMD ARGS'",
+        help="pyperformance command line to time (repeatable; default: 'list' and 'list_groups')",
+    )
+    p.add_argument(
+        "--manifest",
+        default=None,
+        help="Manifest passed to every command (default: pyperformance's own)",
+    )
+    p.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Timed launches per command and mode (default: 10)",
+    )
+    return p.parse_args()
+
+
+def time_launch(argv: List[str]) -> float:
+    start = time.perf_counter()
+    res = subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    dur = time.perf_counter() - start
+    if res.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed (exit={res.returncode}):\n{res.stderr}")
+    return dur
+
+
+def main():
+    args = parse_args()
+    commands = args.command or ["list", "list_groups"]
+
+    print(f"Using python: {args.python}")
+    print(f"Runs:         {args.runs} per command and mode")
+    print(f"{'command':<24} {'index (ms)':>12} {'no index (ms)':>14} {'saved':>8}")
+    for command in commands:
+        base = [args.python, "-m", "pyperformance"] + shlex.split(command)
+        if args.manifest:
+            base += ["--manifest", args.manifest]
+        modes = {
+            "index": base,
+            "no index": base + ["--no-manifest-index"],
+        }
+        time_launch(modes["index"])  # build / refresh the index
+        samples: Dict[str, List[float]] = {m: [] for m in modes}
+        for _ in range(args.runs):
+            for mode, argv in modes.items():
+                samples[mode].append(time_launch(argv))
+
+        with_index = statistics.median(samples["index"]) * 1e3
+        without = statistics.median(samples["no index"]) * 1e3
+        saved = 1 - with_index / without if without else float("nan")
+        print(f"{command:<24} {with_index:>12.1f} {without:>14.1f} {saved:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Local benchmark history store (SQLite) with regression detection.
+
+One row per (benchmark, variant, interpreter, commit, stamp, metric), holding
+the per-run samples and their summary statistics. Two sources can be ingested:
+- 'pyperformance run' / pyperf JSON output (.json or .json.gz), metric "time"
+  (or the benchmark's unit, e.g. "byte" for memory benchmarks);
+- run_benchmarks.py output trees (<results>/<variant>/<stamp>/perf/perf_run_*.txt),
+  one metric per perf stat counter. run_benchmarks.py --history DB does this
+  automatically after each variant.
+
+Change-point detection: every series (benchmark, variant, interpreter, metric)
+is walked in time order. Each run is compared against the runs since the last
+change point (at most --window of them) with Welch's t-test; a run that is
+significantly (p < --alpha) and materially (> --threshold) worse is a
+regression, a significantly better one an improvement. Metrics recorded once
+per run (max_rss, traced_peak) are tested against the spread of the previous
+runs' values instead. Either starts a new
+segment, so a slowdown is reported once, on the run that introduced it.
+
+Examples:
+  python scripts/bench_history.py --db history.sqlite ingest-pyperf nightly.json.gz --commit $(git rev-parse HEAD)
+  python scripts/bench_history.py --db history.sqlite ingest-results results/mdp
+  python scripts/bench_history.py --db history.sqlite query --benchmark mdp --since 2025-10-01
+  python scripts/bench_history.py --db history.sqlite regressions --since 2025-10-20 --metric time
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from perf_stat import parse_perf_file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    id          INTEGER PRIMARY KEY,
+    benchmark   TEXT NOT NULL,
+    variant     TEXT NOT NULL,
+    interpreter TEXT NOT NULL,
+    commit_id   TEXT NOT NULL DEFAULT '',
+    stamp       TEXT NOT NULL,          -- ISO 8601, sortable
+    metric      TEXT NOT NULL,
+    unit        TEXT NOT NULL DEFAULT '',
+    n           INTEGER NOT NULL,
+    mean        REAL NOT NULL,
+    stdev       REAL,
+    min         REAL NOT NULL,
+    max         REAL NOT NULL,
+    samples     TEXT NOT NULL,          -- JSON list
+    source      TEXT NOT NULL,
+    UNIQUE (benchmark, variant, interpreter, commit_id, stamp, metric)
+);
+CREATE INDEX IF NOT EXISTS measurements_series
+    ON measurements (benchmark, variant, interpreter, metric, stamp);
+CREATE INDEX IF NOT EXISTS measurements_stamp
+    ON measurements (stamp);
+"""
+
+# Every other metric (time, counters, misses, bytes) is better when lower.
+HIGHER_IS_BETTER = {"IPC"}
+
+
+@dataclass
+class Measurement:
+    benchmark: str
+    variant: str
+    interpreter: str
+    commit_id: str
+    stamp: str
+    metric: str
+    unit: str
+    samples: List[float]
+    source: str
+
+
+def connect(db: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def store(conn: sqlite3.Connection, measurements: Iterable[Measurement]) -> int:
+    """Insert (or replace, when re-ingested) measurements; returns the row count."""
+    rows = []
+    for m in measurements:
+        if not m.samples:
+            continue
+        rows.append((
+            m.benchmark, m.variant, m.interpreter, m.commit_id, m.stamp, m.metric, m.unit,
+            len(m.samples), statistics.fmean(m.samples),
+            statistics.stdev(m.samples) if len(m.samples) >= 2 else None,
+            min(m.samples), max(m.samples), json.dumps(m.samples), m.source,
+        ))
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO measurements (benchmark, variant, interpreter, commit_id, "
+            "stamp, metric, unit, n, mean, stdev, min, max, samples, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+# ---------------------- sources ----------------------
+
+def normalize_stamp(text: str) -> str:
+    """'20251025_220832' or any ISO 8601 date -> '2025-10-25T22:08:32' (seconds precision)."""
+    text = text.strip()
+    try:
+        dt = datetime.strptime(text, "%Y%m%d_%H%M%S")
+    except ValueError:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        # run_benchmarks.py stamps are local time
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt.replace(microsecond=0).isoformat()
+
+
+def interpreter_from_build_info(python_info: str) -> str:
+    """First line of sys.version, as recorded by run_benchmarks.py. Only a fallback
+    key for runs recorded without an interpreter name: debug and release builds
+    of one CPython print the same line."""
+    lines = python_info.strip().splitlines()
+    return lines[0].strip() if lines else "unknown"
+
+
+def git_head(path: Path) -> str:
+    try:
+        res = subprocess.run(["git", "-C", str(path), "rev-parse", "HEAD"],
+                             capture_output=True, text=True)
+    except OSError:
+        return ""
+    return res.stdout.strip() if res.returncode == 0 else ""
+
+
+def load_pyperf_json(path: Path) -> dict:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def measurements_from_pyperf(path: Path, variant: str, interpreter: Optional[str] = None,
+                             commit_id: Optional[str] = None) -> List[Measurement]:
+    """One 'time' (or unit-named) measurement per benchmark of a pyperf JSON suite."""
+    data = load_pyperf_json(path)
+    common = data.get("metadata", {})
+    benchmarks = data["benchmarks"] if "benchmarks" in data else [data["benchmark"]]
+    out = []
+    for bench in benchmarks:
+        meta = {**common, **bench.get("metadata", {})}
+        samples: List[float] = []
+        dates = []
+        for run in bench.get("runs", []):
+            samples.extend(run.get("values", []))
+            date = run.get("metadata", {}).get("date")
+            if date:
+                dates.append(date)
+        if not samples:
+            continue
+        stamp = meta.get("date") or (min(dates) if dates else None)
+        if stamp is None:
+            stamp = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+        interp = interpreter or " ".join(
+            str(meta[k]) for k in ("python_implementation", "python_version") if k in meta
+        ) or "unknown"
+        unit = meta.get("unit", "second")
+        out.append(Measurement(
+            benchmark=meta.get("name", path.stem),
+            variant=variant,
+            interpreter=interp,
+            commit_id=commit_id if commit_id is not None else meta.get("commit_id", ""),
+            stamp=normalize_stamp(stamp),
+            metric="time" if unit == "second" else unit,
+            unit=unit,
+            samples=samples,
+            source=str(path),
+        ))
+    return out
+
+
+def measurements_from_stamp_dir(stamp_dir: Path, benchmark: str, variant: str,
+                                interpreter: Optional[str] = None,
+                                commit_id: str = "") -> List[Measurement]:
+    """One measurement per perf stat counter of <variant>/<stamp>/perf/perf_run_*.txt,
+    plus max_rss / traced_peak from memory/ when the memory stage ran.
+
+    The interpreter key defaults to the interpreter name run_benchmarks.py recorded
+    in fingerprint.json; sys.version is kept there as metadata only."""
+    if interpreter is None:
+        interpreter = "unknown"
+        fingerprint = stamp_dir / "fingerprint.json"
+        if fingerprint.is_file():
+            try:
+                info = json.loads(fingerprint.read_text())
+                interpreter = (info.get("interpreter")
+                               or interpreter_from_build_info(info.get("python", "")))
+            except (OSError, ValueError):
+                pass
+    samples: Dict[str, List[float]] = {}
+    for f in sorted((stamp_dir / "perf").glob("perf_run_*.txt")):
+        vals = parse_perf_file(f)
+        if vals.get("cycles") and "instructions" in vals:
+            vals["IPC"] = vals["instructions"] / vals["cycles"]
+        for metric, val in vals.items():
+            if val is not None and math.isfinite(val):
+                samples.setdefault(metric, []).append(val)
+    units = {"time": "second"}
+    # the --memory stage: one peak RSS and one traced peak per run
+    for name, key, metric in (("rusage.json", "max_rss_kib", "max_rss"),
+                              ("tracemalloc.json", "peak_kib", "traced_peak")):
+        path = stamp_dir / "memory" / name
+        try:
+            val = json.loads(path.read_text()).get(key) if path.is_file() else None
+        except (OSError, ValueError):
+            val = None
+        if val is not None:
+            samples[metric] = [float(val)]
+            units[metric] = "KiB"
+    stamp = normalize_stamp(stamp_dir.name)
+    return [
+        Measurement(benchmark, variant, interpreter, commit_id, stamp, metric,
+                    units.get(metric, ""), vals, str(stamp_dir))
+        for metric, vals in sorted(samples.items())
+    ]
+
+
+def measurements_from_results(root: Path, benchmark: Optional[str] = None,
+                              interpreter: Optional[str] = None,
+                              commit_id: str = "") -> List[Measurement]:
+    """Every <root>/<variant>/<stamp>/ run; cache hits (symlinked stamps) are skipped.
+    A multi-interpreter run (<root>/interpreters.json) is walked per
+    <root>/<interpreter>/, keyed by that subdirectory's name."""
+    benchmark = benchmark or root.resolve().name
+    out = []
+    if (root / "interpreters.json").is_file():
+        for interp_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+            out += measurements_from_results(interp_dir, benchmark,
+                                             interpreter or interp_dir.name, commit_id)
+        return out
+    for variant_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        for stamp_dir in sorted(p for p in variant_dir.iterdir() if p.is_dir()):
+            # a reused run is the same measurement again, not a new sample
+            if stamp_dir.is_symlink():
+                continue
+            try:
+                normalize_stamp(stamp_dir.name)
+            except ValueError:
+                continue
+            out += measurements_from_stamp_dir(stamp_dir, benchmark, variant_dir.name,
+                                               interpreter, commit_id)
+    return out
+
+
+# ---------------------- statistics ----------------------
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the regularized incomplete beta function (Lentz)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    lbeta = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+    front = math.exp(lbeta + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def welch_t_test(a: List[float], b: List[float]) -> Optional[float]:
+    """Two-sided p-value for 'mean(a) == mean(b)'; None when either side has < 2 samples."""
+    if len(a) < 2 or len(b) < 2:
+        return None
+    va, vb = statistics.variance(a) / len(a), statistics.variance(b) / len(b)
+    diff = statistics.fmean(b) - statistics.fmean(a)
+    if va + vb == 0.0:
+        return 1.0 if diff == 0.0 else 0.0
+    t = diff / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+    return _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def prediction_test(history: List[float], value: float) -> Optional[float]:
+    """Two-sided p-value of a single new value against earlier single values
+    (Student's t prediction interval); None when history has < 2 values."""
+    n = len(history)
+    if n < 2:
+        return None
+    s = statistics.stdev(history)
+    diff = value - statistics.fmean(history)
+    if s == 0.0:
+        return 1.0 if diff == 0.0 else 0.0
+    t = diff / (s * math.sqrt(1.0 + 1.0 / n))
+    df = n - 1
+    return _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+@dataclass
+class Change:
+    benchmark: str
+    variant: str
+    interpreter: str
+    metric: str
+    stamp: str
+    commit_id: str
+    baseline_stamp: str
+    baseline_mean: float
+    mean: float
+    rel_change: float      # signed, relative to the baseline mean
+    p_value: float
+    regression: bool
+
+
+def detect_changes(conn: sqlite3.Connection, since: Optional[str] = None,
+                   until: Optional[str] = None, benchmark: Optional[str] = None,
+                   metric: Optional[str] = None, alpha: float = 0.01,
+                   threshold: float = 0.02, window: int = 5) -> List[Change]:
+    """Change points reported in [since, until]; earlier history only serves as baseline."""
+    query = "SELECT * FROM measurements WHERE 1=1"
+    params: List[str] = []
+    if until:
+        query += " AND stamp <= ?"
+        params.append(normalize_stamp(until))
+    if benchmark:
+        query += " AND benchmark = ?"
+        params.append(benchmark)
+    if metric:
+        query += " AND metric = ?"
+        params.append(metric)
+    query += " ORDER BY benchmark, variant, interpreter, metric, stamp"
+    since = normalize_stamp(since) if since else None
+
+    series: Dict[Tuple[str, str, str, str], List[sqlite3.Row]] = {}
+    for row in conn.execute(query, params):
+        key = (row["benchmark"], row["variant"], row["interpreter"], row["metric"])
+        series.setdefault(key, []).append(row)
+
+    changes = []
+    for (bench, variant, interp, name), rows in series.items():
+        segment: List[sqlite3.Row] = rows[:1]
+        for row in rows[1:]:
+            baseline = segment[-window:]
+            base_samples = [v for r in baseline for v in json.loads(r["samples"])]
+            samples = json.loads(row["samples"])
+            if len(samples) < 2:
+                # one value per stamp (max_rss, traced_peak): against the earlier stamps
+                p = prediction_test([r["mean"] for r in baseline], row["mean"])
+            else:
+                p = welch_t_test(base_samples, samples)
+            base_mean = statistics.fmean(base_samples)
+            rel = (row["mean"] - base_mean) / base_mean if base_mean else 0.0
+            worse = rel < 0 if name in HIGHER_IS_BETTER else rel > 0
+            if p is not None and p < alpha and abs(rel) > threshold:
+                if since is None or row["stamp"] >= since:
+                    changes.append(Change(bench, variant, interp, name, row["stamp"],
+                                          row["commit_id"], baseline[-1]["stamp"], base_mean,
+                                          row["mean"], rel, p, worse))
+                segment = [row]
+            else:
+                segment.append(row)
+    return changes
+
+
+# ---------------------- CLI ----------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Store benchmark results in a local SQLite history and flag regressions."
+    )
+    p.add_argument(
+        "--db",
+        default=os.environ.get("BENCH_HISTORY", "bench_history.sqlite"),
+        help="SQLite database (default: env BENCH_HISTORY or bench_history.sqlite)",
+    )
+    sub = p.add_subparsers(dest="command", required=True)
+
+    c = sub.add_parser("ingest-pyperf", help="Ingest pyperformance/pyperf JSON result files.")
+    c.add_argument("files", nargs="+", type=Path)
+    c.add_argument("--variant", default="pyperformance",
+                   help="Variant name for these results (default: pyperformance)")
+    c.add_argument("--interpreter", default=None,
+                   help="Interpreter name (default: python_implementation + python_version metadata)")
+    c.add_argument("--commit", default=None,
+                   help="Commit id (default: the commit_id metadata written by 'pyperformance compile')")
+
+    c = sub.add_parser("ingest-results", help="Ingest run_benchmarks.py output trees.")
+    c.add_argument("roots", nargs="+", type=Path, metavar="RESULTS_DIR",
+                   help="Directory passed as run_benchmarks.py --outdir")
+    c.add_argument("--benchmark", default=None,
+                   help="Benchmark name (default: name of RESULTS_DIR, e.g. results/mdp -> mdp)")
+    c.add_argument("--interpreter", default=None,
+                   help="Interpreter name (default: from each run's fingerprint.json)")
+    c.add_argument("--commit", default="", help="Commit id of the benchmarked sources")
+
+    c = sub.add_parser("query", help="List stored measurements in a time range.")
+    c.add_argument("--since", default=None, help="ISO date or YYYYMMDD_HHMMSS")
+    c.add_argument("--until", default=None, help="ISO date or YYYYMMDD_HHMMSS")
+    c.add_argument("--benchmark", default=None)
+    c.add_argument("--variant", default=None)
+    c.add_argument("--metric", default=None)
+
+    c = sub.add_parser("regressions",
+                       help="Flag significant changes across consecutive runs (exit 1 on regression).")
+    c.add_argument("--since", default=None, help="Only report changes from this date on")
+    c.add_argument("--until", default=None)
+    c.add_argument("--benchmark", default=None)
+    c.add_argument("--metric", default=None, help="e.g. time (default: all metrics)")
+    c.add_argument("--alpha", type=float, default=0.01,
+                   help="Significance level of Welch's t-test (default: 0.01)")
+    c.add_argument("--threshold", type=float, default=0.02,
+                   help="Minimum relative change of the mean (default: 0.02 = 2%%)")
+    c.add_argument("--window", type=int, default=5,
+                   help="Baseline: at most this many runs since the last change point (default: 5)")
+    c.add_argument("--improvements", action="store_true",
+                   help="Also list significant improvements")
+    return p.parse_args(argv)
+
+
+def print_changes(changes: List[Change], improvements: bool = False) -> None:
+    shown = [c for c in changes if c.regression or improvements]
+    if not shown:
+        print("No significant regressions.")
+        return
+    print(f"{'':4} {'benchmark':<16} {'variant':<16} {'metric':<22} {'stamp':<19} "
+          f"{'baseline':>12} {'mean':>12} {'change':>8} {'p':>8}")
+    for c in shown:
+        tag = "REG" if c.regression else "imp"
+        print(f"{tag:4} {c.benchmark:<16} {c.variant:<16} {c.metric:<22} {c.stamp:<19} "
+              f"{c.baseline_mean:>12.4g} {c.mean:>12.4g} {c.rel_change:>+8.1%} {c.p_value:>8.1e}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    conn = connect(Path(args.db))
+
+    if args.command == "ingest-pyperf":
+        total = 0
+        for f in args.files:
+            total += store(conn, measurements_from_pyperf(f, args.variant, args.interpreter, args.commit))
+        print(f"Stored {total} measurements from {len(args.files)} file(s) into {args.db}")
+    elif args.command == "ingest-results":
+        total = 0
+        for root in args.roots:
+            total += store(conn, measurements_from_results(root, args.benchmark, args.interpreter,
+                                                          args.commit))
+        print(f"Stored {total} measurements into {args.db}")
+    elif args.command == "query":
+        query = "SELECT * FROM measurements WHERE 1=1"
+        params = []
+        for col, op, val in (("stamp", ">=", args.since), ("stamp", "<=", args.until)):
+            if val:
+                query += f" AND {col} {op} ?"
+                params.append(normalize_stamp(val))
+        for col in ("benchmark", "variant", "metric"):
+            if getattr(args, col):
+                query += f" AND {col} = ?"
+                params.append(getattr(args, col))
+        query += " ORDER BY stamp, benchmark, variant, metric"
+        for row in conn.execute(query, params):
+            stdev = f"{row['stdev']:.4g}" if row["stdev"] is not None else "-"
+            print(f"{row['stamp']}  {row['benchmark']:<16} {row['variant']:<16} {row['metric']:<22} "
+                  f"n={row['n']:<3} mean={row['mean']:.6g} stdev={stdev}  {row['commit_id'][:12]}")
+    elif args.command == "regressions":
+        changes = detect_changes(conn, args.since, args.until, args.benchmark, args.metric,
+                                 args.alpha, args.threshold, args.window)
+        print_changes(changes, args.improvements)
+        if any(c.regression for c in changes):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
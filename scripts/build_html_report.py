@@ -8,10 +8,45 @@ Optionally: pick a SPECIFIC timestamp for all variants with --timestamp YYYYMMDD
 Outputs:
   reports/<run_ts>/perf_report.html
   reports/<run_ts>/perf_report.xlsx
+
+If the results dir holds a multi-interpreter run (run_benchmarks.py with
+several --python, indexed by interpreters.json), every variant is reported per
+interpreter as <variant>@<interpreter>, and a variant x interpreter speedup
+matrix is added. The matrix is against the baseline variant on the baseline
+interpreter (--baseline-interpreter, default: the first one). It is then
+split into the interpreter speedup of each variant and the algorithmic
+speedup on each interpreter.
+
+If a variant was run with --perf-record, its per-Python-function counter
+table (perf_record/function_counters.csv) is shown under its flamegraph link.
+
+If variants were run with --pyspy-raw, their collapsed stacks are normalised by
+sample count and compared against the speedup baseline:
+  reports/<run_ts>/diff_<variant>_vs_<baseline>.folded   (input for flamegraph.pl)
+  reports/<run_ts>/function_deltas_<variant>.csv
+
+If variants were run with --topdown, the retiring / bad speculation / frontend /
+backend shares (and level-2 nodes when available) become extra columns and are
+shown as stacked bars per variant.
+
+If variants were run with --memory, peak RSS, traced peak, memory retained at
+exit and grown blocks become extra columns; a memory section plots peak RSS
+against time, the memory grown per phase, and the top allocation sites.
+
+If variants were run with --sweep, time, instructions and cycles are plotted
+against input size (log-log) with the fitted complexity curves, together with
+time per unit of input, and the fits (class, exponent, crossover) are tabled.
+
+If variants were run by a run_benchmarks.py that wrote system_state.json, a
+"System state" table shows governor, turbo, ASLR, pinning and IRQs per variant,
+with the run-to-run time CV and CPU migrations, and flags noisy runs.
 """
 
 import argparse
+import html
+import json
 import math
+import os
 import re
 from collections import defaultdict, OrderedDict
 from datetime import datetime
@@ -20,8 +55,18 @@ from pathlib import Path
 import pandas as pd
 import plotly.graph_objects as go
 
+from perf_stat import parse_perf_file
+import scaling
+
 ROOT_DEFAULT = Path("results")
 REPORT_ROOT_DEFAULT = Path("reports")
+SYSTEM_STATE_FILE = "system_state.json"
+INTERPRETERS_FILE = "interpreters.json"
+# report key of a variant in a multi-interpreter run: <variant>@<interpreter>
+MATRIX_SEP = "@"
+
+# a run is flagged noisy above this run-to-run time coefficient of variation
+NOISY_CV_PCT = 2.0
 
 COUNTER_KEYS = [
     "time",                 # seconds
@@ -30,6 +75,7 @@ COUNTER_KEYS = [
     "IPC",
 
     "context-switches",
+    "cpu-migrations",
     "page-faults",
 
     "branches",
@@ -51,87 +97,33 @@ COUNTER_KEYS = [
     "Speedup",
 ]
 
-LABEL_NORMALIZE = {
-    "cycles": "cycles",
-    "instructions": "instructions",
-
-    "context-switches": "context-switches",
-    "page-faults": "page-faults",
-
-    "branches": "branches",
-    "branch-misses": "branch-misses",
-
-    "l1-dcache-loads": "L1-dcache-loads",
-    "l1-dcache-load-misses": "L1-dcache-load-misses",
-
-    "llc-loads": "LLC-loads",
-    "llc-load-misses": "LLC-load-misses",
-
-
-    "dtlb-loads": "dTLB-loads",
-    "dtlb-load-misses": "dTLB-load-misses",
-
-    "itlb-loads": "iTLB-loads",
-    "itlb-load-misses": "iTLB-load-misses",
-
-    # time sources
-    "time elapsed": "time",         # seconds time elapsed (if present)
-}
-
-NUM_RE = re.compile(r"""
-    (?P<num>
-        (?:\d{1,3}(?:[,\s]\d{3})+|\d+)
-        (?:\.\d+)? | \d+\.\d+
-    )
-""", re.VERBOSE)
+# topdown/topdown.csv metric -> report column; level 1 first, then level 2
+TOPDOWN_COLUMNS = OrderedDict([
+    ("retiring", "Retiring %"),
+    ("bad_speculation", "Bad Spec %"),
+    ("frontend_bound", "Frontend Bound %"),
+    ("backend_bound", "Backend Bound %"),
+
+    ("light_operations", "Light Ops %"),
+    ("heavy_operations", "Heavy Ops %"),
+    ("branch_mispredicts", "Branch Mispredicts %"),
+    ("machine_clears", "Machine Clears %"),
+    ("fetch_latency", "Fetch Latency %"),
+    ("fetch_bandwidth", "Fetch Bandwidth %"),
+    ("memory_bound", "Memory Bound %"),
+    ("core_bound", "Core Bound %"),
+])
+TOPDOWN_L1_KEYS = list(TOPDOWN_COLUMNS.values())[:4]
+TOPDOWN_L2_KEYS = list(TOPDOWN_COLUMNS.values())[4:]
+
+# memory/ stage outputs -> report column: (file, key, scale)
+MEMORY_COLUMNS = OrderedDict([
+    ("Peak RSS MiB", ("rusage.json", "max_rss_kib", 1 / 1024)),
+    ("Traced peak MiB", ("tracemalloc.json", "peak_kib", 1 / 1024)),
+    ("Retained MiB", ("tracemalloc.json", "final_kib", 1 / 1024)),
+    ("Grown blocks", ("tracemalloc.json", "grown_blocks", 1)),
+])
 
-# ---------------------- parsing helpers ----------------------
-
-def _to_number(tok: str):
-    tok = tok.replace(" ", "").replace(",", "")
-    try:
-        return float(tok)
-    except Exception:
-        return None
-
-def parse_perf_file(path: Path) -> dict:
-    results = {}
-    text = path.read_text(errors="ignore")
-    for line in text.splitlines():
-        s = line.strip()
-        if not s or "<not supported>" in s.lower():
-            continue
-        m = NUM_RE.search(s)
-        if not m:
-            continue
-        val = _to_number(m.group("num"))
-        if val is None:
-            continue
-
-        tail = s[m.end():].strip()
-        tail = tail.split("#", 1)[0].strip()
-        lbl_low = tail.lower()
-
-        norm = None
-        for k, v in LABEL_NORMALIZE.items():
-            if lbl_low.endswith(k):
-                norm = v
-                break
-        if norm is None:
-            parts = tail.split()
-            if parts:
-                norm = LABEL_NORMALIZE.get(parts[-1].lower(), LABEL_NORMALIZE.get(tail.lower()))
-        if not norm:
-            continue
-
-        if norm == "time":
-            if "seconds time elapsed" in lbl_low or "time elapsed" in lbl_low:
-                results["time"] = val
-            else:
-                results.setdefault("time", val)
-        else:
-            results[norm] = val
-    return results
 
 def aggregate_variant(perf_dir: Path, geo_mean: bool) -> dict:
     files = sorted(perf_dir.glob("perf_run_*.txt"))
@@ -233,8 +225,260 @@ def find_variants_perf_dirs(root: Path, forced_timestamp: str | None) -> dict:
 
     return out
 
+def load_function_counters(stamp_dir: Path, top: int) -> pd.DataFrame | None:
+    """Top-N rows of <stamp>/perf_record/function_counters.csv (share columns only)."""
+    csv_path = stamp_dir / "perf_record" / "function_counters.csv"
+    if not csv_path.exists():
+        return None
+    df = pd.read_csv(csv_path)
+    if df.empty:
+        return None
+    pct_cols = [c for c in df.columns if c.endswith("_pct")]
+    df = df.set_index("function")[pct_cols].head(top)
+    df.columns = [c[:-len("_pct")] + " %" for c in pct_cols]
+    return df
+
+def load_topdown(stamp_dir: Path) -> dict:
+    """{report column: percent} from <stamp>/topdown/topdown.csv, empty if absent."""
+    csv_path = stamp_dir / "topdown" / "topdown.csv"
+    if not csv_path.exists():
+        return {}
+    df = pd.read_csv(csv_path)
+    return {TOPDOWN_COLUMNS[m]: float(v) for m, v in zip(df["metric"], df["percent"])
+            if m in TOPDOWN_COLUMNS}
+
+def load_memory(stamp_dir: Path) -> dict:
+    """{report column: value} from <stamp>/memory/, empty if the stage did not run."""
+    out = {}
+    for col, (name, key, scale) in MEMORY_COLUMNS.items():
+        path = stamp_dir / "memory" / name
+        if not path.exists():
+            continue
+        val = json.loads(path.read_text()).get(key)
+        if val is not None:
+            out[col] = float(val) * scale
+    return out
+
+def load_memory_phases(stamp_dir: Path) -> pd.DataFrame | None:
+    csv_path = stamp_dir / "memory" / "phases.csv"
+    return pd.read_csv(csv_path).set_index("phase") if csv_path.exists() else None
+
+def load_memory_sites(stamp_dir: Path, top: int) -> pd.DataFrame | None:
+    """Top-N growing allocation sites per phase, sites shortened to file:line."""
+    csv_path = stamp_dir / "memory" / "sites.csv"
+    if not csv_path.exists():
+        return None
+    df = pd.read_csv(csv_path)
+    if df.empty:
+        return None
+    df["site"] = df["site"].map(lambda x: os.path.basename(x) if not x.startswith("<") else x)
+    df = df.groupby("phase", sort=False).head(top)
+    return df.rename(columns={"size_kib": "grown KiB"}).set_index(["phase", "site"])
+
+def load_system_state(stamp_dir: Path) -> dict | None:
+    """<stamp>/system_state.json as written by run_benchmarks.py, None if absent."""
+    path = stamp_dir / SYSTEM_STATE_FILE
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except ValueError:
+        return None
+
+def run_noise(perf_dir: Path) -> tuple[float | None, float | None]:
+    """(time CV %, mean cpu-migrations) over the per-run perf stat files."""
+    runs = [parse_perf_file(f) for f in sorted(perf_dir.glob("perf_run_*.txt"))]
+    times = [r["time"] for r in runs if r.get("time")]
+    cv = None
+    if len(times) >= 2:
+        mean = sum(times) / len(times)
+        std = math.sqrt(sum((t - mean) ** 2 for t in times) / (len(times) - 1))
+        cv = 100.0 * std / mean
+    migrations = [r["cpu-migrations"] for r in runs if r.get("cpu-migrations") is not None]
+    return cv, (sum(migrations) / len(migrations) if migrations else None)
+
+# ---------------------- collapsed stacks ----------------------
+
+FRAME_RE = re.compile(r"^(?P<func>.*) \((?P<file>[^()]*?)(?::\d+)?\)$")
+
+def _normalize_frame(frame: str, bench_file: str | None) -> str:
+    """'func (file.py:123)' -> 'func (file.py)'; the variant's own script becomes '<bench>'."""
+    m = FRAME_RE.match(frame)
+    if not m:
+        return frame
+    base = os.path.basename(m.group("file"))
+    if base == bench_file:
+        base = "<bench>"
+    return f"{m.group('func')} ({base})"
+
+def load_collapsed_stacks(path: Path) -> tuple[dict, int]:
+    """
+    Stream a py-spy raw (collapsed) file into {normalized stack: samples}.
+    Line numbers are dropped so that stacks from different variants line up.
+    """
+    stacks = defaultdict(int)
+    total = 0
+    with open(path, errors="ignore") as f:
+        for line in f:
+            stack, _, n = line.rstrip("\n").rpartition(" ")
+            if not stack or not n.isdigit():
+                continue
+            frames = stack.split(";")
+            m = FRAME_RE.match(frames[0])
+            bench_file = os.path.basename(m.group("file")) if m else None
+            key = ";".join(_normalize_frame(fr, bench_file) for fr in frames)
+            stacks[key] += int(n)
+            total += int(n)
+    return stacks, total
+
+def stacks_for_variant(perf_dir: Path, variant: str) -> Path | None:
+    p = perf_dir.parent / "flamegraph" / f"stacks_pyspy_{variant_label(variant)}.txt"
+    return p if p.exists() else None
+
+def function_shares(stacks: dict, total: int) -> tuple[dict, dict]:
+    """Inclusive and self sample shares per function."""
+    incl = defaultdict(float)
+    self_ = defaultdict(float)
+    if not total:
+        return incl, self_
+    for stack, n in stacks.items():
+        frames = stack.split(";")
+        for fr in set(frames):
+            incl[fr] += n / total
+        self_[frames[-1]] += n / total
+    return incl, self_
+
+def function_delta_table(base: tuple, var: tuple, base_time: float, var_time: float) -> pd.DataFrame:
+    """Per-function share deltas (percentage points) and estimated seconds moved."""
+    (b_incl, b_self), (v_incl, v_self) = base, var
+    rows = []
+    for fn in set(b_incl) | set(v_incl):
+        row = {
+            "function": fn,
+            "base incl %": 100 * b_incl.get(fn, 0.0),
+            "incl %": 100 * v_incl.get(fn, 0.0),
+            "base self %": 100 * b_self.get(fn, 0.0),
+            "self %": 100 * v_self.get(fn, 0.0),
+        }
+        row["Δ incl pp"] = row["incl %"] - row["base incl %"]
+        row["Δ self pp"] = row["self %"] - row["base self %"]
+        if base_time and var_time and not (math.isnan(base_time) or math.isnan(var_time)):
+            row["Δ incl s"] = v_incl.get(fn, 0.0) * var_time - b_incl.get(fn, 0.0) * base_time
+        rows.append(row)
+    df = pd.DataFrame(rows).set_index("function")
+    return df.reindex(df["Δ incl pp"].abs().sort_values(ascending=False).index)
+
+def write_diff_folded(base: tuple, var: tuple, out_path: Path):
+    """
+    Differential folded stacks ('stack base_count variant_count'), both sides
+    scaled to the baseline sample total like difffolded.pl -n.
+    """
+    (b_stacks, b_total), (v_stacks, v_total) = base, var
+    scale = (b_total / v_total) if v_total else 0.0
+    with open(out_path, "w") as f:
+        for stack in sorted(set(b_stacks) | set(v_stacks)):
+            f.write(f"{stack} {b_stacks.get(stack, 0)} {int(round(v_stacks.get(stack, 0) * scale))}\n")
+
+def diff_icicle(base: tuple, var: tuple, title: str, min_share: float = 0.001) -> go.Figure:
+    """Icicle chart sized by the variant's inclusive share, coloured by the delta vs baseline."""
+    def inclusive(stacks, total):
+        out = defaultdict(float)
+        for stack, n in stacks.items():
+            frames = stack.split(";")
+            for i in range(1, len(frames) + 1):
+                out[";".join(frames[:i])] += n / total if total else 0.0
+        return out
+    b_incl = inclusive(*base)
+    v_incl = inclusive(*var)
+    ids, labels, parents, values, colors = [], [], [], [], []
+    for node in sorted(v_incl):
+        v = v_incl[node]
+        if v < min_share:
+            continue
+        parent, _, label = node.rpartition(";")
+        ids.append(node)
+        labels.append(label)
+        parents.append(parent)
+        values.append(100 * v)
+        colors.append(100 * (v - b_incl.get(node, 0.0)))
+    fig = go.Figure(go.Icicle(
+        ids=ids, labels=labels, parents=parents, values=values, branchvalues="total",
+        marker=dict(colors=colors, colorscale="RdBu_r", cmid=0, colorbar=dict(title="Δ pp")),
+        hovertemplate="%{label}<br>share: %{value:.2f}%<br>Δ vs baseline: %{color:+.2f} pp<extra></extra>",
+        tiling=dict(orientation="v", flip="y"),
+    ))
+    fig.update_layout(title=title, margin=dict(t=40, l=0, r=0, b=0), height=600)
+    return fig
+
+def differential_sections(found: dict, df: pd.DataFrame, baseline: str | None, out_dir: Path, top: int) -> list:
+    """Differential flamegraph + per-function delta table for every variant vs the baseline."""
+    if not baseline or baseline not in found:
+        return []
+    base_path = stacks_for_variant(found[baseline], baseline)
+    if base_path is None:
+        return []
+    base_stacks = load_collapsed_stacks(base_path)
+    base_shares = function_shares(*base_stacks)
+    base_time = df["time"].get(baseline, float("nan")) if "time" in df.columns else float("nan")
+
+    parts = []
+    for variant, perf_dir in sorted(found.items()):
+        if variant == baseline:
+            continue
+        path = stacks_for_variant(perf_dir, variant)
+        if path is None:
+            continue
+        var_stacks = load_collapsed_stacks(path)
+        var_time = df["time"].get(variant, float("nan")) if "time" in df.columns else float("nan")
+        table = function_delta_table(base_shares, function_shares(*var_stacks), base_time, var_time)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        table.to_csv(out_dir / f"function_deltas_{variant}.csv")
+        write_diff_folded(base_stacks, var_stacks, out_dir / f"diff_{variant}_vs_{baseline}.folded")
+
+        parts.append(f"<h3>{variant} vs {baseline}</h3>")
+        fig = diff_icicle(base_stacks, var_stacks, f"{variant}: share of samples, coloured by Δ vs {baseline}")
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        parts.append(table.head(top).to_html(classes='table', justify='center',
+                                             float_format=lambda x: f"{x:.2f}"))
+    if parts:
+        parts.insert(0, f"<hr/><h2>Differential profiles (baseline: {baseline})</h2>")
+    return parts
+
+
+def find_matrix_perf_dirs(root: Path, forced_timestamp: str | None) -> tuple[dict, list]:
+    """
+    Locate perf directories of a multi-interpreter run:
+      <root>/<interpreter>/<variant>/<timestamp>/perf/
+    Returns ({'<variant>@<interpreter>': perf_dir}, interpreters in run order),
+    or ({}, []) if root has no interpreters.json.
+    """
+    try:
+        listed = list(json.loads((root / INTERPRETERS_FILE).read_text()))
+    except (OSError, ValueError):
+        return {}, []
+    out, interpreters = {}, []
+    for interp in listed:
+        found = find_variants_perf_dirs(root / interp, forced_timestamp)
+        if found:
+            interpreters.append(interp)
+        for variant, perf_dir in found.items():
+            out[f"{variant}{MATRIX_SEP}{interp}"] = perf_dir
+    return out, interpreters
+
+def variant_label(key: str) -> str:
+    """Variant label as used in file names, without the interpreter of a matrix key."""
+    return key.split(MATRIX_SEP, 1)[0]
 # ---------------------- reporting ----------------------
 
+def pick_baseline(variants: list, baseline_variant: str | None) -> str | None:
+    """Explicit --baseline if present, else the first '*_clean' variant, else the first variant."""
+    if baseline_variant and baseline_variant in variants:
+        return baseline_variant
+    clean_variants = [v for v in variants if variant_label(v).lower().endswith("_clean")]
+    if clean_variants:
+        return clean_variants[0]
+    return variants[0] if variants else None
+
 def make_dataframe(variant_to_avgs: dict, baseline_variant: str | None) -> pd.DataFrame:
     rows = []
     for variant, data in variant_to_avgs.items():
@@ -245,32 +489,28 @@ def make_dataframe(variant_to_avgs: dict, baseline_variant: str | None) -> pd.Da
             row[k] = data.get(k, float("nan"))
         if "IPC" in data:
             row["IPC"] = data["IPC"]
+        for k in list(TOPDOWN_COLUMNS.values()) + list(MEMORY_COLUMNS):
+            if k in data:
+                row[k] = data[k]
         rows.append(row)
 
     df = pd.DataFrame(rows).set_index("variant")
-    baseline = None
-    if baseline_variant and baseline_variant in df.index:
-        baseline = baseline_variant
-    else:
-        # try to find one ending with '_clean'
-        clean_variants = [v for v in df.index if v.lower().endswith("_clean")]
-        if clean_variants:
-            baseline = clean_variants[0]
-        elif len(df.index):
-            baseline = df.index[0]
+    baseline = pick_baseline(list(df.index), baseline_variant)
 
     if baseline and pd.notna(df.loc[baseline].get("time", float("nan"))) and df.loc[baseline, "time"] > 0:
         base_time = df.loc[baseline, "time"]
         df["Speedup"] = base_time / df["time"]
     else:
         df["Speedup"] = float("nan")
+    float_cols = ("time", "IPC", "Speedup") + tuple(TOPDOWN_COLUMNS.values()) + tuple(
+        c for c in MEMORY_COLUMNS if c.endswith("MiB"))
     # --- Round selected integer metrics ---
     for col in df.columns:
-        if col not in ("time", "IPC", "Speedup"):
+        if col not in float_cols:
             df[col] = df[col].apply(lambda x: int(round(x)) if pd.notna(x) else x)
 
     # --- Round selected float metrics ---
-    for col in ("time", "IPC", "Speedup"):
+    for col in float_cols:
         if col in df.columns:
             df[col] = df[col].round(2)
 
@@ -282,7 +522,8 @@ def make_dataframe(variant_to_avgs: dict, baseline_variant: str | None) -> pd.Da
         df = df.loc[speedups.index]
 
     # --- Column order consistency ---
-    ordered = [c for c in COUNTER_KEYS if c in df.columns]
+    ordered = [c for c in COUNTER_KEYS + list(TOPDOWN_COLUMNS.values()) + list(MEMORY_COLUMNS)
+               if c in df.columns]
     return df[ordered]
 
 def fmt_num(x):
@@ -353,7 +594,226 @@ def bar(fig, title, x, y):
     fig.add_trace(go.Bar(x=x, y=y, text=[fmt_num(v) for v in y], textposition="auto"))
     fig.update_layout(title=title, bargap=0.25)
 
-def write_html(df_table: pd.DataFrame, df_charts: pd.DataFrame, out_html: Path, header_note: str):
+def profile_sections(found: dict, out_html: Path, top: int) -> list:
+    """Per-variant flamegraph link plus the perf record function table, if any."""
+    parts = []
+    for variant, perf_dir in sorted(found.items()):
+        stamp_dir = perf_dir.parent
+        svg = stamp_dir / "flamegraph" / f"flamegraph_pyspy_{variant_label(variant)}.svg"
+        fc = load_function_counters(stamp_dir, top)
+        if not svg.exists() and fc is None:
+            continue
+        parts.append(f"<h3>{variant}</h3>")
+        if svg.exists():
+            href = os.path.relpath(svg.resolve(), out_html.parent.resolve())
+            parts.append(f'<p><a href="{href}">py-spy flamegraph</a></p>')
+        if fc is not None:
+            parts.append(fc.to_html(classes='table', justify='center', float_format=lambda x: f"{x:.2f}"))
+    if parts:
+        parts.insert(0, "<hr/><h2>Profiles</h2>")
+    return parts
+
+def _geomean(values) -> float:
+    vals = [v for v in values if pd.notna(v) and v > 0]
+    return math.exp(sum(math.log(v) for v in vals) / len(vals)) if vals else float("nan")
+
+def matrix_sections(times: dict, baseline: str | None, interpreters: list) -> list:
+    """Variant x interpreter speedup matrix, split into interpreter and algorithmic speedups."""
+    if not interpreters or not baseline or MATRIX_SEP not in baseline:
+        return []
+    t = pd.Series({tuple(k.split(MATRIX_SEP, 1)): v for k, v in times.items()
+                   if MATRIX_SEP in k and pd.notna(v) and v > 0}, dtype=float)
+    if t.empty:
+        return []
+    t = t.unstack()
+    base_variant, base_interp = baseline.split(MATRIX_SEP, 1)
+    if base_variant not in t.index or base_interp not in t.columns:
+        return []
+    t = t.reindex(index=sorted(t.index, key=lambda v: (v != base_variant, v)),
+                  columns=[i for i in interpreters if i in t.columns])
+    t.index.name, t.columns.name = "variant", "interpreter"
+
+    overall = t.loc[base_variant, base_interp] / t
+    algorithmic = 1 / t.div(t.loc[base_variant], axis=1)
+    algorithmic.loc["geomean"] = [_geomean(algorithmic[c].drop(base_variant)) for c in algorithmic.columns]
+    interpreter = 1 / t.div(t[base_interp], axis=0)
+    interpreter["geomean"] = [_geomean(interpreter.loc[v].drop(base_interp)) for v in interpreter.index]
+
+    fig = go.Figure(go.Heatmap(
+        z=overall.values, x=overall.columns.tolist(), y=overall.index.tolist(),
+        text=[[fmt_num(round(v, 2)) if pd.notna(v) else "" for v in row] for row in overall.values],
+        texttemplate="%{text}", colorscale="RdYlGn", zmid=1.0,
+        hovertemplate="%{y} @ %{x}: %{z:.2f}x<extra></extra>"))
+    fig.update_layout(title=f"Speedup vs {base_variant} on {base_interp}",
+                      yaxis=dict(autorange="reversed"))
+    fmt = lambda x: f"{x:.2f}"
+    return [
+        f"<hr/><h2>Interpreter matrix (baseline: {html.escape(base_variant)} on {html.escape(base_interp)})</h2>",
+        fig.to_html(full_html=False, include_plotlyjs="cdn"),
+        "<p>Overall speedup = interpreter speedup of the baseline variant x algorithmic speedup "
+        "on that interpreter.</p>",
+        "<h3>Overall speedup</h3>",
+        overall.to_html(classes='table', justify='center', float_format=fmt, na_rep=""),
+        f"<h3>Algorithmic speedup (vs {html.escape(base_variant)} on the same interpreter)</h3>",
+        algorithmic.to_html(classes='table', justify='center', float_format=fmt, na_rep=""),
+        f"<h3>Interpreter speedup (vs {html.escape(base_interp)} for the same variant)</h3>",
+        interpreter.to_html(classes='table', justify='center', float_format=fmt, na_rep=""),
+        "<h3>Mean time (s)</h3>",
+        t.to_html(classes='table', justify='center', float_format=lambda x: f"{x:.4f}", na_rep=""),
+    ]
+
+def system_sections(found: dict) -> list:
+    """Pre-flight state and measured noise per variant; noisy runs are flagged."""
+    rows = OrderedDict()
+    for variant, perf_dir in sorted(found.items()):
+        stamp_dir = perf_dir.parent
+        saved = load_system_state(stamp_dir)
+        if saved is None:
+            continue
+        state = saved.get("state", {})
+        reasons = list(saved.get("warnings", []))
+        cv, migrations = run_noise(perf_dir)
+        if cv is not None and cv > NOISY_CV_PCT:
+            reasons.append(f"time CV {cv:.1f}% > {NOISY_CV_PCT:g}%")
+        if state.get("pin_cpu") is not None and migrations:
+            reasons.append(f"{migrations:.0f} CPU migrations while pinned")
+        turbo = state.get("turbo")
+        rows[variant] = {
+            "governor": ", ".join(f"{g} ({c})" for g, c in state.get("governors", {}).items()) or "n/a",
+            "turbo": "n/a" if turbo is None else ("on" if turbo else "off"),
+            "ASLR": state.get("aslr", "n/a"),
+            "pinned CPU": state.get("pin_cpu") if state.get("pin_cpu") is not None else "-",
+            "isolated": state.get("isolated") or "-",
+            "IRQs on CPU": len(state.get("irqs_on_pin_cpu", [])),
+            "load": state.get("loadavg_1m", "n/a"),
+            "time CV %": f"{cv:.2f}" if cv is not None else "n/a",
+            "migrations": f"{migrations:.1f}" if migrations is not None else "n/a",
+            "tuned": "yes" if saved.get("tuning", {}).get("applied") else "no",
+            "status": "noisy" if reasons else "ok",
+            "reasons": "<br/>".join(html.escape(r) for r in reasons),
+        }
+    if not rows:
+        return []
+    table = pd.DataFrame.from_dict(rows, orient="index")
+    return ["<hr/><h2>System state</h2>",
+            table.to_html(classes='table', justify='center', escape=False)]
+
+def topdown_sections(df: pd.DataFrame) -> list:
+    """Stacked top-down bars per variant (level 1, and level 2 where perf reported it)."""
+    parts = []
+    for title, keys in (("Top-down level 1", TOPDOWN_L1_KEYS), ("Top-down level 2", TOPDOWN_L2_KEYS)):
+        cols = [k for k in keys if k in df.columns and df[k].notna().any()]
+        if not cols:
+            continue
+        fig = go.Figure()
+        for k in cols:
+            vals = df[k].tolist()
+            fig.add_trace(go.Bar(name=k.replace(" %", ""), x=df.index.tolist(), y=vals,
+                                 text=[f"{v:.1f}" if pd.notna(v) else "" for v in vals],
+                                 textposition="inside"))
+        fig.update_layout(title=title, barmode="stack", bargap=0.25, yaxis=dict(title="% of slots"))
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn"))
+    if parts:
+        parts.insert(0, "<hr/><h2>Top-down analysis</h2>")
+    return parts
+
+def memory_sections(found: dict, df: pd.DataFrame, top: int) -> list:
+    """Peak RSS vs time, memory grown per phase, and top allocation sites per variant."""
+    parts = []
+    if "Peak RSS MiB" in df.columns and df["Peak RSS MiB"].notna().any():
+        mem = df[df["Peak RSS MiB"].notna()]
+        fig = go.Figure(go.Scatter(x=mem["time"], y=mem["Peak RSS MiB"], mode="markers+text",
+                                   text=mem.index.tolist(), textposition="top center"))
+        fig.update_layout(title="Memory / time trade-off",
+                          xaxis=dict(title="time (s)"), yaxis=dict(title="peak RSS (MiB)"))
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn"))
+
+    phases = {v: load_memory_phases(p.parent) for v, p in found.items()}
+    phases = {v: ph for v, ph in phases.items() if ph is not None}
+    if phases:
+        variants = [v for v in df.index if v in phases]
+        names = list(OrderedDict.fromkeys(n for v in variants for n in phases[v].index))
+        fig = go.Figure()
+        for name in names:
+            vals = [phases[v]["grown_kib"].get(name, 0.0) / 1024 for v in variants]
+            fig.add_trace(go.Bar(name=name, x=variants, y=vals))
+        fig.update_layout(title="Memory grown per phase (MiB, held when the phase returned)",
+                          barmode="stack", bargap=0.25)
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn"))
+
+    for variant, perf_dir in sorted(found.items()):
+        sites = load_memory_sites(perf_dir.parent, top)
+        if sites is None:
+            continue
+        parts.append(f"<h3>{variant}</h3>")
+        if variant in phases:
+            parts.append(phases[variant].to_html(classes='table', justify='center'))
+        parts.append(sites.to_html(classes='table', justify='center'))
+    if parts:
+        parts.insert(0, "<hr/><h2>Memory</h2>")
+    return parts
+
+SWEEP_METRICS = ["time", "instructions", "cycles"]
+
+def load_sweep(stamp_dir: Path) -> tuple[pd.DataFrame, pd.DataFrame] | None:
+    """(runs, fits) from <stamp>/sweep/, None if the variant was not swept."""
+    sweep_csv, fit_csv = stamp_dir / "sweep" / "sweep.csv", stamp_dir / "sweep" / "fit.csv"
+    if not sweep_csv.exists() or not fit_csv.exists():
+        return None
+    runs = pd.read_csv(sweep_csv, keep_default_na=False, na_values=[""])
+    fits = pd.read_csv(fit_csv, keep_default_na=False, na_values=[""])
+    runs["series"] = runs["series"].fillna("").astype(str)
+    fits["series"] = fits["series"].fillna("").astype(str)
+    return runs.dropna(subset=["x"]), fits
+
+def sweep_sections(found: dict) -> list:
+    """Scaling curves (measured means + fitted class) per metric, and the fit table."""
+    sweeps = {v: load_sweep(p.parent) for v, p in sorted(found.items())}
+    sweeps = {v: s for v, s in sweeps.items() if s is not None and not s[0].empty}
+    if not sweeps:
+        return []
+    x_names = {str(x) for _, fits in sweeps.values() for x in fits.get("x", [])}
+    x_name = x_names.pop() if len(x_names) == 1 else "size"
+    parts = ["<hr/><h2>Scaling</h2>"]
+    for metric in SWEEP_METRICS + ["time per unit"]:
+        fig = go.Figure()
+        for variant, (runs, fits) in sweeps.items():
+            col = "time" if metric == "time per unit" else metric
+            if col not in runs.columns:
+                continue
+            for series, srows in runs.groupby("series", sort=False):
+                means = srows.groupby("x")[col].mean()
+                name = f"{variant} {series}".strip()
+                ys = means / means.index if metric == "time per unit" else means
+                fig.add_trace(go.Scatter(x=means.index, y=ys, mode="markers", name=name))
+                fit = fits[(fits["series"] == series) & (fits["metric"] == col)]
+                if fit.empty:
+                    continue
+                f = scaling.Fit(fit["model"].iloc[0], float(fit["c0"].iloc[0]), float(fit["c1"].iloc[0]),
+                                float(fit["rel_rmse"].iloc[0]), None, None)
+                lo, hi = means.index.min(), means.index.max()
+                xs = [lo * (hi / lo) ** (i / 49) for i in range(50)]
+                ys = [scaling.predict(f, x) / (x if metric == "time per unit" else 1) for x in xs]
+                fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines", line=dict(dash="dash"),
+                                         name=f"{name} ~ {f.model}"))
+        if not fig.data:
+            continue
+        ytitle = f"time / {x_name} (s)" if metric == "time per unit" else metric
+        fig.update_layout(title=f"{metric} vs {x_name}", xaxis=dict(title=x_name, type="log"),
+                          yaxis=dict(title=ytitle, type="log"))
+        parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn"))
+
+    table = pd.concat([fits.assign(variant=v) for v, (_, fits) in sweeps.items()])
+    table = table[table["metric"].isin(SWEEP_METRICS)]
+    table = table.set_index(["variant", "series", "metric"])[
+        ["points", "model", "c0", "c1", "exponent", "crossover", "rel_rmse"]]
+    parts.append(f"<p>c0: fixed cost per launch; c1: cost per unit of f({x_name}); crossover: "
+                 f"{x_name} above which the per-unit work outweighs the fixed cost.</p>")
+    parts.append(table.to_html(classes='table', justify='center', na_rep=""))
+    return parts
+
+def write_html(df_table: pd.DataFrame, df_charts: pd.DataFrame, out_html: Path, header_note: str,
+               extra_parts: list | None = None):
     out_html.parent.mkdir(parents=True, exist_ok=True)
     parts = []
     parts.append(f"<h1>perf report</h1>")
@@ -367,7 +827,7 @@ def write_html(df_table: pd.DataFrame, df_charts: pd.DataFrame, out_html: Path,
     variants = df_charts.index.tolist()
     for col in df_charts.columns:
         s = df_charts[col]
-        if s.isna().all():
+        if s.isna().all() or col in TOPDOWN_COLUMNS.values():
             continue
         fig = go.Figure()
         fig.add_trace(go.Bar(x=variants, y=s.fillna(0.0).tolist(),
@@ -376,6 +836,8 @@ def write_html(df_table: pd.DataFrame, df_charts: pd.DataFrame, out_html: Path,
         fig.update_layout(title=col, bargap=0.25)
         parts.append(fig.to_html(full_html=False, include_plotlyjs="cdn"))
 
+    parts.extend(extra_parts or [])
+
     html = f"""<!doctype html>
 <html><head><meta charset="utf-8"><title>perf report</title>
 <style>
@@ -397,10 +859,15 @@ def parse_args():
     p.add_argument("--report-dir", default=str(REPORT_ROOT_DEFAULT), help="Where to write reports/ (default: reports)")
     p.add_argument("--timestamp", help="Use this timestamp under each variant (YYYYMMDD_HHMMSS). If absent, use latest per-variant.")
     p.add_argument("--baseline", help="Variant name to use as speedup baseline.")
+    p.add_argument("--baseline-interpreter",
+                help="Interpreter of the baseline in a multi-interpreter run (default: the first one run).")
     p.add_argument("--transpose", action="store_true",
                help="Transpose the data table in Excel and HTML (charts remain the same).")
     p.add_argument("--geomean", action="store_true",
                 help="Append geometric mean of Speedup across variants to the report.")
+    p.add_argument("--top-functions", type=int, default=15,
+                help="Rows shown per variant in the perf record function table and per phase in "
+                     "the memory allocation-site table (default: 15).")
 
     return p.parse_args()
 
@@ -410,7 +877,9 @@ def main():
     report_root = Path(args.report_dir)
     forced_ts = args.timestamp
 
-    found = find_variants_perf_dirs(root, forced_ts)
+    found, interpreters = find_matrix_perf_dirs(root, forced_ts)
+    if not found:
+        found = find_variants_perf_dirs(root, forced_ts)
     if not found:
         print(f"❌ No perf dirs found under {root}/<variant>/{forced_ts or '*'} /perf")
         return
@@ -421,9 +890,20 @@ def main():
         avg = aggregate_variant(perf_dir, args.geomean)
         if not avg:
             print(f"⚠️  No counters parsed in {perf_dir}")
+        avg.update(load_topdown(perf_dir.parent))
+        avg.update(load_memory(perf_dir.parent))
         variant_to_avgs[variant] = avg
 
-    df = make_dataframe(variant_to_avgs, args.baseline)
+    baseline_arg = args.baseline
+    if interpreters:
+        base_interp = (args.baseline_interpreter if args.baseline_interpreter in interpreters
+                       else interpreters[0])
+        if baseline_arg and MATRIX_SEP not in baseline_arg:
+            baseline_arg = f"{baseline_arg}{MATRIX_SEP}{base_interp}"
+        elif not baseline_arg:
+            baseline_arg = pick_baseline(
+                [k for k in variant_to_avgs if k.split(MATRIX_SEP, 1)[1] == base_interp], None)
+    df = make_dataframe(variant_to_avgs, baseline_arg)
 
     df_table = df.T if args.transpose else df
     df_charts = df  # charts keep variants on X
@@ -439,7 +919,16 @@ def main():
     header_note = (f"source timestamp: {forced_ts}" if forced_ts
                 else "source timestamp: latest per variant")
     header_note += f" · aggregation: {'geometric mean' if args.geomean else 'arithmetic mean'}"
-    write_html(df_table, df_charts, out_html, header_note)
+    baseline = pick_baseline(list(variant_to_avgs), baseline_arg)
+    extra_parts = matrix_sections({k: v.get("time") for k, v in variant_to_avgs.items()},
+                                  baseline, interpreters)
+    extra_parts += system_sections(found)
+    extra_parts += topdown_sections(df)
+    extra_parts += memory_sections(found, df, args.top_functions)
+    extra_parts += sweep_sections(found)
+    extra_parts += profile_sections(found, out_html, args.top_functions)
+    extra_parts += differential_sections(found, df, baseline, out_dir, args.top_functions)
+    write_html(df_table, df_charts, out_html, header_note, extra_parts)
 
     print("\n=== REPORT BUILT ===")
     print(f"HTML : {out_html.resolve()}")
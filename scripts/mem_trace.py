@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Run a benchmark script under tracemalloc and account allocations per phase.
+
+Used by run_benchmarks.py --memory. It runs under the benchmark's interpreter,
+so it is stdlib only and needs Python 3.9+ (tracemalloc.reset_peak).
+
+A phase is a function name (e.g. build_graph,evaluate). Every call of such a
+function, from any module or class, is a phase; allocations are attributed to
+the innermost phase that is running, and everything outside all phases
+(imports, set-up, glue) to "other". Per phase:
+
+  <out>/phases.csv     phase, calls, seconds, grown_kib, grown_blocks, freed_kib, peak_kib
+  <out>/sites.csv      phase, site, size_kib, blocks   (top N growing sites)
+  <out>/tracemalloc.json   overall peak / final traced memory and the phases
+
+Sites are diffed between the start and the end of each call (taken once the
+call's frame is gone), so "grown" is what a phase allocated and still held
+afterwards: caches, graphs, return values; temporaries do not show. The
+profile hook only sees calls and returns, so what the caller allocates before
+its next call still counts towards the phase that just returned. "freed" is memory of
+earlier phases released by this one. peak_kib is the highest traced total (all
+live blocks, not only the phase's) seen while it ran. Time spent by tracemalloc
+and in the profile hook is included in seconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import runpy
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+OTHER = "other"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Per-phase tracemalloc profile of a Python script.")
+    p.add_argument("--out", required=True, help="Output directory.")
+    p.add_argument("--phases", default="",
+                   help="Comma-separated function names that delimit phases (default: none, one 'other' phase).")
+    p.add_argument("--top", type=int, default=25, help="Allocation sites kept per phase (default: 25).")
+    p.add_argument("--frames", type=int, default=1,
+                   help="Traceback depth stored by tracemalloc; sites use the innermost frame (default: 1).")
+    p.add_argument("script", help="Benchmark script, followed by its arguments.")
+    p.add_argument("script_args", nargs=argparse.REMAINDER)
+    return p.parse_args(argv)
+
+
+class PhaseTracker:
+    """Splits the run into segments at phase boundaries and diffs tracemalloc per segment."""
+
+    def __init__(self, phases: List[str]):
+        self.phases = set(phases)
+        self.ignore = {tracemalloc.__file__, __file__}
+        self.stack: List[list] = []   # [phase, frame, recursion depth]
+        self.current = OTHER
+        self.returned = False
+        self.start_sites: Dict[str, Tuple[int, int]] = {}
+        self.start_time = 0.0
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.peak: Dict[str, int] = {}
+        self.sites: Dict[str, Dict[str, List[int]]] = {}
+
+    def _site_totals(self) -> Dict[str, Tuple[int, int]]:
+        # filtering afterwards is much cheaper than Snapshot.filter_traces()
+        out = {}
+        for stat in tracemalloc.take_snapshot().statistics("lineno"):
+            frame = stat.traceback[0]
+            if frame.filename not in self.ignore:
+                out[f"{frame.filename}:{frame.lineno}"] = (stat.size, stat.count)
+        return out
+
+    def _begin(self, phase: str) -> None:
+        self.current = phase
+        self.start_sites = self._site_totals()
+        tracemalloc.reset_peak()
+        self.start_time = time.perf_counter()
+
+    def _end(self) -> None:
+        elapsed = time.perf_counter() - self.start_time
+        peak = tracemalloc.get_traced_memory()[1]
+        phase = self.current
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + elapsed
+        self.peak[phase] = max(self.peak.get(phase, 0), peak)
+        end_sites = self._site_totals()
+        acc = self.sites.setdefault(phase, {})
+        for site in set(end_sites) | set(self.start_sites):
+            size0, count0 = self.start_sites.get(site, (0, 0))
+            size1, count1 = end_sites.get(site, (0, 0))
+            if size1 != size0 or count1 != count0:
+                s = acc.setdefault(site, [0, 0])
+                s[0] += size1 - size0
+                s[1] += count1 - count0
+        self.start_sites = {}
+
+    def start(self) -> None:
+        self.calls[OTHER] = 1
+        self._begin(OTHER)
+
+    def finish(self) -> None:
+        self._end()
+
+    def profile(self, frame, event, arg) -> None:
+        name = frame.f_code.co_name
+        starts = event == "call" and name in self.phases
+        if starts and self.stack and self.stack[-1][0] == name:
+            self.stack[-1][2] += 1      # recursion stays in the same phase
+            starts = False
+        if self.returned or starts:
+            # a phase ends at the first event after its return, once its
+            # frame (and the temporaries in its locals) is gone
+            self.returned = False
+            self._end()
+            if starts:
+                self.stack.append([name, frame, 0])
+                self.calls[name] = self.calls.get(name, 0) + 1
+            self._begin(self.stack[-1][0] if self.stack else OTHER)
+        if event == "return" and self.stack:
+            top = self.stack[-1]
+            if top[1] is frame:
+                self.stack.pop()
+                self.returned = True
+            elif top[2] and name == top[0]:
+                top[2] -= 1
+
+    def write(self, out_dir: str, top: int) -> None:
+        os.makedirs(out_dir, exist_ok=True)
+        order = [OTHER] + sorted(p for p in self.calls if p != OTHER)
+        rows = []
+        for phase in order:
+            sites = self.sites.get(phase, {})
+            rows.append({
+                "phase": phase,
+                "calls": self.calls.get(phase, 0),
+                "seconds": round(self.seconds.get(phase, 0.0), 4),
+                "grown_kib": round(sum(max(s[0], 0) for s in sites.values()) / 1024, 1),
+                "grown_blocks": sum(max(s[1], 0) for s in sites.values()),
+                "freed_kib": round(-sum(min(s[0], 0) for s in sites.values()) / 1024, 1),
+                "peak_kib": round(self.peak.get(phase, 0) / 1024, 1),
+            })
+        with open(os.path.join(out_dir, "phases.csv"), "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(rows[0]))
+            w.writeheader()
+            w.writerows(rows)
+        with open(os.path.join(out_dir, "sites.csv"), "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["phase", "site", "size_kib", "blocks"])
+            for phase in order:
+                sites = sorted(self.sites.get(phase, {}).items(), key=lambda kv: -kv[1][0])
+                for site, (size, count) in [kv for kv in sites if kv[1][0] > 0][:top]:
+                    w.writerow([phase, site, f"{size / 1024:.1f}", count])
+        current, _ = tracemalloc.get_traced_memory()
+        with open(os.path.join(out_dir, "tracemalloc.json"), "w") as f:
+            json.dump({
+                "peak_kib": max((r["peak_kib"] for r in rows), default=0.0),
+                "final_kib": round(current / 1024, 1),
+                "grown_blocks": sum(r["grown_blocks"] for r in rows),
+                "phases": rows,
+            }, f, indent=2)
+
+
+def main() -> int:
+    args = parse_args()
+    phases = [p.strip() for p in args.phases.split(",") if p.strip()]
+    script = os.path.abspath(args.script)
+    sys.argv = [script] + args.script_args
+    sys.path[0] = os.path.dirname(script)
+
+    tracker = PhaseTracker(phases)
+    tracemalloc.start(args.frames)
+    tracker.start()
+    if phases:
+        sys.setprofile(tracker.profile)
+    status = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.setprofile(None)
+        tracker.finish()
+        tracker.write(args.out, args.top)
+        tracemalloc.stop()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Parse the human-readable output of 'perf stat' (one file per run).
+
+Shared by build_html_report.py and bench_history.py; stdlib only so that the
+history store does not need the report's pandas/plotly stack.
+"""
+
+import re
+from pathlib import Path
+
+
+LABEL_NORMALIZE = {
+    "cycles": "cycles",
+    "instructions": "instructions",
+
+    "context-switches": "context-switches",
+    "cpu-migrations": "cpu-migrations",
+    "page-faults": "page-faults",
+
+    "branches": "branches",
+    "branch-misses": "branch-misses",
+
+    "l1-dcache-loads": "L1-dcache-loads",
+    "l1-dcache-load-misses": "L1-dcache-load-misses",
+
+    "llc-loads": "LLC-loads",
+    "llc-load-misses": "LLC-load-misses",
+
+
+    "dtlb-loads": "dTLB-loads",
+    "dtlb-load-misses": "dTLB-load-misses",
+
+    "itlb-loads": "iTLB-loads",
+    "itlb-load-misses": "iTLB-load-misses",
+
+    # time sources
+    "time elapsed": "time",         # seconds time elapsed (if present)
+}
+
+NUM_RE = re.compile(r"""
+    (?P<num>
+        (?:\d{1,3}(?:[,\s]\d{3})+|\d+)
+        (?:\.\d+)? | \d+\.\d+
+    )
+""", re.VERBOSE)
+
+
+def _to_number(tok: str):
+    tok = tok.replace(" ", "").replace(",", "")
+    try:
+        return float(tok)
+    except Exception:
+        return None
+
+
+def parse_perf_file(path: Path) -> dict:
+    results = {}
+    text = path.read_text(errors="ignore")
+    for line in text.splitlines():
+        s = line.strip()
+        if not s or "<not supported>" in s.lower():
+            continue
+        m = NUM_RE.search(s)
+        if not m:
+            continue
+        val = _to_number(m.group("num"))
+        if val is None:
+            continue
+
+        tail = s[m.end():].strip()
+        tail = tail.split("#", 1)[0].strip()
+        lbl_low = tail.lower()
+
+        norm = None
+        for k, v in LABEL_NORMALIZE.items():
+            if lbl_low.endswith(k):
+                norm = v
+                break
+        if norm is None:
+            parts = tail.split()
+            if parts:
+                norm = LABEL_NORMALIZE.get(parts[-1].lower(), LABEL_NORMALIZE.get(tail.lower()))
+        if not norm:
+            continue
+
+        if norm == "time":
+            if "seconds time elapsed" in lbl_low or "time elapsed" in lbl_low:
+                results["time"] = val
+            else:
+                results.setdefault("time", val)
+        else:
+            results[norm] = val
+    return results
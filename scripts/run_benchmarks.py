@@ -7,20 +7,41 @@ Key features:
 - No emojis or machine-specific paths.
 - Tool locations are discovered from PATH by default; can be overridden.
 - Optional sudo-free cache flush before each perf run.
+- Optional perf record stage attributing hardware counters to Python functions.
+- Optional top-down (TMA) breakdown: retiring / bad speculation / frontend / backend.
+- Optional memory stage: peak RSS (wait4 rusage) and per-phase tracemalloc allocation sites.
+- Optional input-size sweep over a parameter grid, with complexity fits (scaling.py).
+- Several interpreters per run (--python NAME=PATH, repeatable): the variant x
+  interpreter matrix, one result subtree per interpreter.
+- Content-addressed result cache: unchanged variants reuse their last results.
+- Optional SQLite history (bench_history.py) with regression detection.
+- System noise pre-flight (governor, turbo, ASLR, isolcpus/nohz_full, IRQs) recorded
+  per run, optional pyperf-style tuning with restore, and CPU pinning.
 - Clean, timestamped output layout.
 """
 
 from __future__ import annotations
 
 import argparse
+import ast
+import csv
+import hashlib
+import itertools
+import json
 import os
+import platform
+import re
 import shutil
+import signal
 import subprocess
 import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
+
+from perf_stat import parse_perf_file
+import scaling
 
 
 @dataclass
@@ -30,6 +51,12 @@ class Variant:
     pyperf_wrapper: Optional[Path] = None  # optional
 
 
+@dataclass
+class Interpreter:
+    name: str
+    path: str
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Run profiling (py-spy + perf stat) on one or more benchmark scripts."
@@ -37,8 +64,12 @@ def parse_args() -> argparse.Namespace:
     p.add_argument(
         "--python",
         dest="python",
-        default=os.environ.get("VENV_PYTHON", sys.executable),
-        help="Python interpreter to run benchmarks (default: env VENV_PYTHON or current interpreter)",
+        action="append",
+        default=[],
+        metavar="[NAME=]PATH",
+        help=("Python interpreter to run benchmarks (default: env VENV_PYTHON or current interpreter). "
+              "Repeat to run every variant on each interpreter; results then go to <outdir>/<NAME>/. "
+              "NAME defaults to the version and build, e.g. 3.12-debug, 3.13t-release, 3.12-pgo-lto."),
     )
     p.add_argument(
         "--pyspy",
@@ -91,6 +122,11 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="py-spy duration in seconds (default: run for full program duration)",
     )
+    p.add_argument(
+        "--pyspy-raw",
+        action="store_true",
+        help="Also record collapsed stacks (py-spy --format raw) for differential flamegraphs.",
+    )
     p.add_argument(
         "--bench-args",
         default="",
@@ -102,6 +138,96 @@ def parse_args() -> argparse.Namespace:
         default="1GiB",
         help="Sudo-free cache flush working set size (e.g., 0, 512MiB, 1GiB). 0 disables. Default: 1GiB",
     )
+    p.add_argument(
+        "--perf-record",
+        action="store_true",
+        help="Also run 'perf record' per variant and attribute sampled events to Python functions.",
+    )
+    p.add_argument(
+        "--perf-record-events",
+        default="cycles,cache-misses,branch-misses",
+        help="Comma-separated events sampled by perf record (default: cycles,cache-misses,branch-misses)",
+    )
+    p.add_argument(
+        "--perf-record-freq",
+        type=int,
+        default=999,
+        help="perf record sampling frequency in Hz (default: 999)",
+    )
+    p.add_argument(
+        "--topdown",
+        action="store_true",
+        help="Also run a top-down pass (perf stat -M TopdownL1,TopdownL2, or raw topdown-* events as fallback).",
+    )
+    p.add_argument(
+        "--memory",
+        action="store_true",
+        help="Also record peak RSS and run the benchmark once under tracemalloc (mem_trace.py).",
+    )
+    p.add_argument(
+        "--memory-phases",
+        default="",
+        help="Comma-separated function names that split the tracemalloc run into phases "
+             "(e.g. build_graph,evaluate; default: one phase).",
+    )
+    p.add_argument(
+        "--memory-top",
+        type=int,
+        default=25,
+        help="Allocation sites kept per phase by the tracemalloc run (default: 25)",
+    )
+    p.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help=("Also run each variant over a parameter grid and fit time and counters against input "
+              "size. Repeat for more dimensions; values may use size suffixes (1KiB, 256MiB). "
+              "Example: --sweep size=1KiB,16KiB,256KiB,4MiB"),
+    )
+    p.add_argument(
+        "--sweep-args",
+        default=None,
+        metavar="TEMPLATE",
+        help=("Benchmark arguments per grid point, with {NAME} placeholders "
+              "(default: '--NAME {NAME}' per parameter, '_' written as '-'). Example: '{loops} --size {size}'"),
+    )
+    p.add_argument(
+        "--sweep-x",
+        default=None,
+        metavar="NAME",
+        help=("Input size to fit against: a --sweep parameter, or a 'NAME: <number>' line the benchmark "
+              "prints (e.g. 'states' for the MDP drivers). Default: the first --sweep parameter."),
+    )
+    p.add_argument(
+        "--sweep-runs",
+        type=int,
+        default=3,
+        help="perf stat runs per grid point (default: 3)",
+    )
+    p.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-profile every variant even if an earlier run has the same fingerprint.",
+    )
+    p.add_argument(
+        "--history",
+        default=None,
+        metavar="DB",
+        help="Ingest each variant's perf stat samples into this SQLite history and report regressions.",
+    )
+    p.add_argument(
+        "--pin-cpu",
+        default=None,
+        metavar="CPU|auto",
+        help="Run every launch under 'taskset -c CPU'; 'auto' picks the first isolated CPU.",
+    )
+    p.add_argument(
+        "--tune",
+        action="store_true",
+        help=("Apply pyperf-style tuning (performance governor, turbo off, ASLR on, IRQs off the "
+              "pinned CPU) for the duration of the run, then restore the previous settings. Needs root."),
+    )
     p.add_argument(
         "--sleep-between-runs",
         type=float,
@@ -178,15 +304,196 @@ def flush_caches(flush_bytes: int) -> bool:
         return False
 
 
+
+# ---------------------- system noise: pre-flight, tuning, pinning ----------------------
+
+SYSTEM_STATE_FILE = "system_state.json"
+CPU_SYSFS = Path("/sys/devices/system/cpu")
+NO_TURBO = CPU_SYSFS / "intel_pstate" / "no_turbo"      # 1 = turbo disabled
+CPUFREQ_BOOST = CPU_SYSFS / "cpufreq" / "boost"         # 1 = boost enabled
+ASLR = Path("/proc/sys/kernel/randomize_va_space")
+
+
+def read_sysfs(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def parse_cpu_list(text: Optional[str]) -> List[int]:
+    """'0-2,8' -> [0, 1, 2, 8]; empty/None -> []."""
+    cpus: List[int] = []
+    for part in (text or "").replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus += range(int(lo), int(hi or lo) + 1)
+    return cpus
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    return ",".join(str(c) for c in sorted(cpus))
+
+
+def resolve_pin_cpu(spec: Optional[str]) -> Optional[int]:
+    """'auto' -> first isolated CPU (None if there is none); 'N' -> N."""
+    if not spec:
+        return None
+    if spec == "auto":
+        isolated = parse_cpu_list(read_sysfs(CPU_SYSFS / "isolated"))
+        return isolated[0] if isolated else None
+    cpu = int(spec)
+    if cpu not in os.sched_getaffinity(0):
+        raise ValueError(f"--pin-cpu {cpu}: not an available CPU")
+    return cpu
+
+
+def pinned(cmd: List[str], pin_cpu: Optional[int]) -> List[str]:
+    """Run cmd (tool and benchmark alike) on the pinned CPU."""
+    return ["taskset", "-c", str(pin_cpu)] + cmd if pin_cpu is not None else cmd
+
+
+def system_state(pin_cpu: Optional[int]) -> dict:
+    """Snapshot of the noise-relevant system settings; None where unreadable."""
+    governors: Dict[str, List[int]] = {}
+    for gov_file in sorted(CPU_SYSFS.glob("cpu[0-9]*/cpufreq/scaling_governor")):
+        cpu = int(gov_file.parent.parent.name[3:])
+        governors.setdefault(read_sysfs(gov_file) or "?", []).append(cpu)
+
+    turbo = None
+    if read_sysfs(NO_TURBO) is not None:
+        turbo = read_sysfs(NO_TURBO) == "0"
+    elif read_sysfs(CPUFREQ_BOOST) is not None:
+        turbo = read_sysfs(CPUFREQ_BOOST) == "1"
+
+    aslr = read_sysfs(ASLR)
+    cmdline = (read_sysfs(Path("/proc/cmdline")) or "").split()
+    boot = {k: v for k, _, v in (a.partition("=") for a in cmdline)
+            if k in ("isolcpus", "nohz_full", "rcu_nocbs", "irqaffinity")}
+
+    irqs_on_cpu = []
+    if pin_cpu is not None:
+        for aff in Path("/proc/irq").glob("[0-9]*/smp_affinity_list"):
+            if pin_cpu in parse_cpu_list(read_sysfs(aff)):
+                irqs_on_cpu.append(int(aff.parent.name))
+    irqbalance = any(read_sysfs(c) == "irqbalance" for c in Path("/proc").glob("[0-9]*/comm"))
+
+    load = read_sysfs(Path("/proc/loadavg"))
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pin_cpu": pin_cpu,
+        "governors": {g: format_cpu_list(c) for g, c in governors.items()},
+        "turbo": turbo,
+        "aslr": int(aslr) if aslr is not None else None,
+        "isolated": read_sysfs(CPU_SYSFS / "isolated"),
+        "nohz_full": read_sysfs(CPU_SYSFS / "nohz_full"),
+        "boot_params": boot,
+        "irqs_on_pin_cpu": sorted(irqs_on_cpu),
+        "irqbalance": irqbalance,
+        "loadavg_1m": float(load.split()[0]) if load else None,
+        "online_cpus": os.cpu_count(),
+    }
+
+
+def preflight_warnings(state: dict) -> List[str]:
+    """What in this state adds noise, in the spirit of 'pyperf system show'."""
+    warnings = []
+    pin = state["pin_cpu"]
+    bad_govs = {g: c for g, c in state["governors"].items() if g != "performance"}
+    if pin is not None:
+        bad_govs = {g: c for g, c in bad_govs.items() if pin in parse_cpu_list(c)}
+    if bad_govs:
+        warnings.append("CPU governor not 'performance': "
+                        + "; ".join(f"{g} on {c}" for g, c in bad_govs.items()))
+    if state["turbo"]:
+        warnings.append("turbo/boost enabled (frequency depends on temperature and load)")
+    if state["aslr"] is not None and state["aslr"] != 2:
+        # pyperf keeps ASLR on: results should not hinge on one memory layout
+        warnings.append(f"ASLR is {state['aslr']}, not full randomization (2)")
+    if pin is None:
+        warnings.append("launches are not pinned (--pin-cpu): the scheduler may migrate them")
+    else:
+        if pin not in parse_cpu_list(state["isolated"]):
+            warnings.append(f"CPU {pin} is not isolated (isolcpus)")
+        if pin not in parse_cpu_list(state["nohz_full"]):
+            warnings.append(f"CPU {pin} is not nohz_full (timer ticks remain)")
+        if state["irqs_on_pin_cpu"]:
+            warnings.append(f"{len(state['irqs_on_pin_cpu'])} IRQs may be served on CPU {pin}")
+    if state["irqbalance"]:
+        warnings.append("irqbalance is running (may move IRQs onto the benchmark CPU)")
+    cpus = state["online_cpus"] or 1
+    if state["loadavg_1m"] is not None and state["loadavg_1m"] > 0.5 * cpus:
+        warnings.append(f"load average {state['loadavg_1m']:.2f} on {cpus} CPUs")
+    return warnings
+
+
+class SystemTuner:
+    """
+    pyperf-style tuning that remembers every value it overwrites.
+
+    restore() puts the original values back; main() calls it on exit, Ctrl-C
+    and SIGTERM. Writes that fail (not root) are reported and skipped.
+    """
+
+    def __init__(self):
+        self.saved: List[Tuple[Path, str]] = []
+        self.applied: List[str] = []
+        self.failed: List[str] = []
+
+    def write(self, path: Path, value: str) -> None:
+        old = read_sysfs(path)
+        if old is None or old == value:
+            return
+        try:
+            path.write_text(value)
+        except OSError as e:
+            self.failed.append(f"{path}: {e.strerror or e}")
+            return
+        self.saved.append((path, old))
+        self.applied.append(f"{path}: {old} -> {value}")
+
+    def tune(self, pin_cpu: Optional[int]) -> None:
+        cpus = [pin_cpu] if pin_cpu is not None else None
+        for gov_file in sorted(CPU_SYSFS.glob("cpu[0-9]*/cpufreq/scaling_governor")):
+            cpu = int(gov_file.parent.parent.name[3:])
+            if cpus is None or cpu in cpus:
+                self.write(gov_file, "performance")
+        if read_sysfs(NO_TURBO) is not None:
+            self.write(NO_TURBO, "1")
+        else:
+            self.write(CPUFREQ_BOOST, "0")
+        self.write(ASLR, "2")
+        if pin_cpu is not None:
+            # route interrupts to every other online CPU
+            others = [c for c in range(os.cpu_count() or 1) if c != pin_cpu]
+            if others:
+                for aff in sorted(Path("/proc/irq").glob("[0-9]*/smp_affinity_list")):
+                    if pin_cpu in parse_cpu_list(read_sysfs(aff)):
+                        self.write(aff, format_cpu_list(others))
+
+    def restore(self) -> None:
+        while self.saved:
+            path, old = self.saved.pop()
+            try:
+                path.write_text(old)
+            except OSError as e:
+                print(f"System tuning: could not restore {path} to {old}: {e}")
+
+
 def run_pyspy_flamegraph(pyspy: str, python: str, script_path: Path, out_svg: Path,
-                         rate: int, duration: Optional[float], bench_args: str) -> Tuple[bool, float]:
+                         rate: int, duration: Optional[float], bench_args: str,
+                         fmt: str = "flamegraph", pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
+    """Record with py-spy; fmt='raw' writes collapsed stacks instead of an SVG."""
     out_svg.parent.mkdir(parents=True, exist_ok=True)
-    cmd = [pyspy, "record", "-o", str(out_svg), "-r", str(rate)]
+    cmd = [pyspy, "record", "-o", str(out_svg), "-r", str(rate), "-f", fmt]
     if duration is not None and duration > 0:
         cmd += ["-d", str(duration)]
     cmd += ["--", python, str(script_path)]
     if bench_args:
         cmd += bench_args.split()
+    cmd = pinned(cmd, pin_cpu)
 
     print("py-spy:", " ".join(cmd))
     start = time.time()
@@ -205,7 +512,8 @@ def run_pyspy_flamegraph(pyspy: str, python: str, script_path: Path, out_svg: Pa
 
     if (res.returncode == 0 and svg_exists) or (svg_exists and nonfatal_errors):
         size = out_svg.stat().st_size
-        print(f"py-spy SVG generated: {out_svg} ({size} bytes) in {dur:.2f}s")
+        kind = "SVG" if fmt == "flamegraph" else fmt
+        print(f"py-spy {kind} generated: {out_svg} ({size} bytes) in {dur:.2f}s")
         return True, dur
 
     # Otherwise treat as real failure
@@ -219,7 +527,7 @@ def run_pyspy_flamegraph(pyspy: str, python: str, script_path: Path, out_svg: Pa
 
 
 def run_perf_stat(perf: str, python: str, script_path: Path, out_txt: Path, run_idx: int,
-                  bench_args: str, flush_bytes: int) -> Tuple[bool, float]:
+                  bench_args: str, flush_bytes: int, pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
     out_txt.parent.mkdir(parents=True, exist_ok=True)
 
     if flush_bytes > 0:
@@ -230,6 +538,7 @@ def run_perf_stat(perf: str, python: str, script_path: Path, out_txt: Path, run_
     cmd = [perf, "stat", "-d", "-d", "-d", "-o", str(out_txt), "--", python, str(script_path)]
     if bench_args:
         cmd += bench_args.split()
+    cmd = pinned(cmd, pin_cpu)
 
     print(f"perf run {run_idx}:", " ".join(cmd))
     start = time.time()
@@ -249,7 +558,8 @@ def run_perf_stat(perf: str, python: str, script_path: Path, out_txt: Path, run_
 
 
 def run_perf_stat_internal_repeats(perf: str, python: str, script_path: Path, out_txt: Path,
-                                   repeats: int, bench_args: str, flush_bytes: int) -> Tuple[bool, float]:
+                                   repeats: int, bench_args: str, flush_bytes: int,
+                                   pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
     out_txt.parent.mkdir(parents=True, exist_ok=True)
 
     if flush_bytes > 0:
@@ -260,6 +570,7 @@ def run_perf_stat_internal_repeats(perf: str, python: str, script_path: Path, ou
     cmd = [perf, "stat", "-r", str(repeats), "-d", "-d", "-d", "-o", str(out_txt), "--", python, str(script_path)]
     if bench_args:
         cmd += bench_args.split()
+    cmd = pinned(cmd, pin_cpu)
 
     print("perf stat:", " ".join(cmd))
     start = time.time()
@@ -276,11 +587,423 @@ def run_perf_stat_internal_repeats(perf: str, python: str, script_path: Path, ou
     return ok, dur
 
 
-def run_pyperf_wrapper(python: str, wrapper_script: Path, out_dir: Path, bench_args: str) -> Tuple[bool, float]:
+def python_supports_perf_trampoline(python: str) -> bool:
+    """True if the interpreter understands '-X perf' (CPython 3.12+ on Linux)."""
+    code = "import sys; sys.exit(0 if hasattr(sys, 'activate_stack_trampoline') else 1)"
+    try:
+        res = subprocess.run([python, "-c", code], capture_output=True, text=True)
+    except OSError:
+        return False
+    return res.returncode == 0
+
+
+# "cycles", "cycles:u", or "cpu_core/cycles/" as hybrid CPUs report each PMU
+PERF_EVENT_RE = re.compile(r"^(?:[\w.]+/)?(?P<name>[\w.-]+)")
+
+
+def perf_event_name(field: str) -> str:
+    """Event name of a 'perf script' header field, without its PMU and modifiers."""
+    m = PERF_EVENT_RE.match(field)
+    return m.group("name") if m else field
+
+
+def _perf_script_samples(perf: str, data_file: Path):
+    """
+    Stream (event, period, frames) triples out of 'perf script'.
+
+    period is the number of events the sample stands for; perf record -F
+    adjusts it from sample to sample. frames is the callchain leaf-first, as
+    symbol names. Output is consumed line by line so large recordings are
+    never held in memory at once.
+    """
+    cmd = [perf, "script", "-i", str(data_file), "-F", "event,period,ip,sym"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            text=True, errors="replace")
+    event = None
+    period = 0
+    frames: List[str] = []
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        if not line.strip():
+            if event is not None:
+                yield event, period, frames
+            event, frames = None, []
+            continue
+        stripped = line.strip()
+        if stripped.endswith(":"):
+            if event is not None:
+                yield event, period, frames
+            # header: "<period> [<pmu>/]<event>[/][:<modifiers>]:"; keep only the
+            # event name, so the samples of every PMU count towards it
+            fields = stripped.rstrip(":").split()
+            event = perf_event_name(fields[-1])
+            period = next((int(f) for f in fields[:-1] if f.isdigit()), 1)
+            frames = []
+            continue
+        if event is None:
+            continue
+        # callchain entry: "<ip> <sym>"
+        parts = stripped.split(None, 1)
+        frames.append(parts[1] if len(parts) > 1 else "[unknown]")
+    if event is not None:
+        yield event, period, frames
+    proc.wait()
+
+
+def attribute_samples(samples, events: List[str]) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Sum samples and their periods per Python function and event, as
+    [samples, period] pairs. The period sums are the event counts: with
+    frequency sampling, each sample stands for a different number of events.
+
+    A sample belongs to the innermost 'py::' trampoline frame on its callchain.
+    Samples without a Python frame (e.g. numba JIT code or C extensions called
+    outside the eval loop) are kept under their leaf symbol in brackets.
+    """
+    counts: Dict[str, Dict[str, List[int]]] = {}
+    for event, period, frames in samples:
+        if event not in events:
+            continue
+        owner = None
+        for sym in frames:
+            if sym.startswith("py::"):
+                # py::<qualname>:<filename>
+                owner = sym[len("py::"):]
+                break
+        if owner is None:
+            owner = f"[{frames[0]}]" if frames else "[unknown]"
+        row = counts.setdefault(owner, {e: [0, 0] for e in events})
+        row[event][0] += 1
+        row[event][1] += period
+    return counts
+
+
+def write_function_counters(counts: Dict[str, Dict[str, List[int]]], events: List[str],
+                            out_csv: Path) -> None:
+    """One row per function: samples, summed period and share of the period per event."""
+    totals = {e: sum(row[e][1] for row in counts.values()) for e in events}
+    order = sorted(counts, key=lambda f: counts[f][events[0]][1], reverse=True)
+    with open(out_csv, "w", newline="") as f:
+        w = csv.writer(f)
+        header = ["function"]
+        for e in events:
+            header += [f"{e}_samples", f"{e}_period", f"{e}_pct"]
+        w.writerow(header)
+        for func in order:
+            row = [func]
+            for e in events:
+                n, period = counts[func][e]
+                row += [n, period, f"{100.0 * period / totals[e]:.3f}" if totals[e] else "0.000"]
+            w.writerow(row)
+
+
+def run_perf_record(perf: str, python: str, script_path: Path, out_dir: Path,
+                    events: List[str], freq: int, bench_args: str,
+                    pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
+    """
+    Sample the benchmark with 'perf record -g' and write a per-Python-function
+    counter table (function_counters.csv) next to the raw perf.data.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data_file = out_dir / "perf_record.data"
+
+    py_cmd = [python]
+    if python_supports_perf_trampoline(python):
+        py_cmd += ["-X", "perf"]
+    else:
+        print("perf record: interpreter has no perf trampoline; Python frames will be missing")
+    py_cmd.append(str(script_path))
+    if bench_args:
+        py_cmd += bench_args.split()
+
+    cmd = pinned([perf, "record", "-g", "-F", str(freq), "-e", ",".join(events),
+                  "-o", str(data_file), "--"] + py_cmd, pin_cpu)
+    print("perf record:", " ".join(cmd))
+    start = time.time()
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    dur = time.time() - start
+    if res.stderr:
+        with open(out_dir / "perf_record.stderr.txt", "w") as f:
+            f.write(res.stderr)
+    if res.returncode != 0 or not data_file.exists():
+        print(f"FAIL perf record (exit={res.returncode}) after {dur:.2f}s")
+        return False, dur
+
+    counts = attribute_samples(_perf_script_samples(perf, data_file), events)
+    out_csv = out_dir / "function_counters.csv"
+    write_function_counters(counts, events, out_csv)
+    print(f"OK perf record finished in {dur:.2f}s -> {out_csv} ({len(counts)} functions)")
+    return bool(counts), dur
+
+
+# Top-down level 1 and 2 nodes, in the order they are written to topdown.csv
+TOPDOWN_L1 = ("retiring", "bad_speculation", "frontend_bound", "backend_bound")
+TOPDOWN_L2 = ("light_operations", "heavy_operations",
+              "branch_mispredicts", "machine_clears",
+              "fetch_latency", "fetch_bandwidth",
+              "memory_bound", "core_bound")
+TOPDOWN_RAW_EVENTS = ("topdown-total-slots", "topdown-slots-issued", "topdown-slots-retired",
+                      "topdown-fetch-bubbles", "topdown-recovery-bubbles")
+
+TOPDOWN_METRIC_RE = re.compile(r"#\s*(?P<val>-?\d+(?:\.\d+)?)\s*%\s*(?P<name>[A-Za-z_.]+)")
+TOPDOWN_EVENT_RE = re.compile(r"^\s*(?P<val>[\d,]+)\s+(?:[\w.]+/)?(?P<name>topdown-[a-z-]+)/?")
+
+
+def parse_topdown_metrics(text: str) -> Dict[str, float]:
+    """Percentages from 'perf stat -M Topdown*' output, e.g. '#  35.2 %  tma_retiring'."""
+    known = set(TOPDOWN_L1 + TOPDOWN_L2)
+    out: Dict[str, float] = {}
+    for m in TOPDOWN_METRIC_RE.finditer(text):
+        name = m.group("name").lower()
+        if name.startswith("tma_"):
+            name = name[len("tma_"):]
+        if name in known:
+            out[name] = float(m.group("val"))
+    return out
+
+
+def topdown_from_raw_events(text: str) -> Dict[str, float]:
+    """
+    Level-1 breakdown from the generic topdown-* events (Intel TMA formulas):
+      retiring  = slots_retired / total_slots
+      bad_spec  = (slots_issued - slots_retired + recovery_bubbles) / total_slots
+      frontend  = fetch_bubbles / total_slots
+      backend   = the remainder
+    """
+    ev: Dict[str, float] = {}
+    for line in text.splitlines():
+        m = TOPDOWN_EVENT_RE.match(line)
+        if m:
+            ev[m.group("name")] = float(m.group("val").replace(",", ""))
+    if any(e not in ev for e in TOPDOWN_RAW_EVENTS) or not ev["topdown-total-slots"]:
+        return {}
+    slots = ev["topdown-total-slots"]
+    retiring = ev["topdown-slots-retired"] / slots
+    bad_spec = (ev["topdown-slots-issued"] - ev["topdown-slots-retired"]
+                + ev["topdown-recovery-bubbles"]) / slots
+    frontend = ev["topdown-fetch-bubbles"] / slots
+    backend = max(0.0, 1.0 - retiring - bad_spec - frontend)
+    return {
+        "retiring": 100 * retiring,
+        "bad_speculation": 100 * bad_spec,
+        "frontend_bound": 100 * frontend,
+        "backend_bound": 100 * backend,
+    }
+
+
+def run_perf_topdown(perf: str, python: str, script_path: Path, out_dir: Path,
+                     bench_args: str, pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
+    """
+    Top-down breakdown into out_dir/topdown.csv (metric, percent, source).
+
+    Prefers perf's TopdownL1/TopdownL2 metric groups. When the kernel/perf
+    combination has no such groups (VMs, non-Intel hosts, old perf), level 1
+    is computed from the raw topdown-* events instead.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    py_cmd = [python, str(script_path)]
+    if bench_args:
+        py_cmd += bench_args.split()
+
+    attempts = [
+        ("metric-group", ["-M", "TopdownL1,TopdownL2"], parse_topdown_metrics),
+        ("metric-group", ["-M", "TopdownL1"], parse_topdown_metrics),
+        ("raw-events", ["-e", ",".join(TOPDOWN_RAW_EVENTS)], topdown_from_raw_events),
+    ]
+    start = time.time()
+    for source, sel, parse in attempts:
+        out_txt = out_dir / f"topdown_{source}.txt"
+        cmd = pinned([perf, "stat"] + sel + ["-o", str(out_txt), "--"] + py_cmd, pin_cpu)
+        print("perf topdown:", " ".join(cmd))
+        res = subprocess.run(cmd, capture_output=True, text=True)
+        if res.returncode != 0 or not out_txt.exists():
+            print(f"perf topdown: {' '.join(sel)} not usable (exit={res.returncode})")
+            if res.stderr:
+                with open(out_txt.with_suffix(".stderr.txt"), "w") as f:
+                    f.write(res.stderr)
+            continue
+        values = parse(out_txt.read_text(errors="ignore"))
+        if not values:
+            print(f"perf topdown: no top-down values in {out_txt.name}")
+            continue
+        out_csv = out_dir / "topdown.csv"
+        with open(out_csv, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["metric", "percent", "source"])
+            for name in TOPDOWN_L1 + TOPDOWN_L2:
+                if name in values:
+                    w.writerow([name, f"{values[name]:.2f}", source])
+        dur = time.time() - start
+        print(f"OK perf topdown ({source}) finished in {dur:.2f}s -> {out_csv}")
+        return True, dur
+
+    dur = time.time() - start
+    print(f"FAIL perf topdown: neither metric groups nor topdown-* events available ({dur:.2f}s)")
+    return False, dur
+
+
+MEM_TRACE = Path(__file__).resolve().with_name("mem_trace.py")
+
+
+def run_memory(python: str, script_path: Path, out_dir: Path, bench_args: str,
+               phases: List[str], top: int, pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
+    """
+    Memory stage into out_dir: rusage.json and the mem_trace.py outputs.
+
+    Peak RSS comes from a plain launch reaped with wait4, so it is the
+    benchmark's own high-water mark without any tracing overhead. A second
+    launch runs the script under tracemalloc, split into phases.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    py_args = [str(script_path)] + (bench_args.split() if bench_args else [])
+
+    cmd = pinned([python] + py_args, pin_cpu)
+    print("memory (rusage):", " ".join(cmd))
+    start = time.time()
+    with open(out_dir / "rusage_stdout.txt", "w") as fo, open(out_dir / "rusage_stderr.txt", "w") as fe:
+        proc = subprocess.Popen(cmd, stdout=fo, stderr=fe)
+        _, status, ru = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.time() - start
+    with open(out_dir / "rusage.json", "w") as f:
+        json.dump({
+            "returncode": proc.returncode,
+            "wall_s": round(wall, 4),
+            "max_rss_kib": ru.ru_maxrss,  # KiB on Linux
+            "minor_faults": ru.ru_minflt,
+            "major_faults": ru.ru_majflt,
+            "user_s": round(ru.ru_utime, 4),
+            "sys_s": round(ru.ru_stime, 4),
+        }, f, indent=2)
+    ok1 = proc.returncode == 0
+    print(f"{'OK' if ok1 else 'FAIL'} memory (rusage): peak RSS {ru.ru_maxrss / 1024:.1f} MiB in {wall:.2f}s")
+
+    cmd = [python, str(MEM_TRACE), "--out", str(out_dir), "--top", str(top)]
+    if phases:
+        cmd += ["--phases", ",".join(phases)]
+    cmd = pinned(cmd + ["--"] + py_args, pin_cpu)
+    print("memory (tracemalloc):", " ".join(cmd))
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    if res.stderr:
+        with open(out_dir / "tracemalloc_stderr.txt", "w") as f:
+            f.write(res.stderr)
+    ok2 = res.returncode == 0 and (out_dir / "tracemalloc.json").exists()
+    dur = time.time() - start
+    print(f"{'OK' if ok2 else 'FAIL'} memory (tracemalloc) finished in {dur:.2f}s -> {out_dir}")
+    return ok1 and ok2, dur
+
+
+SWEEP_CSV = "sweep.csv"
+SWEEP_FIT_CSV = "fit.csv"
+
+
+def parse_sweep(specs: List[str]) -> Dict[str, List[str]]:
+    """['size=1KiB,4KiB', 'loops=1,10'] -> {'size': ['1024', '4096'], 'loops': ['1', '10']}."""
+    grid: Dict[str, List[str]] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip()
+        vals = [v.strip() for v in values.split(",") if v.strip()]
+        if not sep or not name.isidentifier() or not vals:
+            raise ValueError(f"Invalid --sweep spec '{spec}'. Expected NAME=V1,V2,...")
+        # sizes are passed to the benchmark in bytes
+        grid[name] = [str(parse_size(v)) if re.fullmatch(r"[\d.]+\s*[kmg]i?b", v, re.I) else v
+                      for v in vals]
+    return grid
+
+
+def sweep_template(grid: Dict[str, List[str]], template: Optional[str]) -> str:
+    if template is None:
+        template = " ".join(f"--{name.replace('_', '-')} {{{name}}}" for name in grid)
+    try:
+        template.format(**{name: vals[0] for name, vals in grid.items()})
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Invalid --sweep-args '{template}': {e}")
+    return template
+
+
+def run_sweep(perf: str, python: str, script_path: Path, out_dir: Path,
+              grid: Dict[str, List[str]], template: str, x_name: str, runs: int,
+              bench_args: str, flush_bytes: int, pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
+    """
+    perf stat over every point of the grid into out_dir/point_NNN/, then
+    out_dir/sweep.csv (one row per run) and out_dir/fit.csv (one row per
+    series and metric). Series are the grid points that only differ in the
+    size parameter: all other parameters fixed, or all but the first one
+    when the size is read from the benchmark's output.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = list(grid)
+    series_names = [n for n in names if n != x_name] if x_name in grid else names[1:]
+    x_re = re.compile(rf"^{re.escape(x_name)}:\s*([-+0-9.eE]+)\s*$", re.M)
+
+    start = time.time()
+    ok_all = True
+    rows = []
+    points = [dict(zip(names, combo)) for combo in itertools.product(*grid.values())]
+    for i, point in enumerate(points):
+        point_args = " ".join(filter(None, [bench_args, template.format(**point)]))
+        point_dir = out_dir / f"point_{i:03d}"
+        print(f"sweep point {i + 1}/{len(points)}: {point_args}")
+        for r in range(1, runs + 1):
+            out_txt = point_dir / f"perf_run_{r}.txt"
+            ok, _ = run_perf_stat(perf, python, script_path, out_txt, r, point_args, flush_bytes, pin_cpu)
+            ok_all = ok_all and ok
+            if not ok or not out_txt.exists():
+                continue
+            if x_name in point:
+                x = float(point[x_name])
+            else:
+                stdout = out_txt.with_suffix(".program_stdout.txt")
+                m = x_re.search(stdout.read_text(errors="ignore")) if stdout.exists() else None
+                x = float(m.group(1)) if m else None
+            vals = parse_perf_file(out_txt)
+            if vals.get("cycles") and "instructions" in vals:
+                vals["IPC"] = vals["instructions"] / vals["cycles"]
+            series = ";".join(f"{n}={point[n]}" for n in series_names)
+            rows.append({"point": i, **point, "series": series, "x": x, "run": r, **vals})
+
+    metrics = list(dict.fromkeys(k for row in rows for k in row
+                                 if k not in names and k not in ("point", "series", "x", "run")))
+    with open(out_dir / SWEEP_CSV, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["point"] + names + ["series", "x", "run"] + metrics)
+        w.writeheader()
+        w.writerows(rows)
+
+    fits = []
+    for series in dict.fromkeys(row["series"] for row in rows):
+        srows = [row for row in rows if row["series"] == series]
+        for metric in metrics:
+            means = scaling.group_means(srows, "x", metric)
+            fit = scaling.fit_complexity(list(means), list(means.values()))
+            if fit is None:
+                continue
+            fits.append({"x": x_name, "series": series, "metric": metric, "points": len(means), "model": fit.model,
+                         "c0": f"{fit.c0:.6g}", "c1": f"{fit.c1:.6g}", "rel_rmse": f"{fit.rel_rmse:.4f}",
+                         "exponent": "" if fit.exponent is None else f"{fit.exponent:.3f}",
+                         "crossover": "" if fit.crossover is None else f"{fit.crossover:.6g}"})
+    with open(out_dir / SWEEP_FIT_CSV, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["x", "series", "metric", "points", "model", "c0", "c1",
+                                          "rel_rmse", "exponent", "crossover"])
+        w.writeheader()
+        w.writerows(fits)
+
+    dur = time.time() - start
+    for fit in fits:
+        if fit["metric"] == "time":
+            print(f"sweep fit {fit['series'] or x_name}: time ~ {fit['model']} "
+                  f"(exponent {fit['exponent'] or 'n/a'}, fixed cost dominates below "
+                  f"{x_name}={fit['crossover'] or 'n/a'})")
+    print(f"{'OK' if ok_all else 'FAIL'} sweep: {len(points)} points x {runs} runs in {dur:.2f}s -> {out_dir}")
+    return ok_all, dur
+
+
+def run_pyperf_wrapper(python: str, wrapper_script: Path, out_dir: Path, bench_args: str,
+                       pin_cpu: Optional[int] = None) -> Tuple[bool, float]:
     out_dir.mkdir(parents=True, exist_ok=True)
     log_out = out_dir / "run_benchmark_stdout.txt"
     log_err = out_dir / "run_benchmark_stderr.txt"
-    cmd = [python, str(wrapper_script)]
+    cmd = pinned([python, str(wrapper_script)], pin_cpu)
 
     print("pyperformance wrapper:", " ".join(cmd))
     start = time.time()
@@ -292,6 +1015,194 @@ def run_pyperf_wrapper(python: str, wrapper_script: Path, out_dir: Path, bench_a
     return ok, dur
 
 
+FINGERPRINT_FILE = "fingerprint.json"
+
+
+def local_import_closure(script: Path) -> List[Path]:
+    """
+    The script plus every local module it imports, transitively.
+
+    Imports are resolved against the script's directory and its parent, which
+    covers both 'from mdp_opt4 import ...' and the drivers' sys.path.insert of
+    the benchmark directory ('from opt_versions.aes_opt2 import ...').
+    Third-party and stdlib modules are not part of the closure.
+    """
+    seen: Dict[Path, None] = {}
+    todo = [script.resolve()]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen[path] = None
+        try:
+            tree = ast.parse(path.read_text(errors="ignore"), filename=str(path))
+        except SyntaxError:
+            continue
+        roots = [path.parent, path.parent.parent]
+        names: List[str] = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names += [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names.append(node.module)
+                names += [f"{node.module}.{a.name}" for a in node.names]
+        for name in names:
+            rel = Path(*name.split("."))
+            for root in roots:
+                for cand in (root / rel.with_suffix(".py"), root / rel / "__init__.py"):
+                    if cand.is_file():
+                        todo.append(cand.resolve())
+    return sorted(seen)
+
+
+def interpreter_build_info(python: str) -> str:
+    code = ("import sys, platform; "
+            "print(sys.version); print(platform.python_build()); "
+            "print(platform.python_compiler()); print(sys.flags)")
+    try:
+        res = subprocess.run([python, "-c", code], capture_output=True, text=True)
+    except OSError:
+        return ""
+    return res.stdout
+
+
+def installed_distributions(python: str) -> Dict[str, str]:
+    """name -> version of every distribution installed for the interpreter."""
+    code = ("import importlib.metadata as m, json; "
+            "print(json.dumps({d.metadata['Name']: d.version for d in m.distributions() "
+            "if d.metadata['Name']}))")
+    try:
+        res = subprocess.run([python, "-c", code], capture_output=True, text=True)
+        return json.loads(res.stdout) if res.returncode == 0 else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def benchmark_data_files(sources: List[Path]) -> List[Path]:
+    """Files under the data/ directory of the benchmarks the sources belong to
+    (e.g. bm_pyflate/data/interpreter.tar.bz2)."""
+    dirs = {d / "data" for src in sources for d in (src.parent, src.parent.parent)}
+    return sorted(f for d in dirs if d.is_dir() for f in d.rglob("*") if f.is_file())
+
+
+def cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.lower().startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def variant_fingerprint(v: Variant, python_info: str, cpu: str, options: dict,
+                        packages: Optional[Dict[str, str]] = None) -> Tuple[str, dict]:
+    """sha256 over the variant's sources and data files, interpreter, installed
+    packages, CPU and profiling options."""
+    sources = local_import_closure(v.bench_script)
+    if v.pyperf_wrapper:
+        sources += [p for p in local_import_closure(v.pyperf_wrapper) if p not in sources]
+    h = hashlib.sha256()
+    files = {}
+    for src in sources:
+        digest = hashlib.sha256(src.read_bytes()).hexdigest()
+        files[str(src)] = digest
+        h.update(f"{src.name}\0{digest}\n".encode())
+    for data in benchmark_data_files(sources):
+        digest = hashlib.sha256(data.read_bytes()).hexdigest()
+        files[str(data)] = digest
+        h.update(f"{data.parent.parent.name}/{data.parent.name}/{data.name}\0{digest}\n".encode())
+    inputs = {
+        "files": files,
+        "python": python_info,
+        "packages": packages or {},
+        "cpu": cpu,
+        "options": options,
+    }
+    h.update(json.dumps({k: inputs[k] for k in ("python", "packages", "cpu", "options")},
+                        sort_keys=True).encode())
+    return h.hexdigest(), inputs
+
+
+def find_cached_run(label_dir: Path, fingerprint: str) -> Optional[Path]:
+    """Newest earlier stamp dir of this variant recorded with the same fingerprint."""
+    if not label_dir.exists():
+        return None
+    for stamp_dir in sorted(label_dir.iterdir(), reverse=True):
+        meta = stamp_dir / FINGERPRINT_FILE
+        if not meta.is_file():
+            continue
+        try:
+            if json.loads(meta.read_text()).get("fingerprint") == fingerprint:
+                return Path(os.path.realpath(stamp_dir))
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def reuse_cached_run(cached: Path, base_dir: Path) -> None:
+    """Expose a prior run under this run's stamp: relative symlink, or a copy if that fails."""
+    base_dir.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        base_dir.symlink_to(os.path.relpath(cached, base_dir.parent), target_is_directory=True)
+    except OSError:
+        shutil.copytree(cached, base_dir, symlinks=True)
+
+
+INTERPRETERS_FILE = "interpreters.json"
+
+
+def interpreter_tag(python: str) -> str:
+    """Version + build kind of an interpreter: 3.12-debug, 3.13t-release, 3.12-pgo-lto, ..."""
+    code = ("import sys, sysconfig; c = sysconfig.get_config_var; a = c('CONFIG_ARGS') or ''; "
+            "print('%d.%d' % sys.version_info[:2] + ('t' if c('Py_GIL_DISABLED') else ''), "
+            "'debug' if hasattr(sys, 'gettotalrefcount') else "
+            "'-'.join(k for k, f in (('pgo', '--enable-optimizations'), ('lto', '--with-lto')) if f in a) "
+            "or 'release', sys.implementation.name)")
+    try:
+        res = subprocess.run([python, "-c", code], capture_output=True, text=True)
+    except OSError:
+        return Path(python).name
+    fields = res.stdout.split()
+    if res.returncode != 0 or len(fields) != 3:
+        return Path(python).name
+    version, build, impl = fields
+    return f"{version}-{build}" if impl == "cpython" else f"{impl}{version}-{build}"
+
+
+def parse_interpreter_specs(specs: List[str]) -> List[Interpreter]:
+    """['release=/opt/py/bin/python3', '/usr/bin/python3-dbg'] -> named interpreters."""
+    interpreters = []
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            name, path = "", spec
+        name, path = name.strip(), path.strip()
+        if not path or (sep and not re.fullmatch(r"[\w.+-]+", name)):
+            raise ValueError(f"Invalid --python spec '{spec}'. Expected [NAME=]PATH")
+        interpreters.append(Interpreter(name=name or interpreter_tag(path), path=path))
+    names = [i.name for i in interpreters]
+    dups = sorted({n for n in names if names.count(n) > 1})
+    if dups:
+        raise ValueError(f"Interpreters share the name(s) {', '.join(dups)}; name them with --python NAME=PATH")
+    return interpreters
+
+
+def record_interpreters(out_root: Path, interpreters: List[Interpreter], build_info: Dict[str, str]) -> None:
+    """Add this run's interpreters to <outdir>/interpreters.json, the matrix index of the report."""
+    path = out_root / INTERPRETERS_FILE
+    known: Dict[str, dict] = {}
+    try:
+        known = json.loads(path.read_text())
+    except (OSError, ValueError):
+        pass
+    for interp in interpreters:
+        known[interp.name] = {"path": interp.path, "build": build_info[interp.name]}
+    out_root.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(known, indent=2))
+
+
 def parse_variant_spec(spec: str) -> Variant:
     # LABEL:BENCH[:WRAPPER]
     parts = spec.split(":")
@@ -308,7 +1219,23 @@ def run_variant(v: Variant, python: str, pyspy: str, perf: str, out_root: Path,
                 pyspy_rate: int, pyspy_duration: Optional[float],
                 bench_args: str, flush_bytes: int,
                 sleep_between_runs: float,
-                run_stamp: str) -> bool:
+                run_stamp: str,
+                perf_record: bool = False,
+                perf_record_events: Optional[List[str]] = None,
+                perf_record_freq: int = 999,
+                pyspy_raw: bool = False,
+                topdown: bool = False,
+                memory: bool = False,
+                memory_phases: Optional[List[str]] = None,
+                memory_top: int = 25,
+                sweep_grid: Optional[Dict[str, List[str]]] = None,
+                sweep_args: str = "",
+                sweep_x: str = "",
+                sweep_runs: int = 3,
+                cache_options: Optional[dict] = None,
+                force: bool = False,
+                pin_cpu: Optional[int] = None,
+                tuning: Optional[dict] = None) -> bool:
     print("\n" + "=" * 70)
     print(f"Variant: {v.label}")
     print("=" * 70)
@@ -322,46 +1249,107 @@ def run_variant(v: Variant, python: str, pyspy: str, perf: str, out_root: Path,
 
     stamp = run_stamp
     base_dir = out_root / v.label / stamp
+
+    # result cache: identical inputs -> reuse the earlier run's artifacts
+    fingerprint, fp_inputs = None, None
+    if cache_options is not None:
+        fingerprint, fp_inputs = variant_fingerprint(
+            v, cache_options["python_info"], cache_options["cpu"], cache_options["options"],
+            cache_options.get("packages"))
+        cached = None if force else find_cached_run(out_root / v.label, fingerprint)
+        if cached is not None:
+            reuse_cached_run(cached, base_dir)
+            print(f"Cache hit ({fingerprint[:12]}): reusing {cached} -> {base_dir}")
+            return True
+        print(f"Cache {'bypassed (--force)' if force else 'miss'} ({fingerprint[:12]}): profiling")
     flame_dir = base_dir / "flamegraph"
     perf_dir = base_dir / "perf"
     logs_dir = base_dir / "logs"
 
+    # system state next to the run, so the report can flag noisy runs
+    state = system_state(pin_cpu)
+    warnings = preflight_warnings(state)
+    base_dir.mkdir(parents=True, exist_ok=True)
+    with open(base_dir / SYSTEM_STATE_FILE, "w") as f:
+        json.dump({"state": state, "warnings": warnings, "tuning": tuning or {}}, f, indent=2)
+    for w in warnings:
+        print(f"System: {w}")
+
     # py-spy
     svg = flame_dir / f"flamegraph_pyspy_{v.label}.svg"
-    ok1, _ = run_pyspy_flamegraph(pyspy, python, v.bench_script, svg, pyspy_rate, pyspy_duration, bench_args)
+    ok1, _ = run_pyspy_flamegraph(pyspy, python, v.bench_script, svg, pyspy_rate, pyspy_duration, bench_args,
+                                  pin_cpu=pin_cpu)
+    if pyspy_raw:
+        stacks = flame_dir / f"stacks_pyspy_{v.label}.txt"
+        ok1_raw, _ = run_pyspy_flamegraph(pyspy, python, v.bench_script, stacks, pyspy_rate,
+                                          pyspy_duration, bench_args, fmt="raw", pin_cpu=pin_cpu)
+        ok1 = ok1 and ok1_raw
 
     # perf stat
     ok2_all = True
     if internal_repeats:
         out_txt = perf_dir / "perf_stat.txt"
         ok2, _ = run_perf_stat_internal_repeats(
-            perf, python, v.bench_script, out_txt, perf_runs, bench_args, flush_bytes
+            perf, python, v.bench_script, out_txt, perf_runs, bench_args, flush_bytes, pin_cpu
         )
         ok2_all = ok2_all and ok2
     else:
         for i in range(1, perf_runs + 1):
             out_txt = perf_dir / f"perf_run_{i}.txt"
-            ok2, _ = run_perf_stat(perf, python, v.bench_script, out_txt, i, bench_args, flush_bytes)
+            ok2, _ = run_perf_stat(perf, python, v.bench_script, out_txt, i, bench_args, flush_bytes, pin_cpu)
             ok2_all = ok2_all and ok2
             time.sleep(sleep_between_runs)
 
+    # perf record + per-function attribution (optional)
+    ok4 = True
+    if perf_record:
+        ok4, _ = run_perf_record(perf, python, v.bench_script, base_dir / "perf_record",
+                                 perf_record_events or [], perf_record_freq, bench_args, pin_cpu)
+
+    # top-down breakdown (optional)
+    ok5 = True
+    if topdown:
+        ok5, _ = run_perf_topdown(perf, python, v.bench_script, base_dir / "topdown", bench_args, pin_cpu)
+
+    # peak RSS + tracemalloc phases (optional)
+    ok6 = True
+    if memory:
+        ok6, _ = run_memory(python, v.bench_script, base_dir / "memory", bench_args,
+                            memory_phases or [], memory_top, pin_cpu)
+
+    # input-size sweep (optional)
+    ok7 = True
+    if sweep_grid:
+        ok7, _ = run_sweep(perf, python, v.bench_script, base_dir / "sweep", sweep_grid, sweep_args,
+                           sweep_x, sweep_runs, bench_args, flush_bytes, pin_cpu)
+
     # pyperformance wrapper (optional)
     ok3 = True
     if v.pyperf_wrapper:
-        ok3, _ = run_pyperf_wrapper(python, v.pyperf_wrapper, logs_dir, bench_args)
+        ok3, _ = run_pyperf_wrapper(python, v.pyperf_wrapper, logs_dir, bench_args, pin_cpu)
+
+    ok = ok1 and ok2_all and ok3 and ok4 and ok5 and ok6 and ok7
+    # only complete runs are eligible for reuse
+    if ok and fingerprint is not None:
+        with open(base_dir / FINGERPRINT_FILE, "w") as f:
+            json.dump({"fingerprint": fingerprint, "interpreter": cache_options.get("interpreter", ""),
+                       **fp_inputs}, f, indent=2, sort_keys=True)
 
     print(f"\nOutputs for {v.label}: {base_dir.resolve()}")
-    return ok1 and ok2_all and ok3
+    return ok
 
 
 def main():
     args = parse_args()
     run_stamp = ts()
     # Resolve tools
-    python = args.python
+    interpreters = parse_interpreter_specs(args.python or [os.environ.get("VENV_PYTHON", sys.executable)])
     pyspy = args.pyspy
     perf = args.perf
-    ensure_paths(python, pyspy, perf)
+    for interp in interpreters:
+        ensure_paths(interp.path, pyspy, perf)
+    # one interpreter keeps the flat <outdir>/<label>/<stamp> layout
+    matrix = len(interpreters) > 1
 
     # Parse variants
     variants: List[Variant] = [parse_variant_spec(s) for s in args.variant]
@@ -372,44 +1360,166 @@ def main():
     # Flush size
     flush_bytes = parse_size(args.flush_bytes)
 
+    pin_cpu = resolve_pin_cpu(args.pin_cpu)
+    if args.pin_cpu == "auto" and pin_cpu is None:
+        print("--pin-cpu auto: no isolated CPU (isolcpus), launches are not pinned")
+
     print("Profiling Suite")
-    print(f"Using python: {python}")
+    for interp in interpreters:
+        print(f"Using python: {interp.path}" + (f" ({interp.name})" if matrix else ""))
     print(f"Using py-spy:  {pyspy}")
     print(f"Using perf:    {perf}")
     print(f"Output root:   {out_root.resolve()}")
     print(f"Perf runs:     {args.perf_runs} ({'perf -r' if args.perf_use_internal_repeats else 'separate launches'})")
     print(f"py-spy rate:   {args.pyspy_rate} Hz")
     print(f"py-spy dur:    {args.pyspy_duration if args.pyspy_duration else 'program duration'}")
+    if args.pyspy_raw:
+        print("py-spy raw:    collapsed stacks enabled")
     print(f"Cache flush:   {args.flush_bytes} ({flush_bytes} bytes)")
     if args.bench_args:
         print(f"Extra bench args: {args.bench_args}")
+    perf_record_events = [e.strip() for e in args.perf_record_events.split(",") if e.strip()]
+    if args.perf_record:
+        print(f"perf record:   {','.join(perf_record_events)} @ {args.perf_record_freq} Hz")
+    if args.topdown:
+        print("Top-down:      TopdownL1,TopdownL2 (raw topdown-* events as fallback)")
+    memory_phases = [p.strip() for p in args.memory_phases.split(",") if p.strip()]
+    if args.memory:
+        print(f"Memory:        peak RSS + tracemalloc ({','.join(memory_phases) or 'one phase'})")
+    sweep_grid = parse_sweep(args.sweep)
+    sweep_args, sweep_x = "", ""
+    if sweep_grid:
+        sweep_args = sweep_template(sweep_grid, args.sweep_args)
+        sweep_x = args.sweep_x or next(iter(sweep_grid))
+        npoints = 1
+        for vals in sweep_grid.values():
+            npoints *= len(vals)
+        print(f"Sweep:         {npoints} points x {args.sweep_runs} runs, args '{sweep_args}', size {sweep_x}")
+    print(f"Pinned CPU:    {pin_cpu if pin_cpu is not None else 'none'}")
+
+    # pre-flight: report what adds noise before spending time on runs
+    warnings = preflight_warnings(system_state(pin_cpu))
+    print("Pre-flight:    " + ("system looks quiet" if not warnings else f"{len(warnings)} warning(s)"))
+    for w in warnings:
+        print(f"  - {w}")
+    tuner, tuning = None, None
+    if args.tune:
+        tuner = SystemTuner()
+        # SIGTERM -> SystemExit, so the finally below restores the settings
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        tuner.tune(pin_cpu)
+        for change in tuner.applied:
+            print(f"Tuned:         {change}")
+        if tuner.failed:
+            print(f"Tuning:        {len(tuner.failed)} setting(s) not applied (needs root), e.g. {tuner.failed[0]}")
+        tuning = {"applied": tuner.applied, "failed": tuner.failed}
+
+    # everything except the variant's own sources that can change its results
+    build_info = {interp.name: interpreter_build_info(interp.path) for interp in interpreters}
+    packages = {interp.name: installed_distributions(interp.path) for interp in interpreters}
+    cache_options = {
+        "cpu": cpu_model(),
+        "options": {
+            "perf": perf,
+            "pyspy": pyspy,
+            "perf_runs": args.perf_runs,
+            "perf_use_internal_repeats": args.perf_use_internal_repeats,
+            "pyspy_rate": args.pyspy_rate,
+            "pyspy_duration": args.pyspy_duration,
+            "pyspy_raw": args.pyspy_raw,
+            "bench_args": args.bench_args,
+            "flush_bytes": flush_bytes,
+            "perf_record": args.perf_record,
+            "perf_record_events": perf_record_events if args.perf_record else None,
+            "perf_record_freq": args.perf_record_freq if args.perf_record else None,
+            "topdown": args.topdown,
+            "memory": args.memory,
+            "memory_phases": memory_phases if args.memory else None,
+            "memory_top": args.memory_top if args.memory else None,
+            "sweep": sweep_grid or None,
+            "sweep_args": sweep_args or None,
+            "sweep_x": sweep_x or None,
+            "sweep_runs": args.sweep_runs if sweep_grid else None,
+            "pin_cpu": pin_cpu,
+            "tune": args.tune,
+        },
+    }
+    if args.force:
+        print("Result cache:  bypassed (--force)")
+    history = None
+    if args.history:
+        import bench_history
+        history = bench_history.connect(Path(args.history))
+        print(f"History:       {args.history}")
+
+    if matrix:
+        record_interpreters(out_root, interpreters, build_info)
 
     successes = 0
-    for v in variants:
-        ok = run_variant(
-            v=v,
-            python=python,
-            pyspy=pyspy,
-            perf=perf,
-            out_root=out_root,
-            perf_runs=args.perf_runs,
-            internal_repeats=args.perf_use_internal_repeats,
-            pyspy_rate=args.pyspy_rate,
-            pyspy_duration=args.pyspy_duration,
-            bench_args=args.bench_args,
-            flush_bytes=flush_bytes,
-            sleep_between_runs=args.sleep_between_runs,
-            run_stamp=run_stamp,
-        )
-        if ok:
-            successes += 1
-        time.sleep(args.sleep_between_variants)
+    try:
+        for interp, v in itertools.product(interpreters, variants):
+            interp_root = out_root / interp.name if matrix else out_root
+            if matrix:
+                print(f"\nInterpreter: {interp.name} ({interp.path})")
+            ok = run_variant(
+                v=v,
+                python=interp.path,
+                pyspy=pyspy,
+                perf=perf,
+                out_root=interp_root,
+                perf_runs=args.perf_runs,
+                internal_repeats=args.perf_use_internal_repeats,
+                pyspy_rate=args.pyspy_rate,
+                pyspy_duration=args.pyspy_duration,
+                bench_args=args.bench_args,
+                flush_bytes=flush_bytes,
+                sleep_between_runs=args.sleep_between_runs,
+                run_stamp=run_stamp,
+                perf_record=args.perf_record,
+                perf_record_events=perf_record_events,
+                perf_record_freq=args.perf_record_freq,
+                pyspy_raw=args.pyspy_raw,
+                topdown=args.topdown,
+                memory=args.memory,
+                memory_phases=memory_phases,
+                memory_top=args.memory_top,
+                sweep_grid=sweep_grid,
+                sweep_args=sweep_args,
+                sweep_x=sweep_x,
+                sweep_runs=args.sweep_runs,
+                cache_options={**cache_options, "interpreter": interp.name,
+                               "python_info": build_info[interp.name],
+                               "packages": packages[interp.name]},
+                force=args.force,
+                pin_cpu=pin_cpu,
+                tuning=tuning,
+            )
+            if ok:
+                successes += 1
+            base_dir = interp_root / v.label / run_stamp
+            # cache hits are the earlier run again, already in the history; the
+            # perf stat samples are stored even if another stage failed
+            if history is not None and base_dir.is_dir() and not base_dir.is_symlink():
+                n = bench_history.store(history, bench_history.measurements_from_stamp_dir(
+                    base_dir, out_root.resolve().name, v.label, interp.name,
+                    bench_history.git_head(v.bench_script.resolve().parent)))
+                print(f"History: stored {n} measurements for {v.label}")
+            time.sleep(args.sleep_between_variants)
+    finally:
+        if tuner is not None:
+            tuner.restore()
+            if tuner.applied:
+                print("System tuning restored")
 
     print("\n" + "=" * 70)
     print("SUMMARY")
     print("=" * 70)
-    print(f"Successful variants: {successes}/{len(variants)}")
+    print(f"Successful variants: {successes}/{len(variants) * len(interpreters)}")
     print(f"Results root: {out_root.resolve()}")
+    if history is not None:
+        print("\nRegressions vs. history (this run):")
+        bench_history.print_changes(bench_history.detect_changes(
+            history, since=run_stamp, benchmark=out_root.resolve().name))
     if out_root.exists():
         print("\nGenerated flamegraphs:")
         for p in out_root.rglob("flamegraph_pyspy_*.svg"):
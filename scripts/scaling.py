@@ -0,0 +1,120 @@
+"""
+Complexity fitting for input-size sweeps (run_benchmarks.py --sweep).
+
+Each metric is fitted as y = c0 + c1 * f(n) for the usual complexity classes
+and the class with the lowest relative error wins. Weighting by 1/y^2 keeps
+the smallest sizes from being drowned by the largest ones, which matters
+when the grid spans several orders of magnitude. c0 is the fixed cost of a
+launch (interpreter start-up, set-up, per-call overhead); c1 the cost per
+unit of input. The crossover is the size at which c1 * f(n) catches up with
+c0, i.e. where the fixed cost stops dominating. A log-log power law
+y = a * n^b is fitted as well, as a model-free growth exponent.
+
+Shared by run_benchmarks.py (sweep/fit.csv) and build_html_report.py (fitted
+curves); stdlib only.
+"""
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+MODELS = OrderedDict([
+    ("O(1)", lambda n: 0.0),
+    ("O(log n)", lambda n: math.log(n)),
+    ("O(n)", lambda n: n),
+    ("O(n log n)", lambda n: n * math.log(n)),
+    ("O(n^2)", lambda n: n * n),
+])
+
+# a model with more growth must beat the simpler one by this factor
+SIMPLER_MARGIN = 0.9
+
+
+@dataclass
+class Fit:
+    model: str
+    c0: float
+    c1: float
+    rel_rmse: float
+    exponent: Optional[float]   # power-law b in y = a * n^b
+    crossover: Optional[float]  # n where c1 * f(n) == c0
+
+
+def _weighted_fit(f: Sequence[float], y: Sequence[float]):
+    """Least squares of y = c0 + c1 * f weighted by 1/y^2; returns (c0, c1, rel_rmse)."""
+    w = [1.0 / (v * v) for v in y]
+    sw = sum(w)
+    sf = sum(wi * fi for wi, fi in zip(w, f))
+    sy = sum(wi * yi for wi, yi in zip(w, y))
+    sff = sum(wi * fi * fi for wi, fi in zip(w, f))
+    sfy = sum(wi * fi * yi for wi, fi, yi in zip(w, f, y))
+    det = sw * sff - sf * sf
+    if abs(det) <= 1e-12 * max(sw * sff, 1e-300):
+        c0, c1 = sy / sw, 0.0
+    else:
+        c0 = (sff * sy - sf * sfy) / det
+        c1 = (sw * sfy - sf * sy) / det
+    err = [(yi - c0 - c1 * fi) / yi for fi, yi in zip(f, y)]
+    return c0, c1, math.sqrt(sum(e * e for e in err) / len(err))
+
+
+def power_law_exponent(xs: Sequence[float], ys: Sequence[float]) -> Optional[float]:
+    pts = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len({p[0] for p in pts}) < 2:
+        return None
+    mx = sum(p[0] for p in pts) / len(pts)
+    my = sum(p[1] for p in pts) / len(pts)
+    sxx = sum((p[0] - mx) ** 2 for p in pts)
+    return sum((p[0] - mx) * (p[1] - my) for p in pts) / sxx
+
+
+def fit_complexity(xs: Sequence[float], ys: Sequence[float]) -> Optional[Fit]:
+    """Best complexity class for ys over sizes xs (positive values only); None if < 3 sizes."""
+    pts = [(x, y) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len({x for x, _ in pts}) < 3:
+        return None
+    x = [p[0] for p in pts]
+    y = [p[1] for p in pts]
+    best = None
+    for name, f in MODELS.items():
+        c0, c1, err = _weighted_fit([f(v) for v in x], y)
+        if c1 < 0 or c0 < 0:
+            # growth models with negative cost terms are not physical
+            continue
+        if best is None or err < best[3] * SIMPLER_MARGIN - 1e-9:
+            best = (name, c0, c1, err)
+    if best is None:
+        best = ("O(1)",) + _weighted_fit([0.0] * len(y), y)
+    return Fit(best[0], best[1], best[2], best[3], power_law_exponent(x, y),
+               crossover(best[0], best[1], best[2]))
+
+
+def crossover(model: str, c0: float, c1: float) -> Optional[float]:
+    """n >= 1 where c1 * f(n) == c0, by bisection in log space; None if never."""
+    f = MODELS[model]
+    if c0 <= 0 or c1 <= 0 or c1 * f(1e18) < c0:
+        return None
+    lo, hi = 0.0, math.log(1e18)
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if c1 * f(math.exp(mid)) < c0:
+            lo = mid
+        else:
+            hi = mid
+    return math.exp(hi)
+
+
+def predict(fit: Fit, n: float) -> float:
+    return fit.c0 + fit.c1 * MODELS[fit.model](n)
+
+
+def group_means(rows: List[dict], x_key: str, y_key: str) -> Dict[float, float]:
+    """Mean y per distinct x over rows (one row per run) that have both."""
+    acc: Dict[float, List[float]] = {}
+    for r in rows:
+        x, y = r.get(x_key), r.get(y_key)
+        if x is None or y is None:
+            continue
+        acc.setdefault(float(x), []).append(float(y))
+    return {x: sum(v) / len(v) for x, v in sorted(acc.items())}
@@ -0,0 +1,224 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import bench_history  # noqa: E402
+
+# sys.version of a debug and a release build of the same CPython
+PYTHON_INFO = "3.12.3 (main, Apr 10 2024, 05:33:47) [GCC 13.2.0]\n"
+STAMP = "20251025_220832"
+# per-run noise of a stable benchmark, relative to its mean
+NOISE = (-0.01, 0.0, 0.01, -0.005, 0.005)
+
+
+class MatrixHistoryTests(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name) / "mdp"
+        interpreters = {}
+        for name, seconds in (("debug", "2.5"), ("release", "1.0")):
+            interpreters[name] = {"path": f"/opt/{name}/bin/python3", "build": PYTHON_INFO}
+            stamp_dir = self.root / name / "mdp_opt" / STAMP
+            (stamp_dir / "perf").mkdir(parents=True)
+            (stamp_dir / "perf" / "perf_run_1.txt").write_text(
+                f"       {seconds} seconds time elapsed\n")
+            (stamp_dir / "fingerprint.json").write_text(
+                json.dumps({"fingerprint": name, "interpreter": name, "python": PYTHON_INFO}))
+        (self.root / "interpreters.json").write_text(json.dumps(interpreters))
+        self.conn = bench_history.connect(Path(tmpdir.name) / "history.sqlite")
+        self.addCleanup(self.conn.close)
+
+    def series(self):
+        rows = self.conn.execute(
+            "SELECT interpreter, mean FROM measurements WHERE metric = 'time' "
+            "ORDER BY interpreter").fetchall()
+        return [(row["interpreter"], row["mean"]) for row in rows]
+
+    def test_results_keyed_by_interpreter_dir(self):
+        bench_history.store(self.conn, bench_history.measurements_from_results(self.root))
+
+        self.assertEqual(self.series(), [("debug", 2.5), ("release", 1.0)])
+
+    def test_stamp_dir_keyed_by_recorded_name(self):
+        for name in ("debug", "release"):
+            stamp_dir = self.root / name / "mdp_opt" / STAMP
+            bench_history.store(self.conn, bench_history.measurements_from_stamp_dir(
+                stamp_dir, "mdp", "mdp_opt"))
+
+        self.assertEqual(self.series(), [("debug", 2.5), ("release", 1.0)])
+
+
+class NormalizeStampTests(unittest.TestCase):
+
+    def test_run_benchmarks_stamp(self):
+        self.assertEqual(bench_history.normalize_stamp("20251025_220832"),
+                         "2025-10-25T22:08:32")
+
+    def test_iso_date(self):
+        self.assertEqual(bench_history.normalize_stamp(" 2025-10-25 22:08:32.123456 "),
+                         "2025-10-25T22:08:32")
+        self.assertEqual(bench_history.normalize_stamp("2025-10-25"), "2025-10-25T00:00:00")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            bench_history.normalize_stamp("latest")
+
+
+class WelchTTestTests(unittest.TestCase):
+
+    def test_known_p_value(self):
+        # equal sizes and variances: df = 10, t = 2.228 is the 97.5th percentile
+        a = [-1.0, -1.0, -1.0, 1.0, 1.0, 1.0]
+        b = [x + 2.228 * (0.4 ** 0.5) for x in a]
+
+        self.assertAlmostEqual(bench_history.welch_t_test(a, b), 0.05, places=4)
+        self.assertAlmostEqual(bench_history.welch_t_test(b, a), 0.05, places=4)
+
+    def test_t_distribution_tail(self):
+        # two-sided p of t = 2.228, df = 10 and of t = 0
+        self.assertAlmostEqual(bench_history._betainc(5.0, 0.5, 10 / (10 + 2.228 ** 2)),
+                               0.05, places=4)
+        self.assertEqual(bench_history._betainc(5.0, 0.5, 1.0), 1.0)
+        self.assertEqual(bench_history._betainc(5.0, 0.5, 0.0), 0.0)
+
+    def test_identical_means(self):
+        self.assertAlmostEqual(bench_history.welch_t_test([1.0, 2.0, 3.0], [3.0, 2.0, 1.0]), 1.0)
+
+    def test_zero_variance(self):
+        self.assertEqual(bench_history.welch_t_test([1.0, 1.0], [1.0, 1.0, 1.0]), 1.0)
+        self.assertEqual(bench_history.welch_t_test([1.0, 1.0], [2.0, 2.0]), 0.0)
+
+    def test_too_few_samples(self):
+        self.assertIsNone(bench_history.welch_t_test([1.0], [1.0, 2.0]))
+        self.assertIsNone(bench_history.welch_t_test([1.0, 2.0], []))
+
+
+class DetectChangesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = bench_history.connect(Path(":memory:"))
+        self.addCleanup(self.conn.close)
+
+    def add(self, metric, means, noise=NOISE):
+        """One stamp per day from 2025-10-01, each with len(noise) runs around its mean."""
+        bench_history.store(self.conn, [
+            bench_history.Measurement("mdp", "mdp_opt", "release", f"c{day}",
+                                      f"2025-10-{day:02d}T12:00:00", metric, "",
+                                      [mean * (1 + e) for e in noise], "test")
+            for day, mean in enumerate(means, 1)
+        ])
+
+    def changes(self, **kwargs):
+        return [(c.metric, c.stamp[:10], c.regression)
+                for c in bench_history.detect_changes(self.conn, **kwargs)]
+
+    def test_stable_history(self):
+        self.add("time", [1.0] * 6)
+
+        self.assertEqual(self.changes(), [])
+
+    def test_time_regression_and_improvement(self):
+        self.add("time", [1.0, 1.0, 1.0, 1.5, 1.5, 1.5, 0.9])
+
+        changes = bench_history.detect_changes(self.conn)
+
+        self.assertEqual([(c.stamp[:10], c.regression) for c in changes],
+                         [("2025-10-04", True), ("2025-10-07", False)])
+        self.assertEqual(changes[0].baseline_stamp[:10], "2025-10-03")
+        self.assertAlmostEqual(changes[0].baseline_mean, 1.0)
+        self.assertAlmostEqual(changes[0].rel_change, 0.5)
+        self.assertAlmostEqual(changes[1].rel_change, -0.4)
+        self.assertLess(changes[0].p_value, 0.01)
+
+    def test_higher_is_better_metric(self):
+        self.add("IPC", [2.0, 2.0, 2.0, 1.5, 1.5, 2.5])
+
+        self.assertEqual(self.changes(), [("IPC", "2025-10-04", True),
+                                          ("IPC", "2025-10-06", False)])
+
+    def test_change_starts_new_segment(self):
+        # the new level is the baseline from the change on: flagged once
+        self.add("time", [1.0, 1.0, 1.0, 1.5, 1.5, 1.5, 1.5])
+
+        self.assertEqual(self.changes(), [("time", "2025-10-04", True)])
+
+    def test_window_limits_baseline(self):
+        self.add("time", [1.0, 1.0, 1.0, 1.5, 1.5])
+
+        self.assertEqual(self.changes(window=1), [("time", "2025-10-04", True)])
+
+    def test_since_keeps_earlier_baseline(self):
+        self.add("time", [1.0, 1.0, 1.0, 1.5, 1.5])
+
+        self.assertEqual(self.changes(since="2025-10-04"), [("time", "2025-10-04", True)])
+        self.assertEqual(self.changes(since="20251005_000000"), [])
+
+    def test_until(self):
+        self.add("time", [1.0, 1.0, 1.0, 1.5, 1.5])
+
+        self.assertEqual(self.changes(until="2025-10-03T23:59:59"), [])
+        self.assertEqual(self.changes(until="2025-10-04T12:00:00"),
+                         [("time", "2025-10-04", True)])
+
+    def test_metric_filter(self):
+        self.add("time", [1.0, 1.0, 1.5])
+        self.add("cycles", [1e9, 1e9, 2e9])
+
+        self.assertEqual(self.changes(metric="cycles"), [("cycles", "2025-10-03", True)])
+
+    def test_threshold_suppresses_tiny_changes(self):
+        # +1% on runs that vary by 0.01%: significant, but below the 2% default
+        self.add("time", [1.0, 1.0, 1.0, 1.01], noise=[e / 100 for e in NOISE])
+
+        self.assertEqual(self.changes(), [])
+        self.assertEqual(self.changes(threshold=0.005), [("time", "2025-10-04", True)])
+
+    def test_single_value_metric(self):
+        # one peak RSS per run: a 2.5x jump against the earlier runs' spread
+        self.add("max_rss", [100000, 101000, 99500, 100500, 250000, 251000], noise=(0.0,))
+
+        self.assertEqual(self.changes(), [("max_rss", "2025-10-05", True)])
+
+    def test_single_value_metric_needs_two_earlier_runs(self):
+        # a single earlier value has no spread to test against
+        self.add("traced_peak", [1000, 3000], noise=(0.0,))
+
+        self.assertEqual(self.changes(), [])
+
+    def test_memory_jump_from_results(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / "mdp"
+            for day, rss in enumerate((100000, 101000, 99500, 250000), 1):
+                stamp_dir = root / "mdp_opt" / f"202510{day:02d}_120000"
+                (stamp_dir / "memory").mkdir(parents=True)
+                (stamp_dir / "memory" / "rusage.json").write_text(
+                    json.dumps({"max_rss_kib": rss}))
+            bench_history.store(self.conn, bench_history.measurements_from_results(
+                root, interpreter="release"))
+
+        self.assertEqual(self.changes(), [("max_rss", "2025-10-04", True)])
+
+    def test_regressions_command(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = os.path.join(tmpdir, "history.sqlite")
+            self.conn = bench_history.connect(Path(db))
+            self.add("time", [1.0, 1.0, 1.0, 1.01], noise=[e / 100 for e in NOISE])
+            self.conn.close()
+
+            with mock.patch("sys.stdout", io.StringIO()) as out:
+                self.assertEqual(bench_history.main(["--db", db, "regressions"]), 0)
+                self.assertEqual(bench_history.main(
+                    ["--db", db, "regressions", "--threshold", "0.005"]), 1)
+            self.assertIn("REG", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import run_benchmarks  # noqa: E402
+
+# perf script -F event,period,ip,sym of a plain and a hybrid (two-PMU) CPU
+PERF_SCRIPT = """\
+          250000 cycles:u: 
+\t    55d0a1 _PyEval_EvalFrameDefault
+\t    7f0010 py::evaluate:/bench/mdp.py
+\t    7f0020 py::main:/bench/mdp.py
+
+           1000 cycles: 
+\t    7f0030 py::build_graph:/bench/mdp.py
+
+          40000 cpu_core/cycles/: 
+\t    7f0010 py::evaluate:/bench/mdp.py
+
+          10000 cpu_atom/cycles/u: 
+\t    7f0010 py::evaluate:/bench/mdp.py
+
+             70 cpu_core/cache-misses/: 
+\t    7f0f00 memcpy
+
+            500 instructions: 
+\t    7f0010 py::evaluate:/bench/mdp.py
+"""
+
+
+class FakePopen:
+
+    def __init__(self, cmd, **kwargs):
+        self.stdout = io.StringIO(PERF_SCRIPT)
+
+    def wait(self):
+        return 0
+
+
+class PerfRecordTests(unittest.TestCase):
+
+    def samples(self):
+        with mock.patch.object(run_benchmarks.subprocess, "Popen", FakePopen):
+            return list(run_benchmarks._perf_script_samples("perf", Path("perf.data")))
+
+    def test_event_names_drop_pmu_and_modifiers(self):
+        events = [(event, period) for event, period, frames in self.samples()]
+
+        self.assertEqual(events, [("cycles", 250000), ("cycles", 1000), ("cycles", 40000),
+                                  ("cycles", 10000), ("cache-misses", 70),
+                                  ("instructions", 500)])
+
+    def test_attribution_sums_periods_across_pmus(self):
+        counts = run_benchmarks.attribute_samples(self.samples(), ["cycles", "cache-misses"])
+
+        self.assertEqual(counts, {
+            "evaluate:/bench/mdp.py": {"cycles": [3, 300000], "cache-misses": [0, 0]},
+            "build_graph:/bench/mdp.py": {"cycles": [1, 1000], "cache-misses": [0, 0]},
+            "[memcpy]": {"cycles": [0, 0], "cache-misses": [1, 70]},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()